@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import StaffingForecast
 
-# Register your models here.
+
+@admin.register(StaffingForecast)
+class StaffingForecastAdmin(admin.ModelAdmin):
+    list_display = ['store', 'role_required', 'weekday', 'shifts_sampled', 'approved', 'avg_hours_to_fill',
+                    'computed_at']
+    list_filter = ['role_required', 'weekday']
+    search_fields = ['store__name']
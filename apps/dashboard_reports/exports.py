@@ -0,0 +1,46 @@
+"""
+Application CSV export.
+
+The rows come from one scan of ShiftVolunteer, which carries copies of its
+shift's date, store and manager (see shift_management/copies.py), using the
+region index. Names and titles for each chunk of rows are then fetched by
+primary key, so the export never joins the application table to shifts,
+stores and users twice over. The file is streamed chunk by chunk.
+"""
+from itertools import islice
+
+from apps.shift_management.models import Shift, ShiftVolunteer, Store
+from apps.user_authentication.models import CustomUser
+from .audit import EXPORT_CHUNK_SIZE, _Echo
+
+STATUS_LABELS = dict(ShiftVolunteer.STATUS_CHOICES)
+
+
+def _full_name(first_name, last_name):
+    return f'{first_name} {last_name}'.strip()
+
+
+def stream_volunteers_csv(applications, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield CSV lines for a ShiftVolunteer queryset"""
+    import csv
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(['Volunteer', 'Email', 'Shift', 'Store', 'Date', 'Status', 'Applied At',
+                           'Reviewed By', 'Reviewed At'])
+    rows = applications.values_list('volunteer_id', 'shift_id', 'store_id', 'shift_date', 'status',
+                                    'applied_at', 'reviewed_by_id', 'reviewed_at').iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        user_ids = {row[0] for row in chunk} | {row[6] for row in chunk if row[6]}
+        users = {user_id: rest for user_id, *rest in CustomUser.objects.filter(id__in=user_ids).order_by().values_list(
+            'id', 'first_name', 'last_name', 'email', 'username'
+        )}
+        titles = dict(Shift.objects.filter(id__in={row[1] for row in chunk}).order_by().values_list('id', 'title'))
+        stores = dict(Store.objects.filter(id__in={row[2] for row in chunk}).order_by().values_list('id', 'name'))
+        for volunteer_id, shift_id, store_id, shift_date, status, applied_at, reviewer_id, reviewed_at in chunk:
+            first_name, last_name, email, _ = users[volunteer_id]
+            yield writer.writerow([
+                _full_name(first_name, last_name), email, titles[shift_id], stores.get(store_id, ''), shift_date,
+                STATUS_LABELS.get(status, status), applied_at.strftime('%Y-%m-%d %H:%M:%S'),
+                users[reviewer_id][3] if reviewer_id else 'N/A',
+                reviewed_at.strftime('%Y-%m-%d %H:%M:%S') if reviewed_at else 'N/A',
+            ])
@@ -0,0 +1,183 @@
+"""
+Staffing-demand forecasting from historical fill rates.
+
+All per-row work happens in two GROUP BY queries: one over past shifts
+(shifts and slots per store x role x weekday) and one over their
+applications (volunteers, approvals and mean hours from posting to approval).
+Python only merges the grouped rows, at most stores x roles x 7, so a full
+recompute over years of history costs about as much as the two scans.
+
+The forecast for a future date is the stats row for that date's weekday,
+falling back to the role's all-weekday row when the weekday has fewer than
+MIN_SHIFTS_SAMPLED past shifts.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, Func, Q, Sum
+from django.db.models.functions import ExtractIsoWeekDay
+from django.utils import timezone
+from apps.shift_management.models import Shift, ShiftVolunteer
+from .models import StaffingForecast
+
+MIN_SHIFTS_SAMPLED = 3
+
+DEFAULT_HORIZON_DAYS = 14
+
+
+class IsoWeekday(ExtractIsoWeekDay):
+    """ExtractIsoWeekDay using SQLite's own strftime instead of Django's per-row Python function"""
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"((CAST(strftime('%%w', {sql}) AS INTEGER) + 6) %% 7 + 1)", params
+
+
+class HoursBetween(Func):
+    """(end - start) in hours as a float, computed natively by the database"""
+    output_field = FloatField()
+    template = 'EXTRACT(EPOCH FROM (%(expressions)s)) / 3600.0'
+    arg_joiner = ' - '
+
+    def __init__(self, end, start):
+        super().__init__(end, start)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, arg_joiner=') - julianday(',
+                           template='(julianday(%(expressions)s)) * 24.0', **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        # TIMESTAMPDIFF takes (start, end)
+        clone = self.copy()
+        clone.set_source_expressions(self.get_source_expressions()[::-1])
+        return clone.as_sql(compiler, connection, arg_joiner=', ',
+                            template='TIMESTAMPDIFF(SECOND, %(expressions)s) / 3600.0', **extra_context)
+
+
+def _past_shifts(today):
+    return Shift.objects.filter(shift_date__lt=today).exclude(status='cancelled')
+
+
+def compute_stats(today=None):
+    """Return {(store_id, role, weekday): stats dict} from the full shift history"""
+    today = today or timezone.now().date()
+    stats = defaultdict(lambda: {'shifts_sampled': 0, 'slots_offered': 0, 'volunteers': 0,
+                                 'approved': 0, 'avg_hours_to_fill': None})
+
+    shift_groups = _past_shifts(today).values(
+        'store_id', 'role_required', weekday=IsoWeekday('shift_date')
+    ).annotate(shifts=Count('id'), slots=Sum('slots_available')).order_by()
+    for row in shift_groups:
+        entry = stats[(row['store_id'], row['role_required'], row['weekday'])]
+        entry['shifts_sampled'] = row['shifts']
+        entry['slots_offered'] = row['slots'] or 0
+
+    application_groups = ShiftVolunteer.objects.filter(
+        shift__in=_past_shifts(today)
+    ).exclude(status='withdrawn').values(
+        'shift__store_id', 'shift__role_required', weekday=IsoWeekday('shift__shift_date')
+    ).annotate(
+        volunteers=Count('id'),
+        approved=Count('id', filter=Q(status='approved')),
+        hours_to_fill=Avg(HoursBetween(F('reviewed_at'), F('shift__created_at')), filter=Q(status='approved')),
+    ).order_by()
+    for row in application_groups:
+        entry = stats[(row['shift__store_id'], row['shift__role_required'], row['weekday'])]
+        entry['volunteers'] = row['volunteers']
+        entry['approved'] = row['approved']
+        entry['avg_hours_to_fill'] = row['hours_to_fill']
+
+    # Role totals across weekdays; time to fill is weighted by approvals
+    totals = {}
+    for (store_id, role, weekday), entry in list(stats.items()):
+        total = totals.setdefault((store_id, role), {
+            'shifts_sampled': 0, 'slots_offered': 0, 'volunteers': 0,
+            'approved': 0, 'hours_weighted': 0.0, 'hours_count': 0,
+        })
+        for key in ('shifts_sampled', 'slots_offered', 'volunteers', 'approved'):
+            total[key] += entry[key]
+        if entry['avg_hours_to_fill'] is not None:
+            total['hours_weighted'] += entry['avg_hours_to_fill'] * entry['approved']
+            total['hours_count'] += entry['approved']
+    for (store_id, role), total in totals.items():
+        hours_weighted, hours_count = total.pop('hours_weighted'), total.pop('hours_count')
+        total['avg_hours_to_fill'] = hours_weighted / hours_count if hours_count else None
+        stats[(store_id, role, StaffingForecast.ALL_WEEKDAYS)] = total
+
+    return dict(stats)
+
+
+def recompute_forecasts(today=None):
+    """Replace the StaffingForecast table with fresh stats; returns the row count"""
+    rows = [
+        StaffingForecast(store_id=store_id, role_required=role, weekday=weekday, **entry)
+        for (store_id, role, weekday), entry in compute_stats(today).items()
+    ]
+    with transaction.atomic():
+        StaffingForecast.objects.all().delete()
+        StaffingForecast.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _pick(rows_by_weekday, weekday):
+    row = rows_by_weekday.get(weekday)
+    if row and row.shifts_sampled >= MIN_SHIFTS_SAMPLED:
+        return row
+    fallback = rows_by_weekday.get(StaffingForecast.ALL_WEEKDAYS)
+    if fallback and fallback.shifts_sampled >= MIN_SHIFTS_SAMPLED:
+        return fallback
+    return None
+
+
+def forecast_for(store_id, role, shift_date):
+    """The StaffingForecast row to use for one prospective shift, or None without enough history"""
+    rows = StaffingForecast.objects.filter(
+        store_id=store_id, role_required=role,
+        weekday__in=[shift_date.isoweekday(), StaffingForecast.ALL_WEEKDAYS]
+    )
+    return _pick({row.weekday: row for row in rows}, shift_date.isoweekday())
+
+
+def upcoming_forecast(stores, start=None, days=DEFAULT_HORIZON_DAYS):
+    """
+    Forecast rows for each store x role x date in the horizon, with the
+    slots already posted, as dicts sorted by date and store.
+    """
+    start = start or timezone.now().date()
+    end = start + timedelta(days=days - 1)
+    store_ids = [store.id for store in stores]
+
+    by_group = defaultdict(dict)
+    for row in StaffingForecast.objects.filter(store_id__in=store_ids).select_related('store'):
+        by_group[(row.store_id, row.role_required)][row.weekday] = row
+
+    posted = {
+        (row['store_id'], row['role_required'], row['shift_date']): row['slots']
+        for row in Shift.objects.filter(
+            store_id__in=store_ids, shift_date__range=(start, end)
+        ).exclude(status='cancelled').values('store_id', 'role_required', 'shift_date').annotate(
+            slots=Sum('slots_available')
+        ).order_by()
+    }
+
+    forecast = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for (store_id, role), rows_by_weekday in by_group.items():
+            row = _pick(rows_by_weekday, day.isoweekday())
+            if row is None:
+                continue
+            forecast.append({
+                'date': day,
+                'store': row.store,
+                'role_required': role,
+                'role_display': dict(Shift.ROLE_CHOICES).get(role, role),
+                'expected_volunteers': row.expected_volunteers,
+                'fill_rate': row.fill_rate,
+                'avg_hours_to_fill': row.avg_hours_to_fill,
+                'suggested_slots': row.suggested_slots,
+                'posted_slots': posted.get((store_id, role, day), 0),
+            })
+    forecast.sort(key=lambda item: (item['date'], item['store'].name, item['role_required']))
+    return forecast
@@ -0,0 +1,36 @@
+from django import forms
+from django.core.validators import RegexValidator
+from apps.user_authentication.models import AuditLog
+
+
+class AuditLogFilterForm(forms.Form):
+    user = forms.CharField(required=False, label='Username',
+                           widget=forms.TextInput(attrs={'class': 'form-control'}))
+    action = forms.ChoiceField(required=False, choices=[('', 'Any action')] + AuditLog.ACTION_CHOICES,
+                               widget=forms.Select(attrs={'class': 'form-control'}))
+    date_from = forms.DateField(required=False,
+                                widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    date_to = forms.DateField(required=False,
+                              widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    ip = forms.GenericIPAddressField(required=False, label='IP address',
+                                     widget=forms.TextInput(attrs={'class': 'form-control'}))
+    detail_key = forms.CharField(
+        required=False, label='Details key',
+        validators=[RegexValidator(r'^[A-Za-z_]\w*$', 'Use a plain key name such as shift_id.')],
+        help_text=f"Indexed: {', '.join(AuditLog.INDEXED_DETAIL_KEYS)}",
+        widget=forms.TextInput(attrs={'class': 'form-control', 'list': 'detail-keys'})
+    )
+    detail_value = forms.CharField(required=False, label='Details value',
+                                   widget=forms.TextInput(attrs={'class': 'form-control'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("The start date must not be after the end date.")
+        if cleaned_data.get('detail_value') and not cleaned_data.get('detail_key'):
+            self.add_error('detail_key', 'Choose which details key to match.')
+
+        return cleaned_data
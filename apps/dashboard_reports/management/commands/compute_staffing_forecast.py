@@ -0,0 +1,15 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.dashboard_reports.forecast import recompute_forecasts
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the staffing forecast (fill rate and time-to-fill per store x role x weekday)'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = recompute_forecasts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Computed {count} forecast rows in {time.perf_counter() - started:.2f}s'
+        ))
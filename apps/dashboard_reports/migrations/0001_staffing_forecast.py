@@ -0,0 +1,68 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("shift_management", "0003_shifthistory_change_feed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StaffingForecast",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role_required",
+                    models.CharField(
+                        choices=[
+                            ("cashier", "Cashier"),
+                            ("stocker", "Stocker"),
+                            ("sales_associate", "Sales Associate"),
+                            ("supervisor", "Supervisor"),
+                            ("cleaner", "Cleaner"),
+                        ],
+                        max_length=50,
+                    ),
+                ),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        help_text="ISO weekday, 1 = Monday; 0 = all weekdays"
+                    ),
+                ),
+                ("shifts_sampled", models.PositiveIntegerField()),
+                ("slots_offered", models.PositiveIntegerField()),
+                (
+                    "volunteers",
+                    models.PositiveIntegerField(help_text="Applications not withdrawn"),
+                ),
+                ("approved", models.PositiveIntegerField()),
+                ("avg_hours_to_fill", models.FloatField(blank=True, null=True)),
+                ("computed_at", models.DateTimeField(auto_now=True)),
+                (
+                    "store",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="staffing_forecasts",
+                        to="shift_management.store",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("store", "role_required", "weekday")},
+            },
+        ),
+    ]
@@ -1,3 +1,45 @@
 from django.db import models
+from apps.shift_management.models import Shift, Store
 
 # Models for dashboard and reports (using existing models from other apps)
+
+
+class StaffingForecast(models.Model):
+    """
+    Historical staffing stats per store x role x ISO weekday.
+
+    Rebuilt in full by `manage.py compute_staffing_forecast`; weekday 0 holds
+    the role's totals across all weekdays, used when a weekday has too little
+    history of its own.
+    """
+    ALL_WEEKDAYS = 0
+
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='staffing_forecasts')
+    role_required = models.CharField(max_length=50, choices=Shift.ROLE_CHOICES)
+    weekday = models.PositiveSmallIntegerField(help_text='ISO weekday, 1 = Monday; 0 = all weekdays')
+    shifts_sampled = models.PositiveIntegerField()
+    slots_offered = models.PositiveIntegerField()
+    volunteers = models.PositiveIntegerField(help_text='Applications not withdrawn')
+    approved = models.PositiveIntegerField()
+    avg_hours_to_fill = models.FloatField(null=True, blank=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['store', 'role_required', 'weekday']
+
+    def __str__(self):
+        return f"{self.store.name} {self.role_required} weekday {self.weekday}"
+
+    @property
+    def fill_rate(self):
+        """Share of offered slots that ended up approved"""
+        return self.approved / self.slots_offered if self.slots_offered else 0.0
+
+    @property
+    def expected_volunteers(self):
+        """Average number of people who volunteer for one such shift"""
+        return self.volunteers / self.shifts_sampled if self.shifts_sampled else 0.0
+
+    @property
+    def suggested_slots(self):
+        return max(1, round(self.expected_volunteers))
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.user_authentication.models import CustomUser
+from apps.shift_management.models import Shift, ShiftVolunteer, Store
+from apps.notifications.models import Notification
+from . import summary
+
+
+@receiver(post_save, sender=Shift)
+@receiver(post_delete, sender=Shift)
+def shift_changed(sender, instance, **kwargs):
+    summary.invalidate_global()
+    summary.invalidate_users([instance.manager_id])
+
+
+@receiver(post_save, sender=ShiftVolunteer)
+@receiver(post_delete, sender=ShiftVolunteer)
+def application_changed(sender, instance, **kwargs):
+    summary.invalidate_global()
+    manager_id = Shift.objects.filter(id=instance.shift_id).values_list('manager_id', flat=True).first()
+    summary.invalidate_users([instance.volunteer_id, manager_id])
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    summary.invalidate_users([instance.recipient_id])
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def store_changed(sender, instance, **kwargs):
+    summary.invalidate_global()
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Every login saves last_login; that must not flush the shared summary
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    if created:
+        summary.invalidate_global()
+    summary.invalidate_users([instance.id])
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    summary.invalidate_global()
+    summary.invalidate_users([instance.id])
@@ -0,0 +1,184 @@
+"""
+Cached dashboard summaries.
+
+dashboard_view is the post-login landing page, so its counts are cached with
+a short TTL: one shared entry for company-wide numbers and one small entry per
+user. The shared entry holds a summary per region (helping_hand_core.tenancy),
+so region managers only ever count their own region's rows. Signals in
+signals.py drop the affected entries when Shift, ShiftVolunteer,
+Notification, Store or CustomUser rows change; bulk write paths that bypass
+signals call invalidate_users() themselves.
+
+The a*-prefixed functions are the async-ORM equivalents used by the ASGI views.
+"""
+import asyncio
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from apps.user_authentication.models import CustomUser
+from apps.shift_management.models import Shift, ShiftVolunteer, Store
+from apps.notifications.models import Notification
+from helping_hand_core.tenancy import current_region
+
+SUMMARY_TTL = 60
+
+GLOBAL_KEY = 'dashboard:global'
+
+
+def _user_key(user_id):
+    return f'dashboard:user:{user_id}'
+
+
+# Each summary is described once as {name: queryset} plus an optional aggregate,
+# then evaluated either synchronously or concurrently with the async ORM.
+
+def _global_specs():
+    today = timezone.now().date()
+    staff = CustomUser.objects.filter(role='staff')
+    if current_region() is not None:
+        staff = staff.filter(region_id=current_region())
+    counts = {
+        'pending_applications': ShiftVolunteer.in_region.filter(status='pending'),
+        'total_staff': staff,
+        'total_stores': Store.in_region.filter(is_active=True),
+    }
+    aggregate = (Shift.in_region, dict(
+        total_shifts=Count('id'),
+        open_shifts=Count('id', filter=Q(status='open')),
+        available_shifts=Count('id', filter=Q(status='open', shift_date__gte=today)),
+    ))
+    lists = {
+        'recent_shifts': Shift.in_region.select_related('store', 'manager').order_by('-created_at')[:5],
+        'recent_applications': (ShiftVolunteer.in_region.select_related('shift', 'volunteer')
+                                .order_by('-applied_at')[:5]),
+    }
+    return counts, aggregate, lists
+
+
+def _user_specs(user):
+    counts = {
+        'unread_notifications': Notification.objects.filter(recipient=user, is_read=False),
+    }
+    aggregate = None
+    if user.is_staff_member():
+        aggregate = (ShiftVolunteer.objects.filter(volunteer=user), dict(
+            my_applications=Count('id'),
+            approved_shifts=Count('id', filter=Q(status='approved')),
+        ))
+    elif user.is_manager():
+        counts['total_shifts'] = Shift.objects.filter(manager=user)
+        counts['pending_applications'] = ShiftVolunteer.objects.filter(manager=user, status='pending')
+    return counts, aggregate, {}
+
+
+def _evaluate(specs):
+    counts, aggregate, lists = specs
+    summary = {name: queryset.count() for name, queryset in counts.items()}
+    if aggregate:
+        summary.update(aggregate[0].aggregate(**aggregate[1]))
+    summary.update({name: list(queryset) for name, queryset in lists.items()})
+    return summary
+
+
+async def _aevaluate(specs):
+    counts, aggregate, lists = specs
+
+    async def to_list(queryset):
+        return [obj async for obj in queryset]
+
+    names = list(counts) + list(lists)
+    results = await asyncio.gather(
+        *(queryset.acount() for queryset in counts.values()),
+        *(to_list(queryset) for queryset in lists.values()),
+        *([aggregate[0].aaggregate(**aggregate[1])] if aggregate else []),
+    )
+    summary = dict(zip(names, results))
+    if aggregate:
+        summary.update(results[-1])
+    return summary
+
+
+def _cached_region(entries):
+    """The current region's summary from the shared entry, if still fresh"""
+    computed_at, summary = (entries or {}).get(current_region(), (0, None))
+    return summary if time.time() - computed_at < SUMMARY_TTL else None
+
+
+def _with_region(entries, summary):
+    # Entries of other regions are kept; a concurrent writer may drop one, which only costs a recount
+    entries = dict(entries or {})
+    entries[current_region()] = (time.time(), summary)
+    return entries
+
+
+def get_global_summary():
+    """Company-wide (or, inside a region scope, region-wide) counts shared by every manager and admin"""
+    entries = cache.get(GLOBAL_KEY)
+    summary = _cached_region(entries)
+    if summary is None:
+        summary = _evaluate(_global_specs())
+        cache.set(GLOBAL_KEY, _with_region(entries, summary), SUMMARY_TTL)
+    return summary
+
+
+def get_user_summary(user):
+    """Counts that depend on who is looking"""
+    summary = cache.get(_user_key(user.id))
+    if summary is None:
+        summary = _evaluate(_user_specs(user))
+        cache.set(_user_key(user.id), summary, SUMMARY_TTL)
+    return summary
+
+
+async def aget_global_summary():
+    entries = await cache.aget(GLOBAL_KEY)
+    summary = _cached_region(entries)
+    if summary is None:
+        summary = await _aevaluate(_global_specs())
+        await cache.aset(GLOBAL_KEY, _with_region(entries, summary), SUMMARY_TTL)
+    return summary
+
+
+async def aget_user_summary(user):
+    summary = await cache.aget(_user_key(user.id))
+    if summary is None:
+        summary = await _aevaluate(_user_specs(user))
+        await cache.aset(_user_key(user.id), summary, SUMMARY_TTL)
+    return summary
+
+
+def _combine(user, user_summary, global_summary):
+    if user.is_staff_member():
+        return {
+            'unread_notifications': user_summary['unread_notifications'],
+            'available_shifts': global_summary['available_shifts'],
+            'my_applications': user_summary['my_applications'],
+            'approved_shifts': user_summary['approved_shifts'],
+        }
+    if user.is_manager() or user.is_admin():
+        summary = dict(global_summary)
+        del summary['available_shifts']
+        # Managers see their own shift and queue counts; admins see the global ones
+        summary.update(user_summary)
+        return summary
+    return dict(user_summary)
+
+
+def get_dashboard_summary(user):
+    """Everything dashboard_view shows for this user's role"""
+    return _combine(user, get_user_summary(user), get_global_summary())
+
+
+async def aget_dashboard_summary(user):
+    user_summary, global_summary = await asyncio.gather(aget_user_summary(user), aget_global_summary())
+    return _combine(user, user_summary, global_summary)
+
+
+def invalidate_global():
+    cache.delete(GLOBAL_KEY)
+
+
+def invalidate_users(user_ids):
+    cache.delete_many([_user_key(user_id) for user_id in set(user_ids) if user_id])
@@ -1,5 +1,20 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.db.models import F
+from django.test import AsyncRequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils import timezone
+from apps.shift_management.models import Store, Shift, ShiftVolunteer
+from apps.user_authentication.models import AuditLog, DetailValue
+from apps.notifications.models import Notification
+from apps.dashboard_reports.forecast import HoursBetween, forecast_for, recompute_forecasts
+from apps.dashboard_reports.models import StaffingForecast
+from apps.dashboard_reports.summary import get_dashboard_summary, aget_dashboard_summary
+from apps.dashboard_reports.views import dashboard_view_async, reports_view_async
 
 User = get_user_model()
 
@@ -92,3 +107,259 @@ class DashboardViewTestCase(TestCase):
         response = self.client.get('/dashboard/reports/export-volunteers/')
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response['Content-Type'], 'text/csv')
+
+    def test_export_volunteers_csv_rows(self):
+        """Test the volunteers export streams one row per application from the copied shift columns"""
+        store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                     state='KA', zip_code='560001', phone='1234567890')
+        shift = Shift.objects.create(
+            store=store, manager=self.manager_user, title='Weekend Rush', description='Help out',
+            role_required='cashier', shift_date=date.today() + timedelta(days=3),
+            start_time=time(9, 0), end_time=time(17, 0)
+        )
+        self.staff_user.first_name, self.staff_user.last_name = 'Asha', 'Rao'
+        self.staff_user.save()
+        ShiftVolunteer.objects.create(shift=shift, volunteer=self.staff_user, status='approved',
+                                      reviewed_by=self.manager_user, reviewed_at=timezone.now())
+        self.client.login(username='admin', password='pass123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/dashboard/reports/export-volunteers/')
+            lines = b''.join(response.streaming_content).decode().strip().splitlines()
+        export_sql = [q['sql'] for q in queries if 'shift_management_' in q['sql']]
+        self.assertEqual(len(export_sql), 3)  # applications, then shift titles and store names
+        self.assertNotIn('JOIN', export_sql[0])
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f'Asha Rao,staff@test.com,Weekend Rush,Store 1,{shift.shift_date},'
+                                            f'Approved,'))
+        self.assertIn(',manager,', lines[1])
+
+
+class DashboardSummaryCacheTestCase(TestCase):
+    """Test the cached dashboard summary and its invalidation"""
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='pass123', role='manager')
+        self.other_manager = User.objects.create_user(username='manager2', password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff', password='pass123', role='staff')
+        self.store = Store.objects.create(name='Central Mart', address='1 Main St', city='Mysuru',
+                                          state='KA', zip_code='570001', phone='1234567890')
+
+    def tearDown(self):
+        cache.clear()
+
+    def _create_shift(self):
+        return Shift.objects.create(
+            store=self.store, manager=self.manager, title='Weekend', description='Help',
+            role_required='cashier', shift_date=date.today() + timedelta(days=1),
+            start_time=time(9, 0), end_time=time(17, 0)
+        )
+
+    def test_global_counts_shared_between_managers(self):
+        """Test a second manager reuses the cached company-wide counts"""
+        self.client.login(username='manager', password='pass123')
+        self.client.get('/dashboard/')
+        self.client.login(username='manager2', password='pass123')
+        self.client.get('/dashboard/')  # warm manager2's own entry
+        with self.assertNumQueries(5):  # session load/save and user lookup only
+            response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['total_stores'], 1)
+
+    def test_summary_invalidated_by_writes(self):
+        """Test shift, application and notification writes refresh the cached counts"""
+        self.client.login(username='staff', password='pass123')
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['available_shifts'], 0)
+
+        shift = self._create_shift()
+        ShiftVolunteer.objects.create(shift=shift, volunteer=self.staff)
+        Notification.objects.create(recipient=self.staff, notification_type='system', title='Hi', message='Hi')
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['available_shifts'], 1)
+        self.assertEqual(response.context['my_applications'], 1)
+        self.assertEqual(response.context['unread_notifications'], 1)
+
+    def test_manager_sees_own_pending_queue(self):
+        """Test managers get their own pending count, not the global one"""
+        shift = self._create_shift()
+        ShiftVolunteer.objects.create(shift=shift, volunteer=self.staff)
+        self.client.login(username='manager2', password='pass123')
+        response = self.client.get('/dashboard/')
+        self.assertEqual(response.context['pending_applications'], 0)
+        self.assertEqual(response.context['open_shifts'], 1)
+
+
+class AsyncDashboardViewTestCase(TestCase):
+    """Test the ASGI variants of the dashboard and reports views"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+        self.manager = User.objects.create_user(username='manager', password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff', password='pass123', role='staff')
+        self.store = Store.objects.create(name='Central Mart', address='1 Main St', city='Mysuru',
+                                          state='KA', zip_code='570001', phone='1234567890')
+        shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Weekend', description='Help',
+            role_required='cashier', shift_date=date.today() + timedelta(days=1),
+            start_time=time(9, 0), end_time=time(17, 0)
+        )
+        ShiftVolunteer.objects.create(shift=shift, volunteer=self.staff)
+
+    def tearDown(self):
+        cache.clear()
+
+    async def test_async_summary_matches_sync(self):
+        """Test the gathered async summary equals the sync one for every role"""
+        for user in (self.manager, self.staff):
+            expected = await sync_to_async(get_dashboard_summary)(user)
+            await cache.aclear()
+            self.assertEqual(await aget_dashboard_summary(user), expected)
+
+    async def test_async_reports_view(self):
+        """Test the async reports page renders for managers and redirects anonymous users"""
+        request = self.factory.get('/dashboard/reports/')
+        request.user = self.manager
+        response = await reports_view_async(request)
+        self.assertEqual(response.status_code, 200)
+
+        request = self.factory.get('/dashboard/reports/')
+        request.user = AnonymousUser()
+        response = await dashboard_view_async(request)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/auth/login/', response['Location'])
+
+
+class AuditLogViewerTestCase(TestCase):
+    """Test audit log filters, keyset paging and export"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username='admin', password='pass123', role='admin')
+        self.manager = User.objects.create_user(username='manager', password='pass123', role='manager')
+        # All rows share one timestamp so paging has to break ties on id
+        AuditLog.objects.bulk_create([
+            AuditLog(user=self.manager, action='approve', description=f'Approved {i}',
+                     ip_address='10.0.0.1', details={'application_id': i})
+            for i in range(60)
+        ] + [AuditLog(user=self.admin, action='login', description='Login', ip_address='10.0.0.2')])
+        AuditLog.objects.update(timestamp=timezone.now())
+        self.client.login(username='admin', password='pass123')
+
+    def test_keyset_paging_walks_every_row_once(self):
+        """Test following next cursors visits each matching row exactly once, newest first"""
+        seen, cursor = [], None
+        while True:
+            params = {'action': 'approve'}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.client.get('/dashboard/audit-logs/', params)
+            seen += [log.id for log in response.context['logs']]
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+        expected = list(AuditLog.objects.filter(action='approve').order_by('-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_filters(self):
+        """Test user, IP and details-key filters"""
+        response = self.client.get('/dashboard/audit-logs/', {'user': 'admin'})
+        self.assertEqual([log.action for log in response.context['logs']], ['login'])
+        response = self.client.get('/dashboard/audit-logs/', {'ip': '10.0.0.2'})
+        self.assertEqual(len(response.context['logs']), 1)
+        response = self.client.get('/dashboard/audit-logs/', {'detail_key': 'application_id', 'detail_value': '7'})
+        self.assertEqual([log.description for log in response.context['logs']], ['Approved 7'])
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        response = self.client.get('/dashboard/audit-logs/', {'date_from': tomorrow})
+        self.assertEqual(list(response.context['logs']), [])
+
+    def test_detail_value_on_mysql(self):
+        """Test the details-key expression avoids CAST ... AS TEXT on MySQL"""
+        queryset = AuditLog.objects.annotate(value=DetailValue('shift_id'))
+        sql, _ = queryset.query.annotations['value'].as_mysql(queryset.query.get_compiler('default'), connection)
+        self.assertRegex(sql, r"^CAST\(JSON_UNQUOTE\(JSON_EXTRACT\(.*, '\$\.shift_id'\)\) AS CHAR\(255\)\)$")
+
+    def test_export_streams_filtered_rows(self):
+        """Test the CSV export streams every matching row, not just one page"""
+        response = self.client.get('/dashboard/audit-logs/export/', {'user': 'manager'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().strip().splitlines()
+        self.assertEqual(len(lines), 61)  # header + 60 rows
+
+    def test_non_admin_denied(self):
+        """Test managers can't read or export the audit log"""
+        self.client.login(username='manager', password='pass123')
+        response = self.client.get('/dashboard/audit-logs/')
+        self.assertTemplateUsed(response, 'dashboard_reports/access_denied.html')
+        response = self.client.get('/dashboard/audit-logs/export/')
+        self.assertEqual(response.status_code, 403)
+
+
+class StaffingForecastTestCase(TestCase):
+    """Test fill-rate stats, the forecast lookup and slot suggestions"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='pass123', role='manager')
+        self.store = Store.objects.create(name='Central Mart', address='1 Main St', city='Mysuru',
+                                          state='KA', zip_code='570001', phone='1234567890', manager=self.manager)
+        self.volunteers = [User.objects.create_user(username=f'staff{i}', password='pass123', role='staff')
+                           for i in range(4)]
+        # Four past Mondays, 4 slots each; 3 people apply, 2 are approved a day after posting
+        self.monday = date.today() - timedelta(days=date.today().weekday() + 7)
+        for week in range(4):
+            shift = Shift.objects.create(
+                store=self.store, manager=self.manager, title='Monday till', description='Till',
+                role_required='cashier', shift_date=self.monday - timedelta(weeks=week),
+                start_time=time(9, 0), end_time=time(17, 0), slots_available=4, status='completed'
+            )
+            Shift.objects.filter(id=shift.id).update(
+                created_at=timezone.make_aware(datetime.combine(shift.shift_date, time(9, 0))) - timedelta(days=3)
+            )
+            shift.refresh_from_db()
+            for i, status in enumerate(['approved', 'approved', 'rejected', 'withdrawn']):
+                ShiftVolunteer.objects.create(
+                    shift=shift, volunteer=self.volunteers[i], status=status,
+                    reviewed_at=shift.created_at + timedelta(days=1) if status == 'approved' else None
+                )
+        self.assertEqual(recompute_forecasts(), 2)  # Monday row + all-weekday row
+
+    def test_weekday_stats(self):
+        """Test fill rate, expected volunteers and time to fill for the weekday group"""
+        row = StaffingForecast.objects.get(store=self.store, role_required='cashier', weekday=1)
+        self.assertEqual((row.shifts_sampled, row.slots_offered, row.volunteers, row.approved), (4, 16, 12, 8))
+        self.assertAlmostEqual(row.fill_rate, 0.5)
+        self.assertAlmostEqual(row.expected_volunteers, 3.0)
+        self.assertAlmostEqual(row.avg_hours_to_fill, 24.0, places=3)
+        self.assertEqual(row.suggested_slots, 3)
+
+    def test_forecast_falls_back_to_all_weekdays(self):
+        """Test a weekday without history uses the role's all-weekday row"""
+        next_monday = self.monday + timedelta(weeks=2)
+        self.assertEqual(forecast_for(self.store.id, 'cashier', next_monday).weekday, 1)
+        self.assertEqual(forecast_for(self.store.id, 'cashier', next_monday + timedelta(days=1)).weekday, 0)
+        self.assertIsNone(forecast_for(self.store.id, 'stocker', next_monday))
+
+    def test_create_shift_prefills_suggestion(self):
+        """Test create_shift suggests slots from the forecast for the chosen store/role/date"""
+        self.client.login(username='manager', password='pass123')
+        next_monday = self.monday + timedelta(weeks=2)
+        response = self.client.get('/shifts/manager/create/', {
+            'store': self.store.id, 'role_required': 'cashier', 'shift_date': next_monday.isoformat()
+        })
+        form = response.context['form']
+        self.assertEqual(form.initial['slots_available'], 3)
+        self.assertIn('suggested 3 slots', form.fields['slots_available'].help_text)
+
+    def test_reports_show_upcoming_forecast(self):
+        """Test the reports page lists forecast rows for the manager's store"""
+        self.client.login(username='manager', password='pass123')
+        response = self.client.get('/dashboard/reports/')
+        forecast = response.context['forecast']
+        self.assertEqual(len(forecast), 14)
+        self.assertTrue(all(row['store'] == self.store and row['posted_slots'] == 0 for row in forecast))
+
+    def test_hours_between_on_mysql(self):
+        """Test the MySQL form passes TIMESTAMPDIFF the start before the end"""
+        queryset = ShiftVolunteer.objects.annotate(hours=HoursBetween(F('reviewed_at'), F('shift__created_at')))
+        sql, _ = queryset.query.annotations['hours'].as_mysql(queryset.query.get_compiler('default'), connection)
+        self.assertRegex(sql, r'^TIMESTAMPDIFF\(SECOND, "shift_management_shift"\."created_at", '
+                              r'"shift_management_shiftvolunteer"\."reviewed_at"\)')
@@ -1,10 +1,15 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+dashboard_view = views.dashboard_view_async if settings.ASYNC_VIEWS else views.dashboard_view
+reports_view = views.reports_view_async if settings.ASYNC_VIEWS else views.reports_view
+
 urlpatterns = [
-    path('', views.dashboard_view, name='dashboard'),
-    path('reports/', views.reports_view, name='reports'),
+    path('', dashboard_view, name='dashboard'),
+    path('reports/', reports_view, name='reports'),
     path('reports/export-shifts/', views.export_shifts_csv, name='export_shifts_csv'),
     path('reports/export-volunteers/', views.export_volunteers_csv, name='export_volunteers_csv'),
     path('audit-logs/', views.audit_log_view, name='audit_logs'),
+    path('audit-logs/export/', views.export_audit_log_csv, name='export_audit_log_csv'),
 ]
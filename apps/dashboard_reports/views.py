@@ -1,44 +1,65 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
-from django.utils import timezone
-from django.http import HttpResponse
-from apps.user_authentication.models import CustomUser, AuditLog
+from django.db.models import Q
+from django.http import HttpResponse, StreamingHttpResponse
+from apps.user_authentication.models import AuditLog
 from apps.shift_management.models import Shift, ShiftVolunteer, Store
-from apps.notifications.models import Notification
-import csv
+from apps.shift_management.stats import top_volunteers as volunteer_leaderboard
+from helping_hand_core.asyncviews import async_login_required, arender
+from .forecast import upcoming_forecast
+from .audit import filter_audit_logs, keyset_page, stream_audit_csv
+from .exports import stream_volunteers_csv
+from .forms import AuditLogFilterForm
+from .summary import get_dashboard_summary, aget_dashboard_summary
 
 
 @login_required
 def dashboard_view(request):
-    """Main dashboard - role-specific content"""
-    user = request.user
+    """Main dashboard - role-specific content served from the cached summary"""
+    context = {'user': request.user}
+    context.update(get_dashboard_summary(request.user))
+    return render(request, 'dashboard_reports/dashboard.html', context)
+
+
+@async_login_required
+async def dashboard_view_async(request):
+    """ASGI version of dashboard_view: cache misses run their counts concurrently"""
+    context = {'user': request.user}
+    context.update(await aget_dashboard_summary(request.user))
+    return await arender(request, 'dashboard_reports/dashboard.html', context)
+
+
+def _report_queries(date_from, date_to):
+    """Querysets behind the reports page: {stat name: queryset to count}"""
+    shifts_query = Shift.in_region.all()
+    if date_from:
+        shifts_query = shifts_query.filter(shift_date__gte=date_from)
+    if date_to:
+        shifts_query = shifts_query.filter(shift_date__lte=date_to)
     
-    context = {
-        'user': user,
-        'unread_notifications': Notification.objects.filter(recipient=user, is_read=False).count()
+    counts = {
+        'total_shifts': shifts_query,
+        'open_shifts': shifts_query.filter(status='open'),
+        'filled_shifts': shifts_query.filter(status='filled'),
+        'cancelled_shifts': shifts_query.filter(status='cancelled'),
+        'total_applications': ShiftVolunteer.in_region.all(),
+        'approved_applications': ShiftVolunteer.in_region.filter(status='approved'),
+        'rejected_applications': ShiftVolunteer.in_region.filter(status='rejected'),
+        'pending_applications': ShiftVolunteer.in_region.filter(status='pending'),
     }
     
-    if user.is_staff_member():
-        context['available_shifts'] = Shift.objects.filter(
-            status='open', shift_date__gte=timezone.now().date()
-        ).count()
-        context['my_applications'] = ShiftVolunteer.objects.filter(volunteer=user).count()
-        context['approved_shifts'] = ShiftVolunteer.objects.filter(
-            volunteer=user, status='approved'
-        ).count()
-    elif user.is_manager() or user.is_admin():
-        context['total_shifts'] = Shift.objects.filter(manager=user).count() if user.is_manager() else Shift.objects.count()
-        context['open_shifts'] = Shift.objects.filter(status='open').count()
-        context['pending_applications'] = ShiftVolunteer.objects.filter(
-            shift__manager=user if user.is_manager() else Q(), status='pending'
-        ).count() if user.is_manager() else ShiftVolunteer.objects.filter(status='pending').count()
-        context['total_staff'] = CustomUser.objects.filter(role='staff').count()
-        context['total_stores'] = Store.objects.filter(is_active=True).count()
-        context['recent_shifts'] = Shift.objects.select_related('store', 'manager').order_by('-created_at')[:5]
-        context['recent_applications'] = ShiftVolunteer.objects.select_related('shift', 'volunteer').order_by('-applied_at')[:5]
-    
-    return render(request, 'dashboard_reports/dashboard.html', context)
+    return counts
+
+
+def _staffing_forecast(user):
+    """Upcoming forecast rows for the stores this user plans for"""
+    stores = Store.in_region.filter(is_active=True)
+    if not user.is_admin():
+        stores = stores.filter(Q(manager=user) | Q(shifts__manager=user)).distinct()
+    return upcoming_forecast(list(stores))
 
 
 @login_required
@@ -46,38 +67,42 @@ def reports_view(request):
     """Reports page for admins and managers"""
     if not (request.user.is_admin() or request.user.is_manager()):
         return render(request, 'dashboard_reports/access_denied.html')
-    
+
     date_from = request.GET.get('date_from')
     date_to = request.GET.get('date_to')
+    counts = _report_queries(date_from, date_to)
+    stats = {name: queryset.count() for name, queryset in counts.items()}
     
-    shifts_query = Shift.objects.all()
-    if date_from:
-        shifts_query = shifts_query.filter(shift_date__gte=date_from)
-    if date_to:
-        shifts_query = shifts_query.filter(shift_date__lte=date_to)
-    
-    stats = {
-        'total_shifts': shifts_query.count(),
-        'open_shifts': shifts_query.filter(status='open').count(),
-        'filled_shifts': shifts_query.filter(status='filled').count(),
-        'cancelled_shifts': shifts_query.filter(status='cancelled').count(),
-        'total_applications': ShiftVolunteer.objects.count(),
-        'approved_applications': ShiftVolunteer.objects.filter(status='approved').count(),
-        'rejected_applications': ShiftVolunteer.objects.filter(status='rejected').count(),
-        'pending_applications': ShiftVolunteer.objects.filter(status='pending').count(),
-    }
-    
-    top_volunteers = CustomUser.objects.filter(role='staff').annotate(
-        approved_count=Count('shift_applications', filter=Q(shift_applications__status='approved'))
-    ).order_by('-approved_count')[:10]
-    
-    context = {'stats': stats, 'top_volunteers': top_volunteers, 'date_from': date_from, 'date_to': date_to}
+    context = {'stats': stats, 'top_volunteers': volunteer_leaderboard(), 'date_from': date_from, 'date_to': date_to,
+               'forecast': _staffing_forecast(request.user)}
     return render(request, 'dashboard_reports/reports.html', context)
 
 
+@async_login_required
+async def reports_view_async(request):
+    """ASGI version of reports_view: every count is awaited concurrently"""
+    if not (request.user.is_admin() or request.user.is_manager()):
+        return await arender(request, 'dashboard_reports/access_denied.html')
+
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    counts = _report_queries(date_from, date_to)
+    *values, top_volunteers, forecast = await asyncio.gather(
+        *(queryset.acount() for queryset in counts.values()), sync_to_async(volunteer_leaderboard)(),
+        sync_to_async(_staffing_forecast)(request.user)
+    )
+    stats = dict(zip(counts, values))
+
+    context = {'stats': stats, 'top_volunteers': top_volunteers, 'date_from': date_from, 'date_to': date_to,
+               'forecast': forecast}
+    return await arender(request, 'dashboard_reports/reports.html', context)
+
+
 @login_required
 def export_shifts_csv(request):
     """Export shifts to CSV"""
+    import csv  # only the export path needs it
+
     if not (request.user.is_admin() or request.user.is_manager()):
         return HttpResponse('Unauthorized', status=403)
     
@@ -87,7 +112,7 @@ def export_shifts_csv(request):
     writer = csv.writer(response)
     writer.writerow(['Title', 'Store', 'Manager', 'Date', 'Start Time', 'End Time', 'Role', 'Slots', 'Status', 'Created At'])
     
-    shifts = Shift.objects.select_related('store', 'manager').all()
+    shifts = Shift.in_region.select_related('store', 'manager').all()
     for shift in shifts:
         writer.writerow([shift.title, shift.store.name, shift.manager.username, shift.shift_date,
                         shift.start_time, shift.end_time, shift.get_role_required_display(),
@@ -99,32 +124,52 @@ def export_shifts_csv(request):
 
 @login_required
 def export_volunteers_csv(request):
-    """Export volunteer applications to CSV"""
+    """Stream volunteer applications as CSV"""
     if not (request.user.is_admin() or request.user.is_manager()):
         return HttpResponse('Unauthorized', status=403)
     
-    response = HttpResponse(content_type='text/csv')
+    response = StreamingHttpResponse(stream_volunteers_csv(ShiftVolunteer.in_region.all()), content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="volunteers_report.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(['Volunteer', 'Email', 'Shift', 'Store', 'Date', 'Status', 'Applied At', 'Reviewed By', 'Reviewed At'])
-    
-    applications = ShiftVolunteer.objects.select_related('volunteer', 'shift', 'shift__store', 'reviewed_by').all()
-    for app in applications:
-        writer.writerow([app.volunteer.get_full_name(), app.volunteer.email, app.shift.title,
-                        app.shift.store.name, app.shift.shift_date, app.get_status_display(),
-                        app.applied_at.strftime('%Y-%m-%d %H:%M:%S'),
-                        app.reviewed_by.username if app.reviewed_by else 'N/A',
-                        app.reviewed_at.strftime('%Y-%m-%d %H:%M:%S') if app.reviewed_at else 'N/A'])
-    
     return response
 
 
 @login_required
 def audit_log_view(request):
-    """View audit logs (admin only)"""
+    """View audit logs (admin only), filtered and keyset-paged"""
     if not request.user.is_admin():
         return render(request, 'dashboard_reports/access_denied.html')
     
-    logs = AuditLog.objects.select_related('user').order_by('-timestamp')[:100]
-    return render(request, 'dashboard_reports/audit_log.html', {'logs': logs})
+    form = AuditLogFilterForm(request.GET or None)
+    logs, next_cursor = [], None
+    if not form.is_bound or form.is_valid():
+        filters = form.cleaned_data if form.is_bound else {}
+        logs, next_cursor = keyset_page(
+            filter_audit_logs(filters).select_related('user'), request.GET.get('cursor')
+        )
+
+    # Filter params without the cursor, for the next-page and export links
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    return render(request, 'dashboard_reports/audit_log.html', {
+        'form': form,
+        'logs': logs,
+        'next_cursor': next_cursor,
+        'query_string': params.urlencode(),
+        'indexed_detail_keys': AuditLog.INDEXED_DETAIL_KEYS,
+    })
+
+
+@login_required
+def export_audit_log_csv(request):
+    """Stream every audit row matching the viewer's filters as CSV (admin only)"""
+    if not request.user.is_admin():
+        return HttpResponse('Unauthorized', status=403)
+
+    form = AuditLogFilterForm(request.GET)
+    if not form.is_valid():
+        return HttpResponse('Invalid filters', status=400)
+
+    response = StreamingHttpResponse(stream_audit_csv(filter_audit_logs(form.cleaned_data)),
+                                     content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="audit_log.csv"'
+    return response
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import Notification, NotificationPreference
 
 
 @admin.register(Notification)
@@ -8,3 +8,10 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ['notification_type', 'is_read', 'created_at']
     search_fields = ['recipient__username', 'title', 'message']
     ordering = ['-created_at']
+
+
+@admin.register(NotificationPreference)
+class NotificationPreferenceAdmin(admin.ModelAdmin):
+    list_display = ['user', 'in_app', 'email', 'webhook', 'language', 'updated_at']
+    list_filter = ['in_app', 'email', 'webhook', 'language']
+    search_fields = ['user__username', 'user__email']
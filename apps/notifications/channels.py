@@ -0,0 +1,184 @@
+"""
+Notification delivery channels.
+
+deliver_notifications() (tasks.py) hands each batch of notification rows to
+dispatch(), which is one "flush". Recipients are split by their
+NotificationPreference; without a row they get in-app only. Each channel
+then receives its share in chunks of NOTIFICATION_BATCH_SIZE:
+
+* in_app  - bulk-inserts Notification rows.
+* email   - opens one mail connection for the whole flush and sends each
+            chunk through it. The body comes from
+            notifications/email/<type>.txt (else default.txt) and is rendered
+            once per type, language and content. A 10k-recipient blast is
+            therefore one render and one connection.
+* webhook - POSTs each chunk as JSON to NOTIFICATION_WEBHOOK_URL; it is
+            off while that is empty.
+
+Channels are listed in settings.NOTIFICATION_CHANNELS; a channel's name is
+the NotificationPreference flag that enables it. The in-app rows of the
+whole flush are written first, in one transaction, and only then do the
+external channels run. An in-app failure therefore rolls back every row
+and propagates before anything was emailed or posted, and the task queue's
+retry starts clean. A failing external channel is logged and skipped
+instead of raising, so a retry can't duplicate in-app notifications.
+"""
+import json
+import logging
+import urllib.request
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import select_template
+from django.utils import translation
+from django.utils.module_loading import import_string
+from apps.user_authentication.models import CustomUser
+from .models import Notification, NotificationPreference
+
+logger = logging.getLogger(__name__)
+
+Recipient = namedtuple('Recipient', ['channels', 'language', 'email'])
+
+DEFAULT_CHANNELS = frozenset({'in_app'})
+
+
+class Channel:
+    """Base class: open() before the first chunk of a flush, send() per chunk, close() at the end"""
+    name = None
+
+    def open(self):
+        pass
+
+    def send(self, rows, recipients):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class InAppChannel(Channel):
+    name = 'in_app'
+
+    def send(self, rows, recipients):
+        Notification.objects.bulk_create([Notification(**row) for row in rows])
+
+
+class EmailChannel(Channel):
+    name = 'email'
+
+    def open(self):
+        self.connection = get_connection()
+        self.connection.open()
+        self.templates = {}
+        self.bodies = {}
+
+    def _body(self, row, language):
+        notification_type = row['notification_type']
+        link = row.get('link', '')
+        key = (notification_type, language, row['title'], row['message'], link)
+        if key not in self.bodies:
+            if notification_type not in self.templates:
+                self.templates[notification_type] = select_template([
+                    f'notifications/email/{notification_type}.txt', 'notifications/email/default.txt'
+                ])
+            with translation.override(language):
+                self.bodies[key] = self.templates[notification_type].render({
+                    'title': row['title'], 'message': row['message'],
+                    'link': settings.SITE_URL.rstrip('/') + link if link.startswith('/') else link,
+                })
+        return self.bodies[key]
+
+    def send(self, rows, recipients):
+        messages = []
+        for row in rows:
+            recipient = recipients[row['recipient_id']]
+            if recipient.email:
+                messages.append(EmailMessage(row['title'], self._body(row, recipient.language),
+                                             to=[recipient.email], connection=self.connection))
+        self.connection.send_messages(messages)
+
+    def close(self):
+        self.connection.close()
+
+
+class WebhookChannel(Channel):
+    name = 'webhook'
+    timeout = 10
+
+    def send(self, rows, recipients):
+        if not settings.NOTIFICATION_WEBHOOK_URL:
+            return
+        request = urllib.request.Request(
+            settings.NOTIFICATION_WEBHOOK_URL, data=json.dumps({'notifications': rows}).encode(),
+            headers={'Content-Type': 'application/json', 'X-Webhook-Token': settings.NOTIFICATION_WEBHOOK_TOKEN},
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def load_channels():
+    return [import_string(path)() for path in settings.NOTIFICATION_CHANNELS.values()]
+
+
+def _recipients(rows):
+    """{user_id: Recipient} for a chunk of rows from two queries (the second only if anyone wants email)"""
+    user_ids = {row['recipient_id'] for row in rows}
+    preferences = {row['user_id']: row for row in NotificationPreference.objects.filter(
+        user_id__in=user_ids
+    ).values('user_id', 'in_app', 'email', 'webhook', 'language')}
+    email_ids = [user_id for user_id, row in preferences.items() if row['email']]
+    emails = dict(CustomUser.objects.filter(id__in=email_ids, is_active=True).exclude(email='').values_list(
+        'id', 'email'
+    )) if email_ids else {}
+
+    recipients = {}
+    for user_id in user_ids:
+        row = preferences.get(user_id)
+        if row is None:
+            recipients[user_id] = Recipient(DEFAULT_CHANNELS, settings.LANGUAGE_CODE, None)
+        else:
+            channels = frozenset(name for name in ('in_app', 'email', 'webhook') if row[name])
+            recipients[user_id] = Recipient(channels, row['language'], emails.get(user_id))
+    return recipients
+
+
+def dispatch(rows, channels=None, batch_size=None):
+    """Deliver notification rows (dicts of Notification fields) on every channel their recipients use"""
+    channels = load_channels() if channels is None else channels
+    batch_size = batch_size or settings.NOTIFICATION_BATCH_SIZE
+    chunks = [rows[offset:offset + batch_size] for offset in range(0, len(rows), batch_size)]
+    chunks = [(chunk, _recipients(chunk)) for chunk in chunks]
+
+    def shares(channel):
+        for chunk, recipients in chunks:
+            share = [row for row in chunk if channel.name in recipients[row['recipient_id']].channels]
+            if share:
+                yield share, recipients
+
+    in_app = [channel for channel in channels if channel.name == InAppChannel.name]
+    with transaction.atomic():
+        for channel in in_app:
+            for share, recipients in shares(channel):
+                channel.send(share, recipients)
+
+    opened = []
+    try:
+        for channel in channels:
+            if channel in in_app:
+                continue
+            for share, recipients in shares(channel):
+                try:
+                    if channel not in opened:
+                        channel.open()
+                        opened.append(channel)
+                    channel.send(share, recipients)
+                except Exception:
+                    logger.exception('%s channel failed for %d notifications', channel.name, len(share))
+    finally:
+        for channel in opened:
+            try:
+                channel.close()
+            except Exception:
+                logger.exception('Closing the %s channel failed', channel.name)
@@ -0,0 +1,17 @@
+from django import forms
+from .models import NotificationPreference
+
+
+class NotificationPreferenceForm(forms.ModelForm):
+    class Meta:
+        model = NotificationPreference
+        fields = ['in_app', 'email', 'webhook', 'language']
+        labels = {
+            'in_app': 'Show notifications here',
+            'email': 'Email me notifications',
+            'webhook': 'Send notifications to the team webhook',
+            'language': 'Email language',
+        }
+        widgets = {
+            'language': forms.Select(attrs={'class': 'form-control'}),
+        }
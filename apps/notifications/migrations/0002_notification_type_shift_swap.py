@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="notification_type",
+            field=models.CharField(
+                choices=[
+                    ("shift_created", "Shift Created"),
+                    ("shift_updated", "Shift Updated"),
+                    ("shift_cancelled", "Shift Cancelled"),
+                    ("application_approved", "Application Approved"),
+                    ("application_rejected", "Application Rejected"),
+                    ("new_application", "New Application"),
+                    ("shift_swap", "Shift Swap"),
+                    ("system", "System Notification"),
+                ],
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_authentication", "0005_customuser_region"),
+        ("notifications", "0002_notification_type_shift_swap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NotificationPreference",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="notification_preference",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("in_app", models.BooleanField(default=True)),
+                ("email", models.BooleanField(default=False)),
+                ("webhook", models.BooleanField(default=False)),
+                (
+                    "language",
+                    models.CharField(
+                        choices=[
+                            ("en-us", "English"),
+                            ("hi", "Hindi"),
+                            ("kn", "Kannada"),
+                        ],
+                        default="en-us",
+                        max_length=10,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
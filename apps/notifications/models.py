@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from apps.user_authentication.models import CustomUser
 
@@ -11,6 +12,7 @@ class Notification(models.Model):
         ('application_approved', 'Application Approved'),
         ('application_rejected', 'Application Rejected'),
         ('new_application', 'New Application'),
+        ('shift_swap', 'Shift Swap'),
         ('system', 'System Notification'),
     ]
     
@@ -27,3 +29,17 @@ class Notification(models.Model):
     
     def __str__(self):
         return f"{self.recipient.username} - {self.title}"
+
+
+class NotificationPreference(models.Model):
+    """Delivery channels a user wants notifications on (see channels.py); no row means in-app only"""
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True,
+                                related_name='notification_preference')
+    in_app = models.BooleanField(default=True)
+    email = models.BooleanField(default=False)
+    webhook = models.BooleanField(default=False)
+    language = models.CharField(max_length=10, choices=settings.LANGUAGES, default=settings.LANGUAGE_CODE)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} notification preferences"
@@ -0,0 +1,16 @@
+from .channels import dispatch
+
+
+def deliver_notification(recipient_id, notification_type, title, message, link=''):
+    deliver_notifications([dict(
+        recipient_id=recipient_id,
+        notification_type=notification_type,
+        title=title,
+        message=message,
+        link=link
+    )])
+
+
+def deliver_notifications(rows):
+    """Deliver many notifications in one flush; rows are dicts of Notification fields"""
+    dispatch(rows)
@@ -1,9 +1,29 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core import mail
+from apps.notifications.channels import EmailChannel, InAppChannel, dispatch
+from apps.notifications.models import Notification, NotificationPreference
+from apps.notifications.tasks import deliver_notifications
+from apps.shift_management.models import Shift, ShiftVolunteer, Store
 
 User = get_user_model()
 
 
+class FlakyInAppChannel(InAppChannel):
+    """In-app channel whose second chunk fails"""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send(self, rows, recipients):
+        self.sent += 1
+        if self.sent == 2:
+            raise RuntimeError('database went away')
+        super().send(rows, recipients)
+
+
 class NotificationViewTestCase(TestCase):
     """Test notification views"""
 
@@ -37,3 +57,105 @@ class NotificationViewTestCase(TestCase):
         response = self.client.post('/notifications/mark-all-read/')
         # Should redirect back to notifications page
         self.assertEqual(response.status_code, 302)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', NOTIFICATION_BATCH_SIZE=2,
+                   SITE_URL='https://shifts.example.com')
+class NotificationChannelTestCase(TestCase):
+    """Test delivery over the in-app, email and webhook channels"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f'staff{i}', email=f'staff{i}@test.com',
+                                               password='pass123', role='staff') for i in range(5)]
+
+    def _rows(self, notification_type='system'):
+        return [dict(recipient_id=user.id, notification_type=notification_type, title='Heads up',
+                     message='Read me', link='/shifts/') for user in self.users]
+
+    def test_no_preference_means_in_app_only(self):
+        """Test users without preferences get in-app notifications and no email"""
+        deliver_notifications(self._rows())
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(mail.outbox, [])
+
+    def test_channels_follow_preferences(self):
+        """Test each channel only gets the users who enabled it"""
+        NotificationPreference.objects.create(user=self.users[0], in_app=False, email=True)
+        NotificationPreference.objects.create(user=self.users[1], email=True, language='hi')
+        deliver_notifications(self._rows())
+        self.assertEqual(set(Notification.objects.values_list('recipient_id', flat=True)),
+                         {user.id for user in self.users[1:]})
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), ['staff0@test.com', 'staff1@test.com'])
+        self.assertIn('https://shifts.example.com/shifts/', mail.outbox[0].body)
+
+    def test_email_flush_uses_one_connection_and_one_render(self):
+        """Test a flush sends every chunk over one connection and renders each body once"""
+        NotificationPreference.objects.bulk_create(
+            [NotificationPreference(user=user, in_app=False, email=True) for user in self.users]
+        )
+        with self.assertTemplateUsed('notifications/email/default.txt', count=1):
+            deliver_notifications(self._rows())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(len({id(message.connection) for message in mail.outbox}), 1)
+
+    def test_in_app_failure_leaves_nothing_for_a_retry_to_repeat(self):
+        """Test a failed in-app chunk rolls back the earlier chunks and nothing is emailed"""
+        NotificationPreference.objects.bulk_create(
+            [NotificationPreference(user=user, email=True) for user in self.users]
+        )
+        with self.assertRaises(RuntimeError):
+            dispatch(self._rows(), channels=[FlakyInAppChannel(), EmailChannel()])
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(mail.outbox, [])
+
+        dispatch(self._rows(), channels=[InAppChannel(), EmailChannel()])
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failing_external_channel_keeps_in_app(self):
+        """Test an unreachable webhook is logged without losing in-app notifications"""
+        NotificationPreference.objects.create(user=self.users[0], webhook=True)
+        with self.settings(NOTIFICATION_WEBHOOK_URL='http://127.0.0.1:9/'), \
+                self.assertLogs('apps.notifications.channels', 'ERROR'):
+            deliver_notifications(self._rows())
+        self.assertEqual(Notification.objects.count(), 5)
+
+    @override_settings(NOTIFICATION_WEBHOOK_TOKEN='secret')
+    def test_webhook_stub_checks_token(self):
+        """Test the webhook stub accepts batches only with the shared token"""
+        payload = '{"notifications": [{"title": "Hi"}]}'
+        response = self.client.post('/notifications/webhook-stub/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        response = self.client.post('/notifications/webhook-stub/', payload, content_type='application/json',
+                                    HTTP_X_WEBHOOK_TOKEN='secret')
+        self.assertEqual(response.json(), {'received': 1})
+
+    def test_preferences_view_saves(self):
+        """Test users can switch on email notifications"""
+        self.client.login(username='staff0', password='pass123')
+        response = self.client.post('/notifications/preferences/', {'in_app': 'on', 'email': 'on', 'language': 'kn'})
+        self.assertRedirects(response, '/notifications/preferences/')
+        preference = NotificationPreference.objects.get(user=self.users[0])
+        self.assertEqual((preference.email, preference.webhook, preference.language), (True, False, 'kn'))
+
+    def test_cancelling_a_shift_notifies_applicants(self):
+        """Test cancelling a shift tells pending, approved and waitlisted applicants only"""
+        manager = User.objects.create_user(username='manager', password='pass123', role='manager')
+        store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                     state='KA', zip_code='560001', phone='1234567890')
+        shift = Shift.objects.create(
+            store=store, manager=manager, title='Weekend Rush', description='Help out', role_required='cashier',
+            shift_date=date.today() + timedelta(days=3), start_time=time(9, 0), end_time=time(17, 0)
+        )
+        for user, status in zip(self.users, ['pending', 'approved', 'waitlisted', 'rejected', 'withdrawn']):
+            ShiftVolunteer.objects.create(shift=shift, volunteer=user, status=status)
+        NotificationPreference.objects.create(user=self.users[1], email=True)
+
+        self.client.login(username='manager', password='pass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/shifts/manager/{shift.id}/cancel/')
+        self.assertEqual(set(Notification.objects.filter(notification_type='shift_cancelled').values_list(
+            'recipient_id', flat=True
+        )), {user.id for user in self.users[:3]})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('will not go ahead', mail.outbox[0].body)
@@ -1,8 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+notification_list = views.notification_list_async if settings.ASYNC_VIEWS else views.notification_list
+
 urlpatterns = [
-    path('', views.notification_list, name='notification_list'),
+    path('', notification_list, name='notification_list'),
     path('<int:notification_id>/read/', views.mark_notification_read, name='mark_notification_read'),
     path('mark-all-read/', views.mark_all_read, name='mark_all_read'),
+    path('preferences/', views.notification_preferences, name='notification_preferences'),
+    path('webhook-stub/', views.webhook_stub, name='notification_webhook_stub'),
 ]
@@ -1,7 +1,23 @@
+import asyncio
+import json
+import logging
+
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import Notification
+from django.http import HttpResponseForbidden, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from apps.dashboard_reports.summary import invalidate_users
+from helping_hand_core.asyncviews import async_login_required, alist, arender
+from helping_hand_core.tasks import enqueue
+from .forms import NotificationPreferenceForm
+from .models import Notification, NotificationPreference
+from .tasks import deliver_notification
+
+logger = logging.getLogger(__name__)
 
 
 @login_required
@@ -16,6 +32,20 @@ def notification_list(request):
     })
 
 
+@async_login_required
+async def notification_list_async(request):
+    """ASGI version of notification_list: list and unread count are fetched concurrently"""
+    notifications = Notification.objects.filter(recipient=request.user)
+    notification_rows, unread_count = await asyncio.gather(
+        alist(notifications), notifications.filter(is_read=False).acount()
+    )
+
+    return await arender(request, 'notifications/notification_list.html', {
+        'notifications': notification_rows,
+        'unread_count': unread_count
+    })
+
+
 @login_required
 def mark_notification_read(request, notification_id):
     """Mark notification as read"""
@@ -32,16 +62,44 @@ def mark_notification_read(request, notification_id):
 def mark_all_read(request):
     """Mark all notifications as read"""
     Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+    invalidate_users([request.user.id])
     messages.success(request, 'All notifications marked as read.')
     return redirect('notification_list')
 
 
+@login_required
+def notification_preferences(request):
+    """Choose the channels notifications are delivered on"""
+    preference = NotificationPreference.objects.filter(user=request.user).first()
+    if request.method == 'POST':
+        form = NotificationPreferenceForm(request.POST, instance=preference)
+        if form.is_valid():
+            preference = form.save(commit=False)
+            preference.user = request.user
+            preference.save()
+            messages.success(request, 'Notification settings saved.')
+            return redirect('notification_preferences')
+    else:
+        form = NotificationPreferenceForm(instance=preference)
+
+    return render(request, 'notifications/preferences.html', {'form': form})
+
+
+@csrf_exempt
+@require_POST
+def webhook_stub(request):
+    """Local receiver for the webhook channel: checks the token and logs the batch"""
+    token = settings.NOTIFICATION_WEBHOOK_TOKEN
+    if token and not constant_time_compare(request.headers.get('X-Webhook-Token', ''), token):
+        return HttpResponseForbidden()
+    try:
+        notifications = json.loads(request.body)['notifications']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Expected {"notifications": [...]}'}, status=400)
+    logger.info('Webhook stub received %d notifications', len(notifications))
+    return JsonResponse({'received': len(notifications)})
+
+
 def create_notification(recipient, notification_type, title, message, link=''):
-    """Helper function to create notifications"""
-    Notification.objects.create(
-        recipient=recipient,
-        notification_type=notification_type,
-        title=title,
-        message=message,
-        link=link
-    )
+    """Helper function to create notifications (delivered by a background task)"""
+    enqueue(deliver_notification, recipient.id, notification_type, title, message, link)
@@ -1,11 +1,21 @@
 from django.contrib import admin
-from .models import Store, Shift, ShiftVolunteer, ShiftHistory
+from .models import (Availability, Region, Store, Shift, ShiftAlertPreference, ShiftVolunteer, ShiftHistory,
+                     SwapRequest, VolunteerStats)
+from .search import search_shifts
+from .stats import record_status_change
+
+
+@admin.register(Region)
+class RegionAdmin(admin.ModelAdmin):
+    list_display = ['name', 'code', 'created_at']
+    search_fields = ['name', 'code']
+    ordering = ['name']
 
 
 @admin.register(Store)
 class StoreAdmin(admin.ModelAdmin):
-    list_display = ['name', 'city', 'state', 'manager', 'is_active', 'created_at']
-    list_filter = ['is_active', 'state', 'city']
+    list_display = ['name', 'city', 'state', 'region', 'manager', 'latitude', 'longitude', 'is_active', 'created_at']
+    list_filter = ['is_active', 'region', 'state', 'city']
     search_fields = ['name', 'city', 'address']
     ordering = ['name']
 
@@ -17,6 +27,12 @@ class ShiftAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'store__name']
     ordering = ['-shift_date']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of LIKE '%term%' scans
+        if not search_term:
+            return queryset, False
+        return search_shifts(queryset, search_term), False
+
 
 @admin.register(ShiftVolunteer)
 class ShiftVolunteerAdmin(admin.ModelAdmin):
@@ -25,14 +41,54 @@ class ShiftVolunteerAdmin(admin.ModelAdmin):
     search_fields = ['volunteer__username', 'shift__title']
     ordering = ['-applied_at']
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        old_status = form.initial.get('status') if change else None
+        if obj.status != old_status:
+            record_status_change(obj, old_status)
+
 
 @admin.register(ShiftHistory)
 class ShiftHistoryAdmin(admin.ModelAdmin):
-    list_display = ['shift', 'action', 'performed_by', 'timestamp']
+    list_display = ['id', 'shift', 'action', 'performed_by', 'volunteer', 'timestamp']
     list_filter = ['action', 'timestamp']
     search_fields = ['shift__title', 'description']
-    readonly_fields = ['shift', 'action', 'performed_by', 'description', 'timestamp']
+    readonly_fields = ['shift', 'action', 'performed_by', 'volunteer', 'description', 'changes', 'timestamp']
     ordering = ['-timestamp']
     
     def has_add_permission(self, request):
         return False
+
+
+@admin.register(VolunteerStats)
+class VolunteerStatsAdmin(admin.ModelAdmin):
+    list_display = ['user', 'approved_count', 'rejected_count', 'withdrawn_count', 'hours_worked', 'last_active']
+    search_fields = ['user__username', 'user__email']
+    readonly_fields = ['user', 'approved_count', 'rejected_count', 'withdrawn_count', 'minutes_worked', 'last_active']
+    ordering = ['-approved_count']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(SwapRequest)
+class SwapRequestAdmin(admin.ModelAdmin):
+    list_display = ['application', 'requested_by', 'offered_to', 'taken_by', 'status', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['requested_by__username', 'taken_by__username', 'application__shift__title']
+    ordering = ['-created_at']
+
+
+@admin.register(Availability)
+class AvailabilityAdmin(admin.ModelAdmin):
+    list_display = ['user', 'week_start', 'updated_at']
+    list_filter = ['week_start']
+    search_fields = ['user__username']
+    ordering = ['-week_start']
+
+
+@admin.register(ShiftAlertPreference)
+class ShiftAlertPreferenceAdmin(admin.ModelAdmin):
+    list_display = ['user', 'home_store', 'whole_region', 'enabled', 'updated_at']
+    list_filter = ['enabled', 'whole_region']
+    search_fields = ['user__username', 'home_store__name']
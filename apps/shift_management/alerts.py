@@ -0,0 +1,83 @@
+"""
+Shift alerts: "new shift posted" and "shift cancelled".
+
+shift_audience() resolves who hears about a shift in one query over
+ShiftAlertPreference. The audience is opted-in active staff whose home
+store is the shift's store (or in the same region, for whole_region
+subscribers; stores without a region group by state). They must want the
+shift's role and have no approved shift overlapping it. That subscriber
+query is handed to available_staff() as a subquery, so the audience is
+also limited to staff whose recorded availability for the week covers the
+whole shift; subscribers who recorded none are not alerted.
+
+notify_shift_posted() and notify_shift_cancelled() are queued by
+create_shift (and the shift importer) and cancel_shift, so they run on the
+worker once the transaction has committed. Each hands its whole audience to
+deliver_notifications() as one flush, which batches the inserts and emails
+(see apps/notifications/channels.py); the manager's POST doesn't depend on
+the audience size.
+"""
+from django.db.models import Exists, F, OuterRef, Q
+from apps.notifications.tasks import deliver_notifications
+from .availability import available_staff
+from .models import Shift, ShiftAlertPreference, ShiftVolunteer, Store
+from .schedule import ROLE_BITS
+
+
+def shift_audience(shift):
+    """Ids of the staff to alert about ``shift``; needs shift.store"""
+    booked = ShiftVolunteer.objects.filter(
+        volunteer=OuterRef('user'), status='approved', shift__shift_date=shift.shift_date,
+        shift__start_time__lt=shift.end_time, shift__end_time__gt=shift.start_time,
+    )
+    # Every candidate's home store is in the region, which lets the query start
+    # from the home_store index instead of scanning staff
+    if shift.store.region_id:
+        region = Store.objects.filter(region_id=shift.store.region_id).values('id')
+    else:
+        region = Store.objects.filter(region__isnull=True, state=shift.store.state).values('id')
+    rows = ShiftAlertPreference.objects.alias(
+        role_bit=F('role_mask').bitand(ROLE_BITS.get(shift.role_required, 0))
+    ).filter(
+        Q(home_store_id=shift.store_id) | Q(whole_region=True),
+        Q(role_mask=0) | Q(role_bit__gt=0),
+        ~Exists(booked),
+        home_store_id__in=region, enabled=True, user__role='staff', user__is_active=True,
+    ).exclude(user_id__in=ShiftVolunteer.objects.filter(shift_id=shift.pk).values('volunteer_id'))
+    return available_staff(shift, among=rows.values('user_id'))
+
+
+def notify_shift_posted(shift_id):
+    """Alert the audience of a newly posted shift; returns the number alerted"""
+    shift = Shift.objects.select_related('store').filter(id=shift_id, status='open').first()
+    if shift is None or shift.is_past():
+        return 0
+    recipients = shift_audience(shift)
+    deliver_notifications([dict(
+        recipient_id=user_id,
+        notification_type='shift_created',
+        title='New Shift Posted',
+        message=f'"{shift.title}" at {shift.store.name} on {shift.shift_date} '
+                f'({shift.start_time:%H:%M}-{shift.end_time:%H:%M}).',
+        link=f'/shifts/{shift.id}/'
+    ) for user_id in recipients])
+    return len(recipients)
+
+
+def notify_shift_cancelled(shift_id):
+    """Tell everyone pending, approved or waitlisted on a cancelled shift; returns the number told"""
+    shift = Shift.objects.select_related('store').filter(id=shift_id, status='cancelled').first()
+    if shift is None:
+        return 0
+    recipients = list(ShiftVolunteer.objects.filter(
+        shift_id=shift.id, status__in=('pending', 'approved', 'waitlisted')
+    ).values_list('volunteer_id', flat=True))
+    deliver_notifications([dict(
+        recipient_id=user_id,
+        notification_type='shift_cancelled',
+        title='Shift Cancelled',
+        message=f'"{shift.title}" at {shift.store.name} on {shift.shift_date} '
+                f'({shift.start_time:%H:%M}-{shift.end_time:%H:%M}) has been cancelled.',
+        link=f'/shifts/{shift.id}/'
+    ) for user_id in recipients])
+    return len(recipients)
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ShiftManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.shift_management'
\ No newline at end of file
+    name = 'apps.shift_management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_search_index
+        post_migrate.connect(ensure_search_index, sender=self)
@@ -0,0 +1,53 @@
+"""
+Staff availability.
+
+Staff record the quarter-hours they can work each week; one Availability
+row holds the whole week as seven BusyDay-style masks (see schedule.py).
+Someone is available for a shift when the mask for its weekday covers the
+shift window and their BusyDay mask for that date doesn't touch it.
+
+available_staff() answers that for every staff member at once. It reads
+the week's availability rows and the day's busy rows once each, then does
+one AND per user in Python; for 50k staff that is under a tenth of a
+second. New-shift alerts (alerts.py) pass their subscriber query as
+``among``, so only that audience's rows are read. Staff who recorded no
+availability for the week are not available.
+"""
+from datetime import timedelta
+
+from .models import Availability
+from .schedule import busy_masks, day_of_week, pack_week, shift_mask, week_start
+
+
+def set_availability(user, day, day_masks, weeks=1):
+    """Store seven day masks (Monday first) for ``weeks`` weeks starting with the week of ``day``"""
+    first = week_start(day)
+    mask = pack_week(day_masks)
+    Availability.objects.bulk_create(
+        [Availability(user=user, week_start=first + timedelta(weeks=n), mask=mask)
+         for n in range(weeks)],
+        update_conflicts=True, unique_fields=['user', 'week_start'], update_fields=['mask', 'updated_at'],
+    )
+
+
+def available_staff(shift, exclude=(), among=None):
+    """
+    Ids of active staff whose availability covers ``shift`` and who aren't booked during it.
+
+    ``among`` (user ids, or a queryset of them) limits the search to those users.
+    """
+    window = shift_mask(shift)
+    if not window:
+        return []
+    weekday = shift.shift_date.weekday()
+    rows = Availability.objects.filter(
+        week_start=week_start(shift.shift_date), user__role='staff', user__is_active=True
+    ).exclude(user_id__in=exclude)
+    if among is not None:
+        rows = rows.filter(user_id__in=among)
+    rows = rows.values_list('user_id', 'mask')
+    busy = busy_masks(shift.shift_date)
+    return [
+        user_id for user_id, mask in rows.iterator(chunk_size=5000)
+        if day_of_week(mask, weekday) & window == window and not busy.get(user_id, 0) & window
+    ]
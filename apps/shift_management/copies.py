@@ -0,0 +1,54 @@
+"""
+Shift columns copied onto ShiftVolunteer.
+
+The manager's pending queue, the dashboard count and the CSV exports read
+the shift's date, store, manager, role and region on every application
+row. They use ShiftVolunteer's copies of those columns
+(ShiftVolunteer.SHIFT_COPIES) and scan that table alone through its own
+indexes instead of joining Shift, Store and users.
+
+ShiftVolunteer.save() fills the copies on insert. Shift edits reach them
+through sync_shift() (the post_save signal). Store region changes go
+through sync_store_region(). find_drift() and resync() back
+`manage.py check_application_copies`, which repairs rows written around
+those paths (raw SQL, bulk updates).
+"""
+from django.db.models import OuterRef, Subquery
+from .models import Shift, ShiftVolunteer
+
+RESYNC_BATCH_SIZE = 500
+
+
+def sync_shift(shift):
+    """Bring the copies on ``shift``'s applications in step with it; returns rows changed"""
+    values = {copy: getattr(shift, source) for copy, source in ShiftVolunteer.SHIFT_COPIES.items()}
+    return ShiftVolunteer.objects.filter(shift_id=shift.id).exclude(**values).update(**values)
+
+
+def sync_store_region(store):
+    return ShiftVolunteer.objects.filter(store_id=store.id).exclude(region_id=store.region_id).update(
+        region_id=store.region_id
+    )
+
+
+def find_drift(chunk_size=5000):
+    """Ids of shifts with at least one application whose copies don't match the shift"""
+    copies = list(ShiftVolunteer.SHIFT_COPIES)
+    sources = [f'shift__{source}' for source in ShiftVolunteer.SHIFT_COPIES.values()]
+    rows = ShiftVolunteer.objects.order_by().values_list('shift_id', *copies, *sources)
+    drifted = set()
+    for row in rows.iterator(chunk_size=chunk_size):
+        if row[1:1 + len(copies)] != row[1 + len(copies):]:
+            drifted.add(row[0])
+    return drifted
+
+
+def resync(shift_ids, batch_size=RESYNC_BATCH_SIZE):
+    """Rewrite the copies on every application of ``shift_ids`` from the shifts; returns rows updated"""
+    shift_ids = sorted(shift_ids)
+    source = Shift.objects.filter(id=OuterRef('shift_id'))
+    values = {copy: Subquery(source.values(field)[:1]) for copy, field in ShiftVolunteer.SHIFT_COPIES.items()}
+    updated = 0
+    for offset in range(0, len(shift_ids), batch_size):
+        updated += ShiftVolunteer.objects.filter(shift_id__in=shift_ids[offset:offset + batch_size]).update(**values)
+    return updated
@@ -1,5 +1,13 @@
 from django import forms
-from .models import Shift, ShiftVolunteer, Store
+from apps.user_authentication.models import CustomUser
+from .models import Shift, ShiftAlertPreference, ShiftVolunteer, Store
+from .schedule import ROLE_BITS, parse_ranges
+
+
+def check_shift_times(start_time, end_time):
+    """Cross-field rule shared by ShiftForm and the bulk importer"""
+    if start_time and end_time and start_time >= end_time:
+        raise forms.ValidationError("End time must be after start time.")
 
 
 class ShiftForm(forms.ModelForm):
@@ -19,21 +27,28 @@ class ShiftForm(forms.ModelForm):
             'slots_available': forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
         }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['store'].queryset = Store.in_region.filter(is_active=True)
+
     def clean(self):
         cleaned_data = super().clean()
-        start_time = cleaned_data.get('start_time')
-        end_time = cleaned_data.get('end_time')
-        
-        if start_time and end_time and start_time >= end_time:
-            raise forms.ValidationError("End time must be after start time.")
-        
+        check_shift_times(cleaned_data.get('start_time'), cleaned_data.get('end_time'))
         return cleaned_data
 
 
+class ShiftImportForm(forms.Form):
+    file = forms.FileField(
+        help_text='CSV or XLSX with columns: store, title, description, role_required, '
+                  'shift_date, start_time, end_time, slots_available',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'})
+    )
+
+
 class StoreForm(forms.ModelForm):
     class Meta:
         model = Store
-        fields = ['name', 'address', 'city', 'state', 'zip_code', 'phone', 'manager']
+        fields = ['name', 'address', 'city', 'state', 'zip_code', 'phone', 'region', 'manager']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
             'address': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
@@ -41,6 +56,7 @@ class StoreForm(forms.ModelForm):
             'state': forms.TextInput(attrs={'class': 'form-control'}),
             'zip_code': forms.TextInput(attrs={'class': 'form-control'}),
             'phone': forms.TextInput(attrs={'class': 'form-control'}),
+            'region': forms.Select(attrs={'class': 'form-control'}),
             'manager': forms.Select(attrs={'class': 'form-control'}),
         }
 
@@ -53,3 +69,88 @@ class VolunteerReviewForm(forms.ModelForm):
             'status': forms.Select(attrs={'class': 'form-control'}),
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Waitlist entries need a queue position, which only join_waitlist assigns
+        self.fields['status'].choices = [
+            (value, label) for value, label in self.fields['status'].choices
+            if value != 'waitlisted' or self.instance.status == 'waitlisted'
+        ]
+
+
+class SwapOfferForm(forms.Form):
+    colleague = forms.CharField(
+        required=False, max_length=150,
+        help_text='Username of a colleague to offer the shift to; leave empty to offer it to anyone suitable',
+        widget=forms.TextInput(attrs={'class': 'form-control'})
+    )
+    note = forms.CharField(required=False, max_length=255,
+                           widget=forms.TextInput(attrs={'class': 'form-control'}))
+
+    def clean_colleague(self):
+        username = self.cleaned_data['colleague'].strip()
+        if not username:
+            return None
+        try:
+            return CustomUser.objects.get(username=username, role='staff', is_active=True)
+        except CustomUser.DoesNotExist:
+            raise forms.ValidationError('No active staff member with that username.')
+
+
+class AvailabilityForm(forms.Form):
+    """A week of availability as time ranges per day, e.g. "09:00-13:00, 17:00-21:00" """
+    DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+    week = forms.DateField(help_text='Any day in the first week this applies to',
+                           widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    weeks = forms.IntegerField(min_value=1, max_value=12, initial=1,
+                               help_text='Apply the same times to this many weeks',
+                               widget=forms.NumberInput(attrs={'class': 'form-control'}))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for day in self.DAYS:
+            self.fields[day] = forms.CharField(
+                required=False, max_length=255,
+                widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': '09:00-17:00'})
+            )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        masks = []
+        for day in self.DAYS:
+            try:
+                masks.append(parse_ranges(cleaned_data.get(day)))
+            except ValueError as e:
+                self.add_error(day, str(e))
+        cleaned_data['day_masks'] = masks
+        return cleaned_data
+
+
+class ShiftAlertForm(forms.ModelForm):
+    roles = forms.MultipleChoiceField(
+        choices=Shift.ROLE_CHOICES, required=False, widget=forms.CheckboxSelectMultiple,
+        help_text='Leave all unticked to hear about every role'
+    )
+
+    class Meta:
+        model = ShiftAlertPreference
+        fields = ['enabled', 'home_store', 'whole_region']
+        labels = {
+            'enabled': 'Tell me about new shifts',
+            'whole_region': 'Include every store in my home store\'s region',
+        }
+        widgets = {
+            'home_store': forms.Select(attrs={'class': 'form-control'}),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['home_store'].queryset = Store.in_region.filter(is_active=True)
+        if self.instance.pk:
+            self.fields['roles'].initial = [role for role, bit in ROLE_BITS.items() if self.instance.role_mask & bit]
+
+    def save(self, commit=True):
+        self.instance.role_mask = sum(ROLE_BITS[role] for role in self.cleaned_data['roles'])
+        return super().save(commit)
@@ -0,0 +1,130 @@
+"""
+Offline geocoding and nearest-store lookups.
+
+Stores are geocoded from the bundled ZIP/PIN centroid table in
+data/zip_centroids.csv (no network access). Radius queries go through an
+in-memory grid index of active stores so only stores in nearby cells are
+distance-checked; the index is rebuilt lazily after store changes.
+"""
+import math
+import time
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+
+CENTROIDS_FILE = Path(__file__).resolve().parent / 'data' / 'zip_centroids.csv'
+
+EARTH_RADIUS_KM = 6371.0
+
+# Roughly 28 km of latitude per cell
+GRID_CELL_DEGREES = 0.25
+
+# Upper bound on how stale another worker's index can get
+INDEX_MAX_AGE_SECONDS = 300
+
+# Past this many cells, visiting them costs more than checking every store
+MAX_GRID_CELLS = 10000
+
+
+@lru_cache(maxsize=None)
+def load_centroids(path=CENTROIDS_FILE):
+    """Load the ZIP centroid table into a {zip_code: (lat, lon)} dict"""
+    import csv  # deferred: only geocoding touches the table
+    centroids = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            centroids[row['zip_code'].strip()] = (float(row['latitude']), float(row['longitude']))
+    return centroids
+
+
+@lru_cache(maxsize=None)
+def _prefix_centroids(path=CENTROIDS_FILE):
+    """Average centroid per 3-digit prefix, used when the exact code is missing"""
+    sums = defaultdict(lambda: [0.0, 0.0, 0])
+    for zip_code, (lat, lon) in load_centroids(path).items():
+        entry = sums[zip_code[:3]]
+        entry[0] += lat
+        entry[1] += lon
+        entry[2] += 1
+    return {prefix: (lat / n, lon / n) for prefix, (lat, lon, n) in sums.items()}
+
+
+def geocode_zip(zip_code, path=CENTROIDS_FILE):
+    """Return (lat, lon) for a ZIP/PIN code, or None if it can't be resolved"""
+    zip_code = (zip_code or '').replace(' ', '').strip()
+    if not zip_code:
+        return None
+    exact = load_centroids(path).get(zip_code)
+    if exact:
+        return exact
+    return _prefix_centroids(path).get(zip_code[:3])
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class StoreGridIndex:
+    """Bucket store coordinates into fixed-size lat/lon cells"""
+
+    def __init__(self, points, cell_degrees=GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.cells = defaultdict(list)
+        for store_id, lat, lon in points:
+            self.cells[self._cell(lat, lon)].append((store_id, lat, lon))
+        self.built_at = time.monotonic()
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def within(self, lat, lon, radius_km):
+        """Return [(store_id, distance_km)] within radius_km, nearest first"""
+        # Spans are clamped to the globe; longitude degrees shrink towards the poles
+        lat_span = min(radius_km / 111.0, 180.0)
+        lon_span = min(radius_km / max(111.0 * math.cos(math.radians(lat)), 1e-6), 360.0)
+        min_row, min_col = self._cell(lat - lat_span, lon - lon_span)
+        max_row, max_col = self._cell(lat + lat_span, lon + lon_span)
+
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > MAX_GRID_CELLS:
+            candidates = (point for points in self.cells.values() for point in points)
+        else:
+            candidates = (point for row in range(min_row, max_row + 1) for col in range(min_col, max_col + 1)
+                          for point in self.cells.get((row, col), ()))
+        results = []
+        for store_id, store_lat, store_lon in candidates:
+            distance = haversine_km(lat, lon, store_lat, store_lon)
+            if distance <= radius_km:
+                results.append((store_id, distance))
+        results.sort(key=lambda item: item[1])
+        return results
+
+
+_store_index = None
+
+
+def get_store_index():
+    """Return the cached grid index of active, geocoded stores"""
+    global _store_index
+    if _store_index is None or time.monotonic() - _store_index.built_at > INDEX_MAX_AGE_SECONDS:
+        from .models import Store
+        points = Store.objects.filter(
+            is_active=True, latitude__isnull=False, longitude__isnull=False
+        ).values_list('id', 'latitude', 'longitude')
+        _store_index = StoreGridIndex(points)
+    return _store_index
+
+
+def invalidate_store_index():
+    global _store_index
+    _store_index = None
+
+
+def nearest_stores(lat, lon, radius_km, limit=None):
+    """Active stores within radius_km of (lat, lon) as [(store_id, distance_km)]"""
+    results = get_store_index().within(lat, lon, radius_km)
+    return results[:limit] if limit else results
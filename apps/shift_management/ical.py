@@ -0,0 +1,99 @@
+"""
+iCalendar (RFC 5545) feeds of shifts.
+
+Feeds are generated line by line so they can be streamed. Each event carries
+LAST-MODIFIED from Shift.updated_at and a SEQUENCE taken from the number of
+ShiftHistory entries, so calendar clients only rewrite events that changed.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core import signing
+from django.utils import timezone
+
+TOKEN_SALT = 'shift_management.ical'
+
+PRODID = '-//Helping Hands//Shift Calendar//EN'
+
+
+def calendar_token(user):
+    """Signed, URL-safe token identifying a user's calendar feed"""
+    return signing.Signer(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def user_id_from_token(token):
+    """Return the user id for a feed token, or None if the token is invalid"""
+    try:
+        return int(signing.Signer(salt=TOKEN_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def _escape(text):
+    return (str(text).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    """Fold a content line to 75 octets as required by RFC 5545"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, current, size, limit = [], '', 0, 75
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(current)
+            current, size, limit = '', 0, 74  # continuation lines start with a space
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _shift_bounds(shift):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(shift.shift_date, shift.start_time), tz)
+    end = timezone.make_aware(datetime.combine(shift.shift_date, shift.end_time), tz)
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def event_lines(shift, sequence=0, base_url=''):
+    """Yield the content lines of one VEVENT for a shift"""
+    start, end = _shift_bounds(shift)
+    store = shift.store
+    yield 'BEGIN:VEVENT'
+    yield f'UID:shift-{shift.id}@helping-hands'
+    yield f'DTSTAMP:{_utc(shift.updated_at)}'
+    yield f'LAST-MODIFIED:{_utc(shift.updated_at)}'
+    yield f'SEQUENCE:{sequence}'
+    yield f'DTSTART:{_utc(start)}'
+    yield f'DTEND:{_utc(end)}'
+    yield f'SUMMARY:{_escape(shift.title)} ({_escape(shift.get_role_required_display())})'
+    yield f'LOCATION:{_escape(store.name)}\\, {_escape(store.address)}\\, {_escape(store.city)}'
+    yield f'DESCRIPTION:{_escape(shift.description)}'
+    yield f'URL:{base_url}/shifts/{shift.id}/'
+    yield f"STATUS:{'CANCELLED' if shift.status == 'cancelled' else 'CONFIRMED'}"
+    yield 'END:VEVENT'
+
+
+def stream_calendar(name, shifts, base_url=''):
+    """
+    Yield a whole VCALENDAR for an iterable of shifts.
+
+    Shifts may carry a ``history_count`` annotation used as the SEQUENCE.
+    """
+    yield _fold('BEGIN:VCALENDAR')
+    yield _fold('VERSION:2.0')
+    yield _fold(f'PRODID:{PRODID}')
+    yield _fold('CALSCALE:GREGORIAN')
+    yield _fold(f'X-WR-CALNAME:{_escape(name)}')
+    for shift in shifts:
+        for line in event_lines(shift, getattr(shift, 'history_count', 0), base_url):
+            yield _fold(line)
+    yield _fold('END:VCALENDAR')
@@ -0,0 +1,232 @@
+"""
+Bulk shift import from CSV/XLSX.
+
+Rows are read lazily and handled in fixed-size batches, so memory stays
+bounded whatever the file size. Each batch is validated column by column with
+ShiftForm's own field definitions plus its start/end rule, store references
+are resolved from one lookup built up front, and the valid rows of a batch
+go in with a single bulk_create. bulk_create skips the Shift signals, so the
+search index, change feed and dashboard cache are updated here instead, and
+the new-shift alert is queued per shift as create_shift does.
+"""
+import io
+from datetime import date, time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from apps.dashboard_reports.summary import invalidate_global
+from helping_hand_core.tasks import enqueue
+from .alerts import notify_shift_posted
+from .forms import ShiftForm, check_shift_times
+from .models import Shift, ShiftHistory, Store
+from .search import index_shifts
+
+COLUMNS = ['store', 'title', 'description', 'role_required', 'shift_date',
+           'start_time', 'end_time', 'slots_available']
+
+# Same field objects (parsing, max_length, choices) as the create form
+FIELDS = {name: ShiftForm.base_fields[name] for name in COLUMNS if name != 'store'}
+
+
+def _iso_date(value):
+    if len(value) != 10:  # YYYY-MM-DD only; fromisoformat also takes forms the field rejects
+        raise ValueError(value)
+    return date.fromisoformat(value)
+
+
+def _iso_time(value):
+    if len(value) not in (5, 8):  # HH:MM or HH:MM:SS
+        raise ValueError(value)
+    return time.fromisoformat(value)
+
+
+# Plain ISO values skip the field's try-every-input-format parsing; anything
+# else still goes through the field, so the accepted formats are unchanged
+FAST_PARSERS = {'shift_date': _iso_date, 'start_time': _iso_time, 'end_time': _iso_time}
+
+ROLE_LABELS = {label.lower(): value for value, label in Shift.ROLE_CHOICES}
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Errors kept on the result; on_error sees every one
+MAX_REPORTED_ERRORS = 500
+
+
+class ImportFileError(Exception):
+    """The file as a whole can't be imported (bad format or missing columns)"""
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.failed = 0
+        self.errors = []  # [(row number, {column: [messages]})]
+
+    @property
+    def total(self):
+        return self.created + self.failed
+
+
+def _check_header(header):
+    missing = [column for column in COLUMNS if column not in header]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}")
+
+
+def read_csv(fileobj):
+    """Yield rows of a CSV upload as dicts keyed by lower-cased header"""
+    import csv
+
+    if not isinstance(fileobj, io.TextIOBase):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.reader(fileobj)
+    header = [column.strip().lower() for column in next(reader, [])]
+    _check_header(header)
+    for row in reader:
+        if any(cell.strip() for cell in row):
+            yield dict(zip(header, row))
+
+
+def read_xlsx(fileobj):
+    """Yield rows of the first worksheet of an XLSX upload (needs openpyxl)"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('XLSX import needs the openpyxl package; upload a CSV instead.')
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or '').strip().lower() for cell in next(rows, ())]
+        _check_header(header)
+        for row in rows:
+            if any(cell not in (None, '') for cell in row):
+                yield dict(zip(header, ('' if cell is None else cell for cell in row)))
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """Pick a reader from the file extension"""
+    name = filename.lower()
+    if name.endswith('.csv'):
+        return read_csv(fileobj)
+    if name.endswith('.xlsx'):
+        return read_xlsx(fileobj)
+    raise ImportFileError('Upload a .csv or .xlsx file.')
+
+
+class StoreResolver:
+    """Map store references (id, name or "name - city") to ids from a single query"""
+
+    AMBIGUOUS = object()
+
+    def __init__(self):
+        self.lookup = {}
+        for store_id, name, city in Store.in_region.filter(is_active=True).values_list('id', 'name', 'city'):
+            self.lookup[str(store_id)] = store_id
+            self.lookup[f'{name} - {city}'.lower()] = store_id
+            key = name.lower()
+            self.lookup[key] = self.AMBIGUOUS if key in self.lookup else store_id
+
+    def resolve(self, value):
+        store_id = self.lookup.get(str(value).strip().lower())
+        if store_id is None:
+            raise ValidationError(f'Unknown or inactive store "{value}".')
+        if store_id is self.AMBIGUOUS:
+            raise ValidationError(f'Several stores are called "{value}"; use "name - city" or the id.')
+        return store_id
+
+
+def validate_batch(batch, stores):
+    """
+    Validate [(row number, raw row)] one column at a time.
+
+    Returns (cleaned rows, errors) where errors is [(row number, {column: [messages]})].
+    """
+    cleaned = [{} for _ in batch]
+    errors = [{} for _ in batch]
+
+    for index, (_, row) in enumerate(batch):
+        try:
+            cleaned[index]['store_id'] = stores.resolve(row.get('store', ''))
+        except ValidationError as e:
+            errors[index]['store'] = e.messages
+
+    for name, field in FIELDS.items():
+        fast_parse = FAST_PARSERS.get(name)
+        for index, (_, row) in enumerate(batch):
+            value = row.get(name, '')
+            if fast_parse and isinstance(value, str):
+                try:
+                    cleaned[index][name] = fast_parse(value.strip())
+                    continue
+                except ValueError:
+                    pass
+            if name == 'role_required':
+                value = ROLE_LABELS.get(str(value).strip().lower(), str(value).strip())
+            try:
+                cleaned[index][name] = field.clean(value)
+            except ValidationError as e:
+                errors[index][name] = e.messages
+
+    for index, values in enumerate(cleaned):
+        try:
+            check_shift_times(values.get('start_time'), values.get('end_time'))
+        except ValidationError as e:
+            errors[index]['__all__'] = e.messages
+
+    valid = [values for values, row_errors in zip(cleaned, errors) if not row_errors]
+    failed = [(number, row_errors) for (number, _), row_errors in zip(batch, errors) if row_errors]
+    return valid, failed
+
+
+def _insert(rows, manager):
+    regions = dict(Store.objects.filter(id__in={values['store_id'] for values in rows}).values_list('id', 'region_id'))
+    with transaction.atomic():
+        shifts = Shift.objects.bulk_create([
+            Shift(manager=manager, region_id=regions[values['store_id']], **values) for values in rows
+        ])
+        ShiftHistory.objects.bulk_create([
+            ShiftHistory(shift=shift, action='created', performed_by=manager,
+                         description=f'Shift created: {shift.title} (import)',
+                         changes={'status': [None, shift.status]})
+            for shift in shifts
+        ])
+        index_shifts([shift.id for shift in shifts])
+        for shift in shifts:
+            enqueue(notify_shift_posted, shift.id)
+    return len(shifts)
+
+
+def import_shifts(rows, manager, batch_size=DEFAULT_BATCH_SIZE, dry_run=False, on_error=None):
+    """
+    Import an iterable of raw rows as shifts posted by ``manager``.
+
+    Valid rows are committed batch by batch; invalid rows are skipped and
+    reported. With dry_run nothing is written.
+    """
+    result = ImportResult()
+    stores = StoreResolver()
+    numbered = enumerate(rows, start=2)  # row 1 is the header
+
+    while True:
+        batch = list(islice(numbered, batch_size))
+        if not batch:
+            break
+        valid, failed = validate_batch(batch, stores)
+        for number, row_errors in failed:
+            if on_error:
+                on_error(number, row_errors)
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append((number, row_errors))
+        result.failed += len(failed)
+        if dry_run:
+            result.created += len(valid)
+        elif valid:
+            result.created += _insert(valid, manager)
+
+    if result.created and not dry_run:
+        invalidate_global()
+    return result
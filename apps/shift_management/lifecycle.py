@@ -0,0 +1,139 @@
+"""
+Shift status lifecycle.
+
+    open <-> filled        (approved volunteers reach / drop below the slots)
+    open, filled -> completed | cancelled
+
+completed and cancelled are final. Managers cancel by hand; everything else
+follows from the data, so sweep() (run periodically by the
+advance_shift_status command) moves past shifts to completed, or cancelled
+when nobody was approved, and fills or reopens upcoming ones. Each move is
+a set-based UPDATE over a batch of ids guarded by the old status, with the
+ShiftHistory rows bulk-inserted in the same transaction. That keeps the
+open rows down to shifts people can still sign up for.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from apps.dashboard_reports.summary import invalidate_global
+from .models import Shift, ShiftHistory, ShiftVolunteer
+
+TRANSITIONS = {
+    'open': {'filled', 'completed', 'cancelled'},
+    'filled': {'open', 'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': set(),
+}
+
+# ShiftHistory action recorded for each target status
+HISTORY_ACTIONS = {
+    'open': 'reopened',
+    'filled': 'filled',
+    'completed': 'completed',
+    'cancelled': 'cancelled',
+}
+
+DEFAULT_BATCH_SIZE = 2000
+
+
+class InvalidTransition(Exception):
+    """A status change the lifecycle does not allow"""
+
+
+def can_transition(old_status, new_status):
+    return new_status in TRANSITIONS.get(old_status, ())
+
+
+def check_transition(old_status, new_status):
+    if not can_transition(old_status, new_status):
+        raise InvalidTransition(f'A {old_status} shift cannot become {new_status}.')
+
+
+def _record_history(shift_ids, action, performed_by, description, changes):
+    """
+    One ShiftHistory row per shift as a single INSERT ... SELECT; building a
+    model instance per row cost several times the UPDATE itself.
+    """
+    history, shift = ShiftHistory._meta, Shift._meta
+    columns = ', '.join(connection.ops.quote_name(history.get_field(name).column) for name in (
+        'shift', 'action', 'performed_by', 'description', 'changes', 'timestamp'))
+    placeholders = ', '.join(['%s'] * len(shift_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {connection.ops.quote_name(history.db_table)} ({columns}) "
+            f"SELECT id, %s, %s, %s, %s, %s FROM {connection.ops.quote_name(shift.db_table)} "
+            f"WHERE id IN ({placeholders}) ORDER BY id",
+            [action, performed_by.pk if performed_by else None, description,
+             json.dumps(changes, cls=DjangoJSONEncoder),
+             connection.ops.adapt_datetimefield_value(timezone.now()), *shift_ids]
+        )
+
+
+def transition(queryset, old_status, new_status, performed_by=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Move the shifts in ``queryset`` that are ``old_status`` to ``new_status``.
+
+    Works in batches of ids so each transaction stays short; returns the
+    number of shifts moved.
+    """
+    check_transition(old_status, new_status)
+    candidates = queryset.filter(status=old_status).order_by('id').values_list('id', flat=True)
+    action = HISTORY_ACTIONS[new_status]
+    who = 'automatically' if performed_by is None else f'by {performed_by.username}'
+    moved, last_id = 0, 0
+    while True:
+        with transaction.atomic():
+            ids = list(candidates.filter(id__gt=last_id).select_for_update()[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            count = Shift.objects.filter(id__in=ids, status=old_status).update(
+                status=new_status, updated_at=timezone.now()
+            )
+            _record_history(ids, action, performed_by, f'Shift {old_status} -> {new_status} {who}',
+                            {'status': [old_status, new_status]})
+        moved += count
+        if len(ids) < batch_size:
+            break
+    return moved
+
+
+def _with_approved():
+    # A correlated count rather than a join + GROUP BY, which SELECT ... FOR UPDATE can't take
+    approved = ShiftVolunteer.objects.filter(shift=OuterRef('pk'), status='approved').order_by().values(
+        'shift'
+    ).annotate(n=Count('id')).values('n')
+    return Shift.objects.alias(approved=Coalesce(Subquery(approved), 0))
+
+
+def refresh_fill_status(shift_ids=None, today=None, performed_by=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Fill upcoming open shifts at capacity and reopen filled ones with a free slot"""
+    today = today or timezone.now().date()
+    upcoming = _with_approved().filter(shift_date__gte=today)
+    if shift_ids is not None:
+        upcoming = upcoming.filter(id__in=shift_ids)
+    return {
+        'filled': transition(upcoming.filter(approved__gte=F('slots_available')), 'open', 'filled',
+                             performed_by, batch_size),
+        'reopened': transition(upcoming.filter(approved__lt=F('slots_available')), 'filled', 'open',
+                               performed_by, batch_size),
+    }
+
+
+def sweep(today=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Apply every data-driven transition; returns {outcome: shifts moved}"""
+    today = today or timezone.now().date()
+    staffed = Exists(ShiftVolunteer.objects.filter(shift=OuterRef('pk'), status='approved'))
+    past = Shift.objects.filter(shift_date__lt=today)
+    moved = {'completed': 0, 'cancelled': 0}
+    for old_status in ('open', 'filled'):
+        moved['completed'] += transition(past.filter(staffed), old_status, 'completed', batch_size=batch_size)
+        moved['cancelled'] += transition(past.filter(~staffed), old_status, 'cancelled', batch_size=batch_size)
+    moved.update(refresh_fill_status(today=today, batch_size=batch_size))
+    if any(moved.values()):
+        invalidate_global()
+    return moved
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.shift_management.lifecycle import DEFAULT_BATCH_SIZE, sweep
+
+
+class Command(BaseCommand):
+    help = 'Complete or cancel past shifts and fill/reopen upcoming ones (run periodically, e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Shifts moved per UPDATE/transaction')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        moved = sweep(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{outcome} {count}' for outcome, count in moved.items())
+            + f' in {time.perf_counter() - started:.2f}s'
+        ))
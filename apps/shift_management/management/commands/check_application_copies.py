@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.shift_management.copies import find_drift, resync
+
+
+class Command(BaseCommand):
+    help = 'Find applications whose copied shift columns (date, store, manager, role, region) drifted, and fix them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Only report drift; write nothing')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drifted = find_drift()
+        for shift_id in sorted(drifted)[:20]:
+            self.stderr.write(f'shift {shift_id}: application copies differ from the shift')
+
+        if options['check']:
+            self.stdout.write(f'{len(drifted)} shifts have drifted application copies.')
+            return
+        count = resync(drifted)
+        self.stdout.write(self.style.SUCCESS(
+            f'Resynced {count} applications on {len(drifted)} shifts in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from apps.shift_management.geo import CENTROIDS_FILE, geocode_zip, invalidate_store_index
+from apps.shift_management.models import Store
+
+
+class Command(BaseCommand):
+    help = 'Fill in store latitude/longitude from the offline ZIP centroid table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-geocode stores that already have coordinates')
+        parser.add_argument('--centroids', default=str(CENTROIDS_FILE),
+                            help='Path to a zip_code,latitude,longitude CSV')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        stores = Store.objects.only('id', 'zip_code', 'latitude', 'longitude')
+        if not options['all']:
+            stores = stores.filter(latitude__isnull=True)
+
+        batch, updated, unresolved = [], 0, 0
+        for store in stores.iterator(chunk_size=options['batch_size']):
+            coords = geocode_zip(store.zip_code, path=options['centroids'])
+            if coords is None:
+                unresolved += 1
+                continue
+            store.latitude, store.longitude = coords
+            batch.append(store)
+            if len(batch) >= options['batch_size']:
+                Store.objects.bulk_update(batch, ['latitude', 'longitude'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            Store.objects.bulk_update(batch, ['latitude', 'longitude'])
+            updated += len(batch)
+
+        invalidate_store_index()
+        self.stdout.write(self.style.SUCCESS(f'Geocoded {updated} store(s); {unresolved} unresolved.'))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.shift_management.importer import DEFAULT_BATCH_SIZE, ImportFileError, import_shifts, read_rows
+from apps.user_authentication.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Import shifts from a CSV/XLSX roster, reporting rows that fail ShiftForm validation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file with a header row')
+        parser.add_argument('--manager', required=True, help='Username recorded as the posting manager')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing')
+
+    def handle(self, *args, **options):
+        manager = CustomUser.objects.filter(username=options['manager']).first()
+        if manager is None or not (manager.is_manager() or manager.is_admin()):
+            raise CommandError(f"{options['manager']} is not a manager or admin")
+
+        def report(row_number, row_errors):
+            problems = '; '.join(
+                f"{column}: {' '.join(messages)}" if column != '__all__' else ' '.join(messages)
+                for column, messages in row_errors.items()
+            )
+            self.stderr.write(f'row {row_number}: {problems}')
+
+        started = time.perf_counter()
+        try:
+            with open(options['path'], 'rb') as f:
+                result = import_shifts(read_rows(f, options['path']), manager,
+                                       batch_size=options['batch_size'], dry_run=options['dry_run'],
+                                       on_error=report)
+        except (ImportFileError, OSError) as e:
+            raise CommandError(str(e))
+
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result.created} of {result.total} rows in {time.perf_counter() - started:.1f}s; '
+            f'{result.failed} failed.'
+        ))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from apps.shift_management.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the shift full-text search index from the Shift and Store tables'
+
+    def handle(self, *args, **options):
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS('Shift search index rebuilt.'))
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shift_management", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="store",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="store",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:51
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("shift_management", "0002_store_latitude_longitude"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shifthistory",
+            name="changes",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                encoder=django.core.serializers.json.DjangoJSONEncoder,
+            ),
+        ),
+        migrations.AddField(
+            model_name="shifthistory",
+            name="volunteer",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="application_history",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="shifthistory",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("updated", "Updated"),
+                    ("cancelled", "Cancelled"),
+                    ("rescheduled", "Rescheduled"),
+                    ("applied", "Volunteer Applied"),
+                    ("approved", "Volunteer Approved"),
+                    ("rejected", "Volunteer Rejected"),
+                    ("withdrawn", "Volunteer Withdrew"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
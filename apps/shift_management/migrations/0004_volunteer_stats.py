@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_authentication", "0004_auditlog_indexes"),
+        ("shift_management", "0003_shifthistory_change_feed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VolunteerStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="volunteer_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("approved_count", models.PositiveIntegerField(default=0)),
+                ("rejected_count", models.PositiveIntegerField(default=0)),
+                ("withdrawn_count", models.PositiveIntegerField(default=0)),
+                ("minutes_worked", models.PositiveIntegerField(default=0)),
+                ("last_active", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name_plural": "volunteer stats",
+                "indexes": [
+                    models.Index(
+                        fields=["-approved_count", "user"], name="volstats_approved_idx"
+                    ),
+                    models.Index(
+                        fields=["-minutes_worked", "user"], name="volstats_minutes_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
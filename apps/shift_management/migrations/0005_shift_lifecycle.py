@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shift_management", "0004_volunteer_stats"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="shifthistory",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("updated", "Updated"),
+                    ("cancelled", "Cancelled"),
+                    ("rescheduled", "Rescheduled"),
+                    ("applied", "Volunteer Applied"),
+                    ("approved", "Volunteer Approved"),
+                    ("rejected", "Volunteer Rejected"),
+                    ("withdrawn", "Volunteer Withdrew"),
+                    ("filled", "Filled"),
+                    ("reopened", "Reopened"),
+                    ("completed", "Completed"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shift",
+            index=models.Index(
+                fields=["status", "shift_date"], name="shift_status_date_idx"
+            ),
+        ),
+    ]
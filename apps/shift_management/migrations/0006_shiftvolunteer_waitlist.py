@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shift_management", "0005_shift_lifecycle"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shiftvolunteer",
+            name="waitlist_position",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="shiftvolunteer",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("approved", "Approved"),
+                    ("rejected", "Rejected"),
+                    ("withdrawn", "Withdrawn"),
+                    ("waitlisted", "Waitlisted"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shiftvolunteer",
+            index=models.Index(
+                fields=["shift", "status", "waitlist_position"],
+                name="shiftvol_waitlist_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="shiftvolunteer",
+            constraint=models.UniqueConstraint(
+                fields=("shift", "waitlist_position"),
+                name="shiftvol_unique_waitlist_position",
+            ),
+        ),
+    ]
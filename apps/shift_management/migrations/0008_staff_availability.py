@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("shift_management", "0007_shift_swaps"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Availability",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("week_start", models.DateField()),
+                ("mask", models.BinaryField(max_length=84)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="availability",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "availability",
+                "indexes": [
+                    models.Index(fields=["week_start"], name="availability_week_idx")
+                ],
+                "unique_together": {("user", "week_start")},
+            },
+        ),
+    ]
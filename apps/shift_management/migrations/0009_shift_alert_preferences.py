@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_authentication", "0004_auditlog_indexes"),
+        ("shift_management", "0008_staff_availability"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShiftAlertPreference",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="shift_alerts",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("enabled", models.BooleanField(default=True)),
+                ("whole_region", models.BooleanField(default=False)),
+                ("role_mask", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "home_store",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alert_subscribers",
+                        to="shift_management.store",
+                    ),
+                ),
+            ],
+        ),
+    ]
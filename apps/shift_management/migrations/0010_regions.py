@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shift_management", "0009_shift_alert_preferences"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Region",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("code", models.SlugField(max_length=30, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="shift",
+            name="region",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="shift_management.region",
+            ),
+        ),
+        migrations.AddField(
+            model_name="store",
+            name="region",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="stores",
+                to="shift_management.region",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shift",
+            index=models.Index(
+                fields=["region", "status", "shift_date"],
+                name="shift_region_status_date_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 500
+
+COPIES = {
+    "shift_date": "shift_date",
+    "store_id": "store_id",
+    "manager_id": "manager_id",
+    "role": "role_required",
+    "region_id": "region_id",
+}
+
+
+def copy_shift_columns(apps, schema_editor):
+    """Fill the new copies from each application's shift, a batch of shifts per UPDATE"""
+    Shift = apps.get_model("shift_management", "Shift")
+    ShiftVolunteer = apps.get_model("shift_management", "ShiftVolunteer")
+    source = Shift.objects.filter(id=models.OuterRef("shift_id"))
+    values = {copy: models.Subquery(source.values(field)[:1]) for copy, field in COPIES.items()}
+    shift_ids = list(ShiftVolunteer.objects.order_by("shift_id").values_list("shift_id", flat=True).distinct())
+    for offset in range(0, len(shift_ids), BATCH_SIZE):
+        ShiftVolunteer.objects.filter(shift_id__in=shift_ids[offset:offset + BATCH_SIZE]).update(**values)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("shift_management", "0010_regions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shiftvolunteer",
+            name="manager",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="shiftvolunteer",
+            name="region",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="shift_management.region",
+            ),
+        ),
+        migrations.AddField(
+            model_name="shiftvolunteer",
+            name="role",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("cashier", "Cashier"),
+                    ("stocker", "Stocker"),
+                    ("sales_associate", "Sales Associate"),
+                    ("supervisor", "Supervisor"),
+                    ("cleaner", "Cleaner"),
+                ],
+                editable=False,
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="shiftvolunteer",
+            name="shift_date",
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="shiftvolunteer",
+            name="store",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="shift_management.store",
+            ),
+        ),
+        migrations.RunPython(copy_shift_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="shiftvolunteer",
+            index=models.Index(
+                fields=["manager", "status", "-applied_at"],
+                name="shiftvol_manager_queue_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shiftvolunteer",
+            index=models.Index(
+                fields=["region", "-applied_at"], name="shiftvol_region_applied_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shiftvolunteer",
+            index=models.Index(
+                fields=["store", "shift_date", "status"], name="shiftvol_store_date_idx"
+            ),
+        ),
+    ]
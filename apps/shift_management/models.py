@@ -1,6 +1,21 @@
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 from apps.user_authentication.models import CustomUser
+from helping_hand_core.tenancy import TenantManager
+
+
+class Region(models.Model):
+    """A group of stores run independently of the others; see helping_hand_core.tenancy"""
+    name = models.CharField(max_length=100, unique=True)
+    code = models.SlugField(max_length=30, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
 
 
 class Store(models.Model):
@@ -11,10 +26,16 @@ class Store(models.Model):
     state = models.CharField(max_length=100)
     zip_code = models.CharField(max_length=10)
     phone = models.CharField(max_length=15)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     manager = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, related_name='managed_stores')
+    region = models.ForeignKey(Region, on_delete=models.PROTECT, null=True, blank=True, related_name='stores')
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = models.Manager()
+    in_region = TenantManager()
+
     class Meta:
         ordering = ['name']
     
@@ -49,24 +70,49 @@ class Shift(models.Model):
     end_time = models.TimeField()
     slots_available = models.IntegerField(default=1)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    # Copy of store.region, so region-scoped queries don't need the store join
+    region = models.ForeignKey(Region, on_delete=models.PROTECT, null=True, blank=True, editable=False,
+                               related_name='+', db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = models.Manager()
+    in_region = TenantManager()
+
     class Meta:
         ordering = ['-shift_date', '-start_time']
+        indexes = [
+            # Status filters (open list, lifecycle sweep) always come with a date range
+            models.Index(fields=['status', 'shift_date'], name='shift_status_date_idx'),
+            models.Index(fields=['region', 'status', 'shift_date'], name='shift_region_status_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.store.name} on {self.shift_date}"
     
+    def save(self, *args, **kwargs):
+        self.region_id = self.store.region_id
+        super().save(*args, **kwargs)
+
     def is_past(self):
         """Check if shift date is in the past"""
         return self.shift_date < timezone.now().date()
     
     def available_slots(self):
         """Calculate available slots"""
-        approved_count = self.volunteers.filter(status='approved').count()
+        # The detail page annotates approved_total; elsewhere this costs a query
+        approved_count = getattr(self, 'approved_total', None)
+        if approved_count is None:
+            approved_count = self.volunteers.filter(status='approved').count()
         return self.slots_available - approved_count
     
+    def has_applied(self, user):
+        """Whether ``user`` has any application for this shift"""
+        # viewer_applications holds the applications prefetched for viewer_id only
+        if getattr(self, 'viewer_id', None) == user.id:
+            return bool(self.viewer_applications)
+        return self.volunteers.filter(volunteer=user).exists()
+
     def can_volunteer(self, user):
         """Check if user can volunteer for this shift"""
         if self.status != 'open':
@@ -75,7 +121,19 @@ class Shift(models.Model):
             return False
         if self.available_slots() <= 0:
             return False
-        if self.volunteers.filter(volunteer=user).exists():
+        if self.has_applied(user):
+            return False
+        return True
+
+    def can_join_waitlist(self, user):
+        """Check if user can queue for this shift now that its slots are taken"""
+        if self.status not in ('open', 'filled'):
+            return False
+        if self.is_past():
+            return False
+        if self.available_slots() > 0:
+            return False
+        if self.has_applied(user):
             return False
         return True
 
@@ -87,6 +145,7 @@ class ShiftVolunteer(models.Model):
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
         ('withdrawn', 'Withdrawn'),
+        ('waitlisted', 'Waitlisted'),
     ]
     
     shift = models.ForeignKey(Shift, on_delete=models.CASCADE, related_name='volunteers')
@@ -96,32 +155,222 @@ class ShiftVolunteer(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     reviewed_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviewed_applications')
     notes = models.TextField(blank=True)
+    # Place in the shift's waitlist (first come, first promoted); only set while waitlisted
+    waitlist_position = models.PositiveIntegerField(null=True, blank=True)
+    # Copies of the shift's columns that the manager queue and exports read, so
+    # they scan this table alone. Set on insert, kept in step with shift edits
+    # (copies.py) and checked by `manage.py check_application_copies`.
+    shift_date = models.DateField(null=True, editable=False)
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, null=True, editable=False,
+                              related_name='+', db_index=False)
+    manager = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, editable=False,
+                                related_name='+', db_index=False)
+    role = models.CharField(max_length=20, choices=Shift.ROLE_CHOICES, blank=True, editable=False)
+    region = models.ForeignKey(Region, on_delete=models.PROTECT, null=True, editable=False,
+                               related_name='+', db_index=False)
+
+    # {copied field: Shift field}
+    SHIFT_COPIES = {
+        'shift_date': 'shift_date',
+        'store_id': 'store_id',
+        'manager_id': 'manager_id',
+        'role': 'role_required',
+        'region_id': 'region_id',
+    }
     
+    objects = models.Manager()
+    in_region = TenantManager()
+
     class Meta:
         ordering = ['-applied_at']
         unique_together = ['shift', 'volunteer']
+        indexes = [
+            models.Index(fields=['shift', 'status', 'waitlist_position'], name='shiftvol_waitlist_idx'),
+            models.Index(fields=['manager', 'status', '-applied_at'], name='shiftvol_manager_queue_idx'),
+            models.Index(fields=['region', '-applied_at'], name='shiftvol_region_applied_idx'),
+            models.Index(fields=['store', 'shift_date', 'status'], name='shiftvol_store_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['shift', 'waitlist_position'], name='shiftvol_unique_waitlist_position'),
+        ]
     
     def __str__(self):
         return f"{self.volunteer.username} - {self.shift.title} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        if self.status != 'waitlisted':
+            self.waitlist_position = None
+        if self._state.adding:
+            for copy, source in self.SHIFT_COPIES.items():
+                setattr(self, copy, getattr(self.shift, source))
+        super().save(*args, **kwargs)
+
 
 class ShiftHistory(models.Model):
-    """Track shift changes for audit purposes"""
+    """
+    Track shift changes for audit purposes.
+
+    Rows double as a change feed: ids are increasing, so consumers can sync
+    with "changes since id N", read a short lag window behind (see changes.py).
+    """
     ACTION_CHOICES = [
         ('created', 'Created'),
         ('updated', 'Updated'),
         ('cancelled', 'Cancelled'),
         ('rescheduled', 'Rescheduled'),
+        ('applied', 'Volunteer Applied'),
+        ('approved', 'Volunteer Approved'),
+        ('rejected', 'Volunteer Rejected'),
+        ('withdrawn', 'Volunteer Withdrew'),
+        ('filled', 'Filled'),
+        ('reopened', 'Reopened'),
+        ('completed', 'Completed'),
     ]
+    SHIFT_ACTIONS = ['created', 'updated', 'cancelled', 'rescheduled', 'filled', 'reopened', 'completed']
     
     shift = models.ForeignKey(Shift, on_delete=models.CASCADE, related_name='history')
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
     performed_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True)
+    volunteer = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='application_history')
     description = models.TextField()
+    changes = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
     timestamp = models.DateTimeField(auto_now_add=True)
     
+    objects = models.Manager()
+    in_region = TenantManager('shift__region')
+
     class Meta:
         ordering = ['-timestamp']
     
     def __str__(self):
         return f"{self.shift.title} - {self.action} by {self.performed_by}"
+
+
+class VolunteerStats(models.Model):
+    """
+    Per-volunteer counters behind the leaderboard and profile stats.
+
+    Kept current by the application status code paths (see stats.py) and
+    rebuilt from scratch by the rebuild_volunteer_stats command.
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True,
+                                related_name='volunteer_stats')
+    approved_count = models.PositiveIntegerField(default=0)
+    rejected_count = models.PositiveIntegerField(default=0)
+    withdrawn_count = models.PositiveIntegerField(default=0)
+    minutes_worked = models.PositiveIntegerField(default=0)
+    last_active = models.DateTimeField(null=True, blank=True)
+    # One bit per Shift.ROLE_CHOICES entry the volunteer has been approved for
+    role_mask = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'volunteer stats'
+        indexes = [
+            models.Index(fields=['-approved_count', 'user'], name='volstats_approved_idx'),
+            models.Index(fields=['-minutes_worked', 'user'], name='volstats_minutes_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.approved_count} approved"
+
+    @property
+    def hours_worked(self):
+        return round(self.minutes_worked / 60, 1)
+
+
+class BusyDay(models.Model):
+    """
+    Quarter-hours of one day a volunteer is already booked for, as a 96-bit
+    mask (bit n = minutes 15n..15n+15), derived from approved applications.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='busy_days')
+    day = models.DateField()
+    mask = models.BinaryField(max_length=12)
+
+    class Meta:
+        unique_together = ['user', 'day']
+        indexes = [
+            models.Index(fields=['day'], name='busyday_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} busy on {self.day}"
+
+
+class Availability(models.Model):
+    """
+    When a staff member can work during one week (Monday to Sunday): 7 day
+    masks of 96 quarter-hour bits each, packed Monday first into 84 bytes.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='availability')
+    week_start = models.DateField()
+    mask = models.BinaryField(max_length=84)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'week_start']
+        indexes = [
+            models.Index(fields=['week_start'], name='availability_week_idx'),
+        ]
+        verbose_name_plural = 'availability'
+
+    def __str__(self):
+        return f"{self.user.username} availability for week of {self.week_start}"
+
+
+class ShiftAlertPreference(models.Model):
+    """
+    Which newly posted shifts a staff member wants to hear about: those at
+    their home store (or every store in its region with ``whole_region``; the
+    state stands in for stores without a region) for
+    the roles in ``role_mask`` (one bit per Shift.ROLE_CHOICES entry; 0 = any).
+    """
+    user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, primary_key=True,
+                                related_name='shift_alerts')
+    enabled = models.BooleanField(default=True)
+    home_store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='alert_subscribers')
+    whole_region = models.BooleanField(default=False)
+    role_mask = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} alerts for {self.home_store.name}"
+
+
+class SwapRequest(models.Model):
+    """An approved volunteer offering their place on a shift to a colleague"""
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('accepted', 'Accepted'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    application = models.ForeignKey(ShiftVolunteer, on_delete=models.CASCADE, related_name='swap_requests')
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='swap_requests')
+    # Offered to one colleague only, or to any compatible volunteer when empty
+    offered_to = models.ForeignKey(CustomUser, on_delete=models.CASCADE, null=True, blank=True,
+                                   related_name='swap_offers')
+    taken_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='swaps_taken')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    objects = models.Manager()
+    in_region = TenantManager('application__region')
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='swap_status_created_idx'),
+        ]
+        constraints = [
+            # At most one open offer per application
+            models.UniqueConstraint(fields=['application'], condition=models.Q(status='open'),
+                                    name='swap_one_open_per_application'),
+        ]
+
+    def __str__(self):
+        return f"Swap of {self.application} ({self.status})"
@@ -0,0 +1,184 @@
+"""
+Per-day busy bitmaps for volunteers.
+
+A day is 96 quarter-hour slots; a shift covers the slots from its start
+(rounded down) to its end (rounded up). BusyDay stores, per volunteer and
+day, the OR of every shift they are approved for, so "is this volunteer free
+for that shift?" is ``busy & window == 0`` instead of a query over their
+applications.
+
+Rows are recomputed from the approved shifts of the affected (user, day)
+pairs whenever an application enters or leaves 'approved' (see
+stats.record_status_changes) or a shift with approved volunteers is moved.
+Only days from today on are kept; rebuild_busy_days() recomputes them all.
+
+Availability rows use the same day layout, seven days Monday first per
+week; the helpers at the end of this module convert them to and from the
+"09:00-13:00, 17:00-21:00" text staff type in.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import BusyDay, Shift, ShiftVolunteer
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+MASK_BYTES = SLOTS_PER_DAY // 8
+WEEK_MASK_BYTES = 7 * MASK_BYTES
+
+ROLE_BITS = {role: 1 << index for index, (role, _) in enumerate(Shift.ROLE_CHOICES)}
+
+
+def minutes_mask(start_minutes, end_minutes):
+    """Bits covered from start_minutes to end_minutes after midnight, widened to whole slots"""
+    first = start_minutes // SLOT_MINUTES
+    last = min(-(-end_minutes // SLOT_MINUTES), SLOTS_PER_DAY)
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def window_mask(start_time, end_time):
+    """Bits covered by start_time..end_time on one day"""
+    return minutes_mask(start_time.hour * 60 + start_time.minute,
+                        end_time.hour * 60 + end_time.minute + (1 if end_time.second else 0))
+
+
+def shift_mask(shift):
+    return window_mask(shift.start_time, shift.end_time)
+
+
+def pack(mask):
+    return mask.to_bytes(MASK_BYTES, 'little')
+
+
+def unpack(data):
+    return int.from_bytes(bytes(data), 'little') if data else 0
+
+
+def busy_masks(day, user_ids=None):
+    """{user_id: busy mask} on one day (for everyone booked that day by default); absent users are free"""
+    rows = BusyDay.objects.filter(day=day)
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+    return {user_id: unpack(mask) for user_id, mask in rows.values_list('user_id', 'mask')}
+
+
+def _masks_from_applications(applications):
+    masks = defaultdict(int)
+    for user_id, day, start_time, end_time in applications.exclude(shift__status='cancelled').values_list(
+        'volunteer_id', 'shift__shift_date', 'shift__start_time', 'shift__end_time'
+    ):
+        masks[(user_id, day)] |= window_mask(start_time, end_time)
+    return masks
+
+
+def refresh_busy_days(pairs):
+    """Recompute the BusyDay rows for an iterable of (user_id, day) pairs"""
+    today = timezone.now().date()
+    pairs = {(user_id, day) for user_id, day in pairs if day >= today}
+    if not pairs:
+        return
+    by_day = defaultdict(set)
+    for user_id, day in pairs:
+        by_day[day].add(user_id)
+    match = Q()
+    for day, user_ids in by_day.items():
+        match |= Q(shift__shift_date=day, volunteer_id__in=user_ids)
+    masks = _masks_from_applications(ShiftVolunteer.objects.filter(match, status='approved'))
+
+    stale = Q()
+    for day, user_ids in by_day.items():
+        freed = [user_id for user_id in user_ids if (user_id, day) not in masks]
+        if freed:
+            stale |= Q(day=day, user_id__in=freed)
+    with transaction.atomic():
+        if stale:
+            BusyDay.objects.filter(stale).delete()
+        BusyDay.objects.bulk_create(
+            [BusyDay(user_id=user_id, day=day, mask=pack(mask)) for (user_id, day), mask in masks.items()],
+            update_conflicts=True, unique_fields=['user', 'day'], update_fields=['mask'],
+        )
+
+
+def refresh_shift_busy_days(shift, old_date=None):
+    """Recompute busy days of a shift's approved volunteers after it moved or was cancelled"""
+    user_ids = list(shift.volunteers.filter(status='approved').values_list('volunteer_id', flat=True))
+    days = {shift.shift_date, old_date or shift.shift_date}
+    refresh_busy_days((user_id, day) for user_id in user_ids for day in days)
+
+
+def rebuild_busy_days():
+    """Replace BusyDay with rows computed from every approved upcoming shift; returns the row count"""
+    today = timezone.now().date()
+    masks = _masks_from_applications(
+        ShiftVolunteer.objects.filter(status='approved', shift__shift_date__gte=today)
+    )
+    with transaction.atomic():
+        BusyDay.objects.all().delete()
+        BusyDay.objects.bulk_create(
+            [BusyDay(user_id=user_id, day=day, mask=pack(mask)) for (user_id, day), mask in masks.items()],
+            batch_size=1000,
+        )
+    return len(masks)
+
+
+def week_start(day):
+    """The Monday of the week ``day`` falls in"""
+    return day - timedelta(days=day.weekday())
+
+
+def pack_week(day_masks):
+    """Seven day masks, Monday first, as one Availability.mask value"""
+    return b''.join(pack(mask) for mask in day_masks)
+
+
+def unpack_week(data):
+    data = bytes(data or b'').ljust(WEEK_MASK_BYTES, b'\0')
+    return [unpack(data[offset:offset + MASK_BYTES]) for offset in range(0, WEEK_MASK_BYTES, MASK_BYTES)]
+
+
+def day_of_week(data, weekday):
+    """One day's mask out of a packed week, without unpacking the other six"""
+    offset = weekday * MASK_BYTES
+    return unpack(data[offset:offset + MASK_BYTES])
+
+
+def _minutes(text):
+    hours, _, minutes = text.strip().partition(':')
+    hours, minutes = int(hours), int(minutes or 0)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError
+    return hours * 60 + minutes
+
+
+def parse_ranges(text):
+    """Mask for comma-separated "HH:MM-HH:MM" ranges; raises ValueError with a message on bad input"""
+    mask = 0
+    for part in filter(None, (part.strip() for part in (text or '').split(','))):
+        start, dash, end = part.partition('-')
+        try:
+            start_minutes, end_minutes = _minutes(start), _minutes(end)
+        except ValueError:
+            raise ValueError(f'"{part}" is not a time range like 09:00-17:00.') from None
+        if not dash or end_minutes <= start_minutes:
+            raise ValueError(f'"{part}" must end after it starts.')
+        mask |= minutes_mask(start_minutes, end_minutes)
+    return mask
+
+
+def format_ranges(mask):
+    """The inverse of parse_ranges: "09:00-13:00, 17:00-21:00" for a day mask"""
+    ranges, slot = [], 0
+    while slot < SLOTS_PER_DAY:
+        if not mask >> slot & 1:
+            slot += 1
+            continue
+        first = slot
+        while slot < SLOTS_PER_DAY and mask >> slot & 1:
+            slot += 1
+        ranges.append('-'.join('%02d:%02d' % divmod(n * SLOT_MINUTES, 60) for n in (first, slot)))
+    return ', '.join(ranges)
@@ -0,0 +1,163 @@
+"""
+Full-text search over shifts.
+
+On SQLite the index is an FTS5 virtual table keyed by shift id, kept in sync
+with Shift/Store by the receivers in signals.py. On PostgreSQL the same
+ranking is done with SearchVector/SearchRank backed by a GIN expression index.
+Other backends fall back to icontains lookups.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'shift_management_shift_search'
+
+# bm25 column weights: title, description, store name, city
+FTS_WEIGHTS = (10.0, 1.0, 5.0, 5.0)
+
+# Must match the GIN expression index so PostgreSQL can use it
+PG_SHIFT_VECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+PG_STORE_VECTOR = "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(city, ''))"
+
+
+def _fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def _fts_query(text):
+    """Turn free text into a safe FTS5 prefix query ("word"* "word"*)"""
+    terms = re.findall(r'\w+', text.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def ensure_search_index(using='default', **kwargs):
+    """Create the search index if missing and backfill it (post_migrate hook)"""
+    from django.db import connections
+    conn = connections[using]
+    with conn.cursor() as cursor:
+        if conn.vendor == 'sqlite':
+            if FTS_TABLE in conn.introspection.table_names(cursor):
+                return
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"title, description, store_name, city, tokenize='porter unicode61')"
+            )
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description, store_name, city) "
+                f"SELECT s.id, s.title, s.description, st.name, st.city "
+                f"FROM shift_management_shift s JOIN shift_management_store st ON st.id = s.store_id"
+            )
+        elif conn.vendor == 'postgresql':
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS shift_management_shift_search_gin "
+                f"ON shift_management_shift USING GIN ({PG_SHIFT_VECTOR})"
+            )
+
+
+def index_shift(shift):
+    """Insert or refresh one shift in the search index"""
+    if not _fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [shift.id])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, store_name, city) VALUES (%s, %s, %s, %s, %s)",
+            [shift.id, shift.title, shift.description, shift.store.name, shift.store.city]
+        )
+
+
+def index_shifts(shift_ids):
+    """Refresh many shifts in the search index with set-based statements"""
+    if not _fts_enabled() or not shift_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(shift_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", list(shift_ids))
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, store_name, city) "
+            f"SELECT s.id, s.title, s.description, st.name, st.city "
+            f"FROM shift_management_shift s JOIN shift_management_store st ON st.id = s.store_id "
+            f"WHERE s.id IN ({placeholders})",
+            list(shift_ids)
+        )
+
+
+def unindex_shift(shift_id):
+    """Remove a shift from the search index"""
+    if not _fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [shift_id])
+
+
+def reindex_store(store):
+    """Propagate a store's name/city to all of its indexed shifts"""
+    if not _fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {FTS_TABLE} SET store_name = %s, city = %s "
+            f"WHERE rowid IN (SELECT id FROM shift_management_shift WHERE store_id = %s)",
+            [store.name, store.city, store.id]
+        )
+
+
+def rebuild_search_index():
+    """Drop and rebuild the whole index from the Shift/Store tables"""
+    if _fts_enabled():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    ensure_search_index(using=connection.alias)
+
+
+def search_shifts(queryset, text):
+    """
+    Filter a Shift queryset down to matches for ``text``, ordered by relevance.
+
+    Matches are annotated with ``search_rank`` where higher is better.
+    """
+    if not text.strip():
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if connection.vendor == 'sqlite':
+        match = _fts_query(text)
+        if not match:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+        weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = shift_management_shift.id",
+                [match]
+            )
+        ).order_by('-search_rank')
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+        vector = (
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('store__name', 'store__city', weight='B', config='english')
+            + SearchVector('description', weight='C', config='english')
+        )
+        query = SearchQuery(text, search_type='websearch', config='english')
+        shift_matches = RawSQL(
+            f"SELECT id FROM shift_management_shift "
+            f"WHERE {PG_SHIFT_VECTOR} @@ websearch_to_tsquery('english', %s)", [text]
+        )
+        store_matches = RawSQL(
+            f"SELECT id FROM shift_management_store "
+            f"WHERE {PG_STORE_VECTOR} @@ websearch_to_tsquery('english', %s)", [text]
+        )
+        return queryset.filter(
+            Q(id__in=shift_matches) | Q(store_id__in=store_matches)
+        ).annotate(search_rank=SearchRank(vector, query)).order_by('-search_rank')
+
+    condition = Q()
+    for term in text.split():
+        condition &= (Q(title__icontains=term) | Q(description__icontains=term)
+                      | Q(store__name__icontains=term) | Q(store__city__icontains=term))
+    return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
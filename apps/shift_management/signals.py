@@ -0,0 +1,62 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .models import Shift, Store
+from . import copies, geo, search
+
+
+@receiver(post_save, sender=Shift)
+def index_saved_shift(sender, instance, **kwargs):
+    """Keep the search index in step with shift edits"""
+    search.index_shift(instance)
+
+
+@receiver(post_save, sender=Shift)
+def sync_application_copies(sender, instance, created, **kwargs):
+    """ShiftVolunteer carries copies of the shift's date, store, manager, role and region"""
+    if not created:
+        copies.sync_shift(instance)
+
+
+@receiver(post_delete, sender=Shift)
+def unindex_deleted_shift(sender, instance, **kwargs):
+    search.unindex_shift(instance.id)
+
+
+@receiver(post_save, sender=Store)
+def propagate_store_region(sender, instance, created, **kwargs):
+    """Shift.region copies the store's region"""
+    if not created:
+        Shift.objects.filter(store=instance).exclude(region_id=instance.region_id).update(
+            region_id=instance.region_id
+        )
+        copies.sync_store_region(instance)
+
+
+@receiver(post_save, sender=Store)
+def reindex_store_shifts(sender, instance, created, **kwargs):
+    """Store name/city are part of every shift's indexed text"""
+    if not created:
+        search.reindex_store(instance)
+
+
+@receiver(pre_save, sender=Store)
+def geocode_store(sender, instance, **kwargs):
+    """Fill in coordinates from the offline centroid table when missing or when the zip code moves"""
+    stale = False
+    if instance.pk and instance.latitude is not None and instance.longitude is not None:
+        stored = Store.objects.filter(pk=instance.pk).values_list('zip_code', 'latitude', 'longitude').first()
+        # Coordinates set by hand along with the new zip code are kept
+        stale = (stored is not None and stored[0] != instance.zip_code
+                 and stored[1:] == (instance.latitude, instance.longitude))
+    if stale or instance.latitude is None or instance.longitude is None:
+        coords = geo.geocode_zip(instance.zip_code)
+        if coords:
+            instance.latitude, instance.longitude = coords
+        elif stale:
+            instance.latitude = instance.longitude = None
+
+
+@receiver(post_save, sender=Store)
+@receiver(post_delete, sender=Store)
+def invalidate_store_geo_index(sender, **kwargs):
+    geo.invalidate_store_index()
@@ -0,0 +1,185 @@
+"""
+Incrementally maintained VolunteerStats.
+
+Status changes adjust the counters with F() updates, so the leaderboard and
+profile stats are indexed reads instead of a Count over every application.
+Callers pass (application, old status) pairs; users whose counters change by
+the same amounts share one UPDATE, so a bulk review costs a handful of
+statements rather than one per application.
+
+rebuild_volunteer_stats() recomputes the table from ShiftVolunteer and
+ShiftHistory and is the reference the incremental path must agree with.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from helping_hand_core.tenancy import current_region
+from .models import ShiftHistory, ShiftVolunteer, VolunteerStats
+from .schedule import ROLE_BITS, refresh_busy_days
+
+COUNTED_STATUSES = {
+    'approved': 'approved_count',
+    'rejected': 'rejected_count',
+    'withdrawn': 'withdrawn_count',
+}
+
+LEADERBOARD_ORDERINGS = {
+    'approved': ['-approved_count', 'user_id'],
+    'hours': ['-minutes_worked', 'user_id'],
+}
+
+
+def shift_minutes(start_time, end_time):
+    """Length of a shift in whole minutes; an end at or before the start runs past midnight"""
+    start = datetime.combine(datetime.min, start_time)
+    end = datetime.combine(datetime.min, end_time)
+    if end <= start:
+        end += timedelta(days=1)
+    return int((end - start).total_seconds() // 60)
+
+
+def _apply_deltas(deltas, when):
+    """deltas is {user_id: {field: change}}; every listed user gets last_active = when"""
+    if not deltas:
+        return
+    VolunteerStats.objects.bulk_create(
+        [VolunteerStats(user_id=user_id) for user_id in deltas], ignore_conflicts=True
+    )
+    groups = defaultdict(list)
+    for user_id, changes in deltas.items():
+        groups[tuple(sorted((field, n) for field, n in changes.items() if n))].append(user_id)
+    for changes, user_ids in groups.items():
+        # Clamped at zero: rows that drifted (or predate the table) must not fail the
+        # status change itself; rebuild_volunteer_stats puts them right
+        VolunteerStats.objects.filter(user_id__in=user_ids).update(
+            last_active=when, **{field: Greatest(F(field) + n, Value(0)) for field, n in changes}
+        )
+
+
+def record_status_changes(changes, when=None):
+    """
+    Apply [(application, old status)] to the volunteers' stats and busy days.
+
+    old status is None for a new application, which only marks the volunteer
+    active. Applications need their shift loaded for the hours.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    new_roles = defaultdict(list)
+    busy_changes = set()
+    for application, old_status in changes:
+        entry = deltas[application.volunteer_id]
+        for status, sign in ((old_status, -1), (application.status, 1)):
+            field = COUNTED_STATUSES.get(status)
+            if field:
+                entry[field] += sign
+            if status == 'approved':
+                shift = application.shift
+                entry['minutes_worked'] += sign * shift_minutes(shift.start_time, shift.end_time)
+        if (old_status == 'approved') != (application.status == 'approved'):
+            busy_changes.add((application.volunteer_id, application.shift.shift_date))
+        if application.status == 'approved' and application.shift.role_required in ROLE_BITS:
+            new_roles[ROLE_BITS[application.shift.role_required]].append(application.volunteer_id)
+    _apply_deltas(deltas, when or timezone.now())
+    for bit, user_ids in new_roles.items():
+        VolunteerStats.objects.filter(user_id__in=user_ids).update(role_mask=F('role_mask').bitor(bit))
+    refresh_busy_days(busy_changes)
+
+
+def record_status_change(application, old_status):
+    record_status_changes([(application, old_status)])
+
+
+def reschedule_shift_minutes(shift, old_start_time, old_end_time):
+    """Move approved volunteers' hours to a shift's new start/end times"""
+    change = (shift_minutes(shift.start_time, shift.end_time)
+              - shift_minutes(old_start_time, old_end_time))
+    if not change:
+        return 0
+    user_ids = ShiftVolunteer.objects.filter(shift=shift, status='approved').values('volunteer_id')
+    return VolunteerStats.objects.filter(user_id__in=user_ids).update(
+        minutes_worked=Greatest(F('minutes_worked') + change, Value(0))
+    )
+
+
+def compute_volunteer_stats():
+    """{user_id: field values} recomputed from the full application history"""
+    stats = {}
+    rows = ShiftVolunteer.objects.order_by().values('volunteer_id').annotate(
+        approved=Count('id', filter=Q(status='approved')),
+        rejected=Count('id', filter=Q(status='rejected')),
+        withdrawn=Count('id', filter=Q(status='withdrawn')),
+        last_applied=Max('applied_at'),
+        last_reviewed=Max('reviewed_at'),
+    )
+    for row in rows:
+        stats[row['volunteer_id']] = {
+            'approved_count': row['approved'],
+            'rejected_count': row['rejected'],
+            'withdrawn_count': row['withdrawn'],
+            'minutes_worked': 0,
+            'role_mask': 0,
+            'last_active': max(filter(None, (row['last_applied'], row['last_reviewed']))),
+        }
+
+    # Hours need the shift's times; grouping by them keeps this one row per distinct length and role
+    rows = ShiftVolunteer.objects.filter(status='approved').order_by().values(
+        'volunteer_id', 'shift__start_time', 'shift__end_time', 'shift__role_required'
+    ).annotate(shifts=Count('id'))
+    for row in rows:
+        entry = stats[row['volunteer_id']]
+        entry['minutes_worked'] += shift_minutes(row['shift__start_time'], row['shift__end_time']) * row['shifts']
+        entry['role_mask'] |= ROLE_BITS.get(row['shift__role_required'], 0)
+
+    # Roles stay qualified after the approval is withdrawn, so past approvals count too
+    rows = ShiftHistory.objects.filter(action='approved', volunteer__isnull=False).order_by().values_list(
+        'volunteer_id', 'shift__role_required'
+    ).distinct()
+    for user_id, role in rows:
+        entry = stats.get(user_id)
+        if entry:
+            entry['role_mask'] |= ROLE_BITS.get(role, 0)
+
+    # Withdrawals don't touch the application's timestamps; the change feed has them
+    rows = ShiftHistory.objects.filter(action='withdrawn', volunteer__isnull=False).order_by().values(
+        'volunteer_id'
+    ).annotate(last=Max('timestamp'))
+    for row in rows:
+        entry = stats.get(row['volunteer_id'])
+        if entry:
+            entry['last_active'] = max(entry['last_active'], row['last'])
+
+    return stats
+
+
+def rebuild_volunteer_stats():
+    """Replace the VolunteerStats table with freshly computed rows; returns the row count"""
+    rows = [VolunteerStats(user_id=user_id, **values) for user_id, values in compute_volunteer_stats().items()]
+    with transaction.atomic():
+        VolunteerStats.objects.all().delete()
+        VolunteerStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def top_volunteers(limit=10, order='approved'):
+    """
+    Top-K staff by approved shifts or hours, read along the matching index.
+
+    Filtering on role in SQL makes the database drive the query from the user
+    table and sort every stats row; reading ``limit * 2`` rows off the index and
+    skipping the rare non-staff row in Python is usually enough. When it is
+    not, one role-filtered query settles it. Inside a region scope the region
+    is filtered in SQL, so a small region never pages through the others.
+    """
+    region_id = current_region()
+    rows = VolunteerStats.objects.select_related('user').order_by(*LEADERBOARD_ORDERINGS[order])
+    if region_id is not None:
+        rows = rows.filter(user__region_id=region_id)
+    batch = list(rows[:limit * 2])
+    leaders = [row for row in batch if row.user.role == 'staff']
+    if len(leaders) < limit and len(batch) == limit * 2:
+        leaders = list(rows.filter(user__role='staff')[:limit])
+    return leaders[:limit]
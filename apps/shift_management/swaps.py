@@ -0,0 +1,158 @@
+"""
+Shift swap marketplace.
+
+An approved volunteer can offer their place on an upcoming shift to one
+colleague or to anyone compatible. A taker is compatible when they are an
+active staff member with no application for the shift, have been approved
+for the shift's role before, and aren't booked for an overlapping time that
+day. The last two are bitwise tests on precomputed data:
+VolunteerStats.role_mask and the BusyDay masks (schedule.py). So finding
+takers reads the day's busy rows once and walks qualified user ids until
+the shortlist is full, whatever the size of the application history.
+
+accept() hands the place over in one transaction with the swap, the shift
+and the original application locked. It re-checks the taker, withdraws the
+requester, approves the taker and verifies the shift is not over capacity.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from apps.dashboard_reports.summary import invalidate_users
+from apps.notifications.tasks import deliver_notifications
+from apps.user_authentication.models import CustomUser
+from helping_hand_core.tasks import enqueue
+from .changes import application_change
+from .models import Shift, ShiftHistory, ShiftVolunteer, SwapRequest, VolunteerStats
+from .schedule import ROLE_BITS, busy_masks, shift_mask
+from .stats import record_status_changes
+
+MAX_TAKERS = 20
+
+
+class SwapError(Exception):
+    """A swap that can't be offered or taken; the message is shown to the user"""
+
+
+def _qualified(shift):
+    """Active staff approved for the shift's role before, with no application for this shift"""
+    return VolunteerStats.objects.alias(
+        role_bit=F('role_mask').bitand(ROLE_BITS[shift.role_required])
+    ).filter(role_bit__gt=0, user__role='staff', user__is_active=True).exclude(
+        user_id__in=shift.volunteers.values('volunteer_id')
+    )
+
+
+def find_takers(shift, limit=MAX_TAKERS, exclude=()):
+    """
+    Compatible takers for a place on ``shift``: regulars at the shift's store
+    first, then by approved shifts. Returns CustomUser objects.
+    """
+    window = shift_mask(shift)
+    busy = busy_masks(shift.shift_date)
+    candidates = _qualified(shift).exclude(user_id__in=exclude).order_by('-approved_count', 'user_id')
+    # Only ids are streamed and the walk stops once the shortlist is full; store
+    # experience then orders that bounded shortlist
+    shortlist = []
+    for user_id in candidates.values_list('user_id', flat=True).iterator(chunk_size=2000):
+        if not busy.get(user_id, 0) & window:
+            shortlist.append(user_id)
+            if len(shortlist) == limit * 5:
+                break
+    regulars = set(ShiftVolunteer.objects.filter(
+        volunteer_id__in=shortlist, status='approved', shift__store_id=shift.store_id
+    ).values_list('volunteer_id', flat=True))
+    shortlist.sort(key=lambda user_id: user_id not in regulars)
+    users = CustomUser.objects.in_bulk(shortlist[:limit])
+    return [users[user_id] for user_id in shortlist[:limit]]
+
+
+def can_take(shift, user):
+    """Whether ``user`` is a compatible taker for a place on ``shift``"""
+    if not _qualified(shift).filter(user_id=user.id).exists():
+        return False
+    return not busy_masks(shift.shift_date, [user.id]).get(user.id, 0) & shift_mask(shift)
+
+
+def _check_swappable(application):
+    shift = application.shift
+    if application.status != 'approved':
+        raise SwapError('Only approved places can be swapped.')
+    if shift.is_past() or shift.status not in ('open', 'filled'):
+        raise SwapError('This shift can no longer be swapped.')
+
+
+def offer(application, offered_to=None, note=''):
+    """Open a swap request for an approved application and notify the likely takers"""
+    _check_swappable(application)
+    shift = application.shift
+    if SwapRequest.objects.filter(application=application, status='open').exists():
+        raise SwapError('This place is already on offer.')
+    if offered_to is not None and (offered_to.id == application.volunteer_id or not can_take(shift, offered_to)):
+        raise SwapError(f'{offered_to.get_full_name() or offered_to.username} can\'t take this shift.')
+
+    with transaction.atomic():
+        swap = SwapRequest.objects.create(application=application, requested_by=application.volunteer,
+                                          offered_to=offered_to, note=note)
+        recipients = [offered_to] if offered_to else find_takers(shift, exclude=[application.volunteer_id])
+        enqueue(deliver_notifications, [dict(
+            recipient_id=user.id,
+            notification_type='shift_swap',
+            title='Shift Up for Grabs',
+            message=f'{application.volunteer.get_full_name()} is offering their place on "{shift.title}" '
+                    f'on {shift.shift_date} ({shift.start_time:%H:%M}-{shift.end_time:%H:%M}).',
+            link='/shifts/swaps/'
+        ) for user in recipients])
+    return swap
+
+
+def cancel(swap, user):
+    if swap.requested_by_id != user.id or swap.status != 'open':
+        raise SwapError('This swap can\'t be cancelled.')
+    swap.status = 'cancelled'
+    swap.resolved_at = timezone.now()
+    swap.save(update_fields=['status', 'resolved_at'])
+
+
+def accept(swap_id, user):
+    """Move the place on the shift from the requester to ``user``; returns the taker's application"""
+    with transaction.atomic():
+        swap = SwapRequest.objects.select_for_update().get(id=swap_id)
+        shift = Shift.objects.select_for_update().get(id=swap.application.shift_id)
+        application = ShiftVolunteer.objects.select_for_update().select_related('volunteer').get(
+            id=swap.application_id
+        )
+        application.shift = shift
+        if swap.status != 'open':
+            raise SwapError('This swap has already been taken or withdrawn.')
+        if swap.offered_to_id and swap.offered_to_id != user.id:
+            raise SwapError('This swap was offered to someone else.')
+        _check_swappable(application)
+        if not can_take(shift, user):
+            raise SwapError('You can\'t take this shift: it clashes with your bookings '
+                            'or needs experience in the role.')
+
+        now = timezone.now()
+        application.status = 'withdrawn'
+        application.save()
+        taken = ShiftVolunteer.objects.create(shift=shift, volunteer=user, status='approved', reviewed_at=now,
+                                              notes=f'Swapped in for {application.volunteer.username}')
+        if shift.volunteers.filter(status='approved').count() > shift.slots_available:
+            raise SwapError('The shift is over capacity; ask the manager to review it.')
+
+        swap.status, swap.taken_by, swap.resolved_at = 'accepted', user, now
+        swap.save(update_fields=['status', 'taken_by', 'resolved_at'])
+        ShiftHistory.objects.bulk_create([
+            application_change(application, 'withdrawn', application.volunteer, 'approved'),
+            application_change(taken, 'approved', user, None),
+        ])
+        record_status_changes([(application, 'approved'), (taken, None)], when=now)
+        enqueue(deliver_notifications, [dict(
+            recipient_id=recipient_id,
+            notification_type='shift_swap',
+            title='Shift Swapped',
+            message=f'{user.get_full_name() or user.username} took over {application.volunteer.get_full_name()}\'s '
+                    f'place on "{shift.title}" on {shift.shift_date}.',
+            link=f'/shifts/{shift.id}/'
+        ) for recipient_id in (application.volunteer_id, shift.manager_id)])
+        invalidate_users([application.volunteer_id, user.id, shift.manager_id])
+    return taken
@@ -1,6 +1,31 @@
-from django.test import TestCase
+from io import StringIO
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from datetime import date, time, timedelta
+from apps.notifications.models import Notification
+from apps.user_authentication.models import AuditLog
+from apps.shift_management.models import (Region, Store, Shift, ShiftVolunteer, ShiftHistory, VolunteerStats,
+                                          Availability, BusyDay, ShiftAlertPreference, SwapRequest)
+from apps.shift_management.alerts import shift_audience
+from apps.shift_management.availability import available_staff, set_availability
+from apps.shift_management.changes import changes_since, iter_changes
+from apps.shift_management.copies import find_drift
+from apps.shift_management.geo import StoreGridIndex, geocode_zip, haversine_km
+from apps.shift_management.ical import calendar_token
+from apps.shift_management.lifecycle import InvalidTransition, check_transition, sweep
+from apps.shift_management.search import search_shifts
+from apps.shift_management.schedule import ROLE_BITS, format_ranges, parse_ranges, unpack, unpack_week, window_mask
+from apps.shift_management.stats import compute_volunteer_stats, record_status_changes, top_volunteers
+from apps.shift_management.swaps import find_takers
+from apps.shift_management.views import shift_list_view_async
+from apps.shift_management.waitlist import promote
+from helping_hand_core.tenancy import RegionRouter, region_scope
 
 User = get_user_model()
 
@@ -67,3 +92,1100 @@ class ShiftViewTestCase(TestCase):
         self.client.login(username='manager1', password='pass123')
         response = self.client.get('/shifts/manager/create/')
         self.assertEqual(response.status_code, 200)
+
+
+class ShiftDetailTestCase(TestCase):
+    """Test the shift detail page is built from the joined shift and one prefetch"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', first_name='Mia', last_name='Rao',
+                                                password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff1', password='pass123', role='staff')
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+        self.shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Weekend Rush', description='Help out',
+            role_required='cashier', shift_date=date.today() + timedelta(days=3),
+            start_time=time(9, 0), end_time=time(17, 0), slots_available=3
+        )
+        for i in range(2):
+            ShiftVolunteer.objects.create(
+                shift=self.shift, status='approved',
+                volunteer=User.objects.create_user(username=f'other{i}', password='pass123', role='staff')
+            )
+        self.client.force_login(self.staff)
+
+    def _shift_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/shifts/{self.shift.id}/')
+        self.assertEqual(response.status_code, 200)
+        return response, [q['sql'] for q in queries if 'shift_management_' in q['sql']]
+
+    def test_detail_uses_two_queries(self):
+        """Test the shift, store, manager and slot count come in one query plus the viewer's application"""
+        response, queries = self._shift_queries()
+        self.assertEqual(len(queries), 2)
+        self.assertContains(response, 'Mia Rao')
+        self.assertTrue(response.context['can_volunteer'])
+        self.assertEqual(response.context['shift'].available_slots(), 1)
+
+        application = ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.staff)
+        response, queries = self._shift_queries()
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(response.context['user_application'], application)
+        self.assertFalse(response.context['can_volunteer'])
+
+    @override_settings(SHIFT_DETAIL_CACHE_TTL=30)
+    def test_detail_cache_is_keyed_on_updated_at(self):
+        """Test a cached shift skips the join and is replaced as soon as the shift is edited"""
+        cache.clear()
+        self._shift_queries()
+        response, queries = self._shift_queries()
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('JOIN', queries[0])
+        self.assertContains(response, 'Weekend Rush')
+
+        self.shift.title = 'Holiday Rush'
+        self.shift.save()
+        response, _ = self._shift_queries()
+        self.assertContains(response, 'Holiday Rush')
+
+
+class ApplicationCopiesTestCase(TestCase):
+    """Test the shift columns copied onto applications stay in step and back the manager queue"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.other_manager = User.objects.create_user(username='manager2', password='pass123', role='manager')
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+        self.other_store = Store.objects.create(name='Store 2', address='2 Main St', city='Bengaluru',
+                                                state='KA', zip_code='560001', phone='1234567890')
+        self.shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Weekend Rush', description='Help out',
+            role_required='cashier', shift_date=date.today() + timedelta(days=3),
+            start_time=time(9, 0), end_time=time(17, 0), slots_available=2
+        )
+        self.application = ShiftVolunteer.objects.create(
+            shift=self.shift, volunteer=User.objects.create_user(username='staff1', password='pass123', role='staff')
+        )
+
+    def _copies(self):
+        return ShiftVolunteer.objects.filter(id=self.application.id).values(
+            'shift_date', 'store_id', 'manager_id', 'role', 'region_id'
+        ).get()
+
+    def test_copies_follow_shift_and_store_edits(self):
+        """Test copies are set on insert and follow shift edits and store region changes"""
+        self.assertEqual(self._copies(), {'shift_date': self.shift.shift_date, 'store_id': self.store.id,
+                                          'manager_id': self.manager.id, 'role': 'cashier', 'region_id': None})
+        self.shift.shift_date += timedelta(days=1)
+        self.shift.store, self.shift.manager, self.shift.role_required = self.other_store, self.other_manager, 'stocker'
+        self.shift.save()
+        region = Region.objects.create(name='South', code='south')
+        self.other_store.region = region
+        self.other_store.save()
+        self.assertEqual(self._copies(), {'shift_date': self.shift.shift_date, 'store_id': self.other_store.id,
+                                          'manager_id': self.other_manager.id, 'role': 'stocker',
+                                          'region_id': region.id})
+
+    def test_check_command_repairs_drift(self):
+        """Test check_application_copies reports rows changed behind the model's back and fixes them"""
+        ShiftVolunteer.objects.filter(id=self.application.id).update(manager=self.other_manager, shift_date=None)
+        self.assertEqual(find_drift(), {self.shift.id})
+        out = StringIO()
+        call_command('check_application_copies', '--check', stdout=out, stderr=StringIO())
+        self.assertIn('1 shifts', out.getvalue())
+        call_command('check_application_copies', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(find_drift(), set())
+        self.assertEqual(self._copies()['manager_id'], self.manager.id)
+
+    def test_pending_queue_reads_application_table(self):
+        """Test the manager's pending list filters on the copied manager column"""
+        self.client.login(username='manager1', password='pass123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/shifts/manager/')
+        self.assertEqual(list(response.context['pending_applications']), [self.application])
+        pending_sql = next(q['sql'] for q in queries if '"status" = \'pending\'' in q['sql'])
+        self.assertIn('"shift_management_shiftvolunteer"."manager_id"', pending_sql)
+        self.client.login(username='manager2', password='pass123')
+        response = self.client.get('/shifts/manager/')
+        self.assertEqual(list(response.context['pending_applications']), [])
+
+
+class BulkReviewTestCase(TestCase):
+    """Test bulk approve/reject of volunteer applications"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.other_manager = User.objects.create_user(username='manager2', password='pass123', role='manager')
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+        self.shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Weekend Rush', description='Help out',
+            role_required='cashier', shift_date=date.today() + timedelta(days=3),
+            start_time=time(9, 0), end_time=time(17, 0), slots_available=2
+        )
+        self.other_shift = Shift.objects.create(
+            store=self.store, manager=self.other_manager, title='Other Shift', description='Help out',
+            role_required='cashier', shift_date=date.today() + timedelta(days=3),
+            start_time=time(9, 0), end_time=time(17, 0), slots_available=2
+        )
+        self.applications = [
+            ShiftVolunteer.objects.create(
+                shift=self.shift,
+                volunteer=User.objects.create_user(username=f'staff{i}', password='pass123', role='staff')
+            )
+            for i in range(3)
+        ]
+        self.foreign_application = ShiftVolunteer.objects.create(
+            shift=self.other_shift, volunteer=self.applications[0].volunteer
+        )
+        self.client.login(username='manager1', password='pass123')
+
+    def test_bulk_review_requires_post(self):
+        """Test bulk review rejects GET requests"""
+        response = self.client.get('/shifts/manager/applications/bulk-review/')
+        self.assertEqual(response.status_code, 405)
+
+    def test_bulk_approve_respects_slot_capacity(self):
+        """Test only as many applications as free slots are approved"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/shifts/manager/applications/bulk-review/', {
+                'decision': 'approve',
+                'application_ids': [app.id for app in self.applications],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.shift.volunteers.filter(status='approved').count(), 2)
+        self.assertEqual(self.shift.volunteers.filter(status='pending').count(), 1)
+        self.assertEqual(Notification.objects.filter(notification_type='application_approved').count(), 2)
+        self.assertEqual(AuditLog.objects.filter(action='approve').count(), 2)
+        self.assertTrue(AuditLog.objects.get(details__application_id=self.applications[0].id)
+                        .description.startswith('Approved volunteer: staff0'))
+
+    def test_bulk_reject_ignores_other_managers_applications(self):
+        """Test managers cannot review applications for shifts they do not own"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/shifts/manager/applications/bulk-review/', {
+                'decision': 'reject',
+                'application_ids': [self.applications[0].id, self.foreign_application.id],
+            })
+        self.applications[0].refresh_from_db()
+        self.foreign_application.refresh_from_db()
+        self.assertEqual(self.applications[0].status, 'rejected')
+        self.assertEqual(self.foreign_application.status, 'pending')
+        self.assertEqual(AuditLog.objects.get(action='reject').description,
+                         'Rejected volunteer: staff0 for Weekend Rush')
+
+
+class ShiftSearchTestCase(TestCase):
+    """Test full-text shift search"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff1', password='pass123', role='staff')
+        self.store = Store.objects.create(name='Central Mart', address='1 Main St', city='Mysuru',
+                                          state='KA', zip_code='570001', phone='1234567890')
+        self.other_store = Store.objects.create(name='Lake View', address='2 Lake Rd', city='Bengaluru',
+                                                state='KA', zip_code='560001', phone='1234567890')
+        upcoming = date.today() + timedelta(days=2)
+        self.cashier_shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Holiday cashier', description='Busy tills',
+            role_required='cashier', shift_date=upcoming, start_time=time(9, 0), end_time=time(17, 0)
+        )
+        self.stock_shift = Shift.objects.create(
+            store=self.other_store, manager=self.manager, title='Restock aisles', description='Unload trucks',
+            role_required='stocker', shift_date=upcoming, start_time=time(9, 0), end_time=time(17, 0)
+        )
+        self.client.login(username='staff1', password='pass123')
+
+    def test_keyword_search_matches_title_and_description(self):
+        """Test keyword search finds shifts by title and description words"""
+        response = self.client.get('/shifts/', {'q': 'cashier'})
+        self.assertEqual(list(response.context['shifts']), [self.cashier_shift])
+        response = self.client.get('/shifts/', {'q': 'trucks'})
+        self.assertEqual(list(response.context['shifts']), [self.stock_shift])
+
+    def test_city_filter(self):
+        """Test shifts can be filtered by store city"""
+        response = self.client.get('/shifts/', {'city': 'bengaluru'})
+        self.assertEqual(list(response.context['shifts']), [self.stock_shift])
+
+    def test_store_rename_updates_index(self):
+        """Test renaming a store is reflected in search results"""
+        self.store.name = 'Riverside Mart'
+        self.store.save()
+        response = self.client.get('/shifts/', {'q': 'riverside'})
+        self.assertEqual(list(response.context['shifts']), [self.cashier_shift])
+
+    def test_admin_search_uses_index(self):
+        """Test admin shift search goes through the full-text index"""
+        User.objects.create_superuser(username='root', password='pass123', email='root@test.com')
+        self.client.login(username='root', password='pass123')
+        response = self.client.get('/admin/shift_management/shift/', {'q': 'restock'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['cl'].result_list), [self.stock_shift])
+
+
+class ShiftsNearMeTestCase(TestCase):
+    """Test offline geocoding and the radius filter"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff1', password='pass123', role='staff')
+        self.bengaluru = Store.objects.create(name='MG Road', address='1 MG Rd', city='Bengaluru',
+                                              state='KA', zip_code='560001', phone='1234567890')
+        self.mysuru = Store.objects.create(name='Palace Rd', address='2 Palace Rd', city='Mysuru',
+                                           state='KA', zip_code='570001', phone='1234567890')
+        upcoming = date.today() + timedelta(days=2)
+        self.near_shift = Shift.objects.create(
+            store=self.bengaluru, manager=self.manager, title='Near', description='Near shift',
+            role_required='cashier', shift_date=upcoming, start_time=time(9, 0), end_time=time(17, 0)
+        )
+        self.far_shift = Shift.objects.create(
+            store=self.mysuru, manager=self.manager, title='Far', description='Far shift',
+            role_required='cashier', shift_date=upcoming, start_time=time(9, 0), end_time=time(17, 0)
+        )
+        self.client.login(username='staff1', password='pass123')
+
+    def test_stores_are_geocoded_on_save(self):
+        """Test new stores get coordinates from the bundled centroid table"""
+        self.assertIsNotNone(self.bengaluru.latitude)
+        self.assertIsNotNone(self.bengaluru.longitude)
+        self.assertEqual(geocode_zip('560099'), geocode_zip('560 099'))
+
+    def test_changing_zip_code_regeocodes(self):
+        """Test a store moved to another zip code gets that code's coordinates"""
+        self.bengaluru.zip_code = '570001'
+        self.bengaluru.save()
+        self.bengaluru.refresh_from_db()
+        self.assertEqual((self.bengaluru.latitude, self.bengaluru.longitude), geocode_zip('570001'))
+
+        self.bengaluru.zip_code, self.bengaluru.latitude, self.bengaluru.longitude = '560001', 12.5, 77.5
+        self.bengaluru.save()
+        self.bengaluru.refresh_from_db()
+        self.assertEqual((self.bengaluru.latitude, self.bengaluru.longitude), (12.5, 77.5))
+
+    def test_grid_index_matches_brute_force(self):
+        """Test the grid index returns exactly the stores a full scan would"""
+        points = [(i, 12.0 + (i % 20) * 0.05, 77.0 + (i // 20) * 0.05) for i in range(400)]
+        index = StoreGridIndex(points)
+        expected = sorted(i for i, lat, lon in points if haversine_km(12.5, 77.5, lat, lon) <= 20)
+        self.assertEqual(sorted(i for i, _ in index.within(12.5, 77.5, 20)), expected)
+
+    def test_radius_filter(self):
+        """Test the shift list only returns shifts at stores within the radius"""
+        response = self.client.get('/shifts/', {'near': '560001', 'radius': '25'})
+        shifts = list(response.context['shifts'])
+        self.assertEqual(shifts, [self.near_shift])
+        self.assertEqual(shifts[0].distance_km, 0.0)
+
+    def test_huge_radius_is_clamped(self):
+        """Test an oversized radius is capped and the grid falls back to a scan instead of walking every cell"""
+        with override_settings(MAX_RADIUS_KM=50):
+            response = self.client.get('/shifts/', {'near': '560001', 'radius': '200000'})
+        self.assertEqual(list(response.context['shifts']), [self.near_shift])
+        index = StoreGridIndex([(1, 89.9, 0.0), (2, 12.97, 77.59)])
+        self.assertEqual([store_id for store_id, _ in index.within(89.9, 0.0, 1e9)], [1, 2])
+
+    async def test_async_radius_filter(self):
+        """Test the ASGI shift list applies the same filters as the sync view"""
+        request = AsyncRequestFactory().get('/shifts/', {'near': '560001', 'radius': '25'})
+        request.user = self.staff
+        response = await shift_list_view_async(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<h5>Near</h5>', html=True)
+        self.assertNotContains(response, '<h5>Far</h5>', html=True)
+
+
+class CalendarFeedTestCase(TestCase):
+    """Test iCalendar feeds of shifts"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff1', password='pass123', role='staff')
+        self.store = Store.objects.create(name='Central Mart', address='1 Main St', city='Mysuru',
+                                          state='KA', zip_code='570001', phone='1234567890')
+        self.shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Holiday cashier', description='Busy tills',
+            role_required='cashier', shift_date=date.today() + timedelta(days=2),
+            start_time=time(9, 0), end_time=time(17, 0)
+        )
+        ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.staff, status='approved')
+        self.url = f'/shifts/calendar/{calendar_token(self.staff)}/my-shifts.ics'
+
+    def test_user_feed_lists_approved_shifts(self):
+        """Test the feed contains an event per approved shift"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn(f'UID:shift-{self.shift.id}@helping-hands', body)
+        self.assertIn('SUMMARY:Holiday cashier (Cashier)', body)
+
+    def test_invalid_token_is_rejected(self):
+        """Test a tampered token does not expose a feed"""
+        response = self.client.get(f'/shifts/calendar/{self.staff.pk}:forged/my-shifts.ics')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unchanged_feed_returns_not_modified(self):
+        """Test polling with the previous ETag gets a 304 until the shift changes"""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.shift.title = 'Holiday cashier (extended)'
+        self.shift.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_store_feed_lists_open_shifts(self):
+        """Test the store feed lists its upcoming open shifts"""
+        response = self.client.get(f'/shifts/calendar/{calendar_token(self.staff)}/store/{self.store.id}.ics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'UID:shift-{self.shift.id}@helping-hands', b''.join(response.streaming_content).decode())
+
+
+@override_settings(SHIFT_FEED_LAG_SECONDS=0)
+class ShiftChangeFeedTestCase(TestCase):
+    """Test the ShiftHistory change feed"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff1', password='pass123', role='staff')
+        self.store = Store.objects.create(name='Central Mart', address='1 Main St', city='Mysuru',
+                                          state='KA', zip_code='570001', phone='1234567890')
+        self.client.login(username='manager1', password='pass123')
+        self.client.post('/shifts/manager/create/', {
+            'store': self.store.id, 'title': 'Inventory', 'description': 'Count stock',
+            'role_required': 'stocker', 'shift_date': date.today() + timedelta(days=2),
+            'start_time': '09:00', 'end_time': '17:00', 'slots_available': 2,
+        })
+        self.shift = Shift.objects.get(title='Inventory')
+
+    def test_write_paths_record_events_with_diffs(self):
+        """Test updates, applications and approvals all land in the feed"""
+        self.client.post(f'/shifts/manager/{self.shift.id}/update/', {
+            'store': self.store.id, 'title': 'Inventory', 'description': 'Count stock',
+            'role_required': 'stocker', 'shift_date': self.shift.shift_date,
+            'start_time': '10:00', 'end_time': '17:00', 'slots_available': 2,
+        })
+        self.client.login(username='staff1', password='pass123')
+        self.client.get(f'/shifts/{self.shift.id}/volunteer/')
+        application = ShiftVolunteer.objects.get(shift=self.shift, volunteer=self.staff)
+        self.client.login(username='manager1', password='pass123')
+        self.client.get(f'/shifts/manager/application/{application.id}/approve/')
+
+        events = list(ShiftHistory.objects.filter(shift=self.shift).order_by('id'))
+        self.assertEqual([e.action for e in events], ['created', 'rescheduled', 'applied', 'approved'])
+        self.assertEqual(events[1].changes, {'start_time': ['09:00:00', '10:00:00']})
+        self.assertEqual(events[3].changes['status'], ['pending', 'approved'])
+        self.assertEqual(events[3].volunteer, self.staff)
+
+    def test_changes_endpoint_pages_by_sequence(self):
+        """Test the endpoint returns only events after the given sequence"""
+        first = self.client.get('/shifts/changes/').json()
+        self.assertEqual([c['action'] for c in first['changes']], ['created'])
+        self.client.get(f'/shifts/manager/{self.shift.id}/cancel/')
+        second = self.client.get('/shifts/changes/', {'since': first['next_since']}).json()
+        self.assertEqual([c['action'] for c in second['changes']], ['cancelled'])
+        self.assertEqual(second['changes'][0]['changes'], {'status': ['open', 'cancelled']})
+
+    def test_iter_changes_walks_all_batches(self):
+        """Test the iterator API yields every event in sequence order"""
+        for i in range(5):
+            ShiftHistory.objects.create(shift=self.shift, action='updated', performed_by=self.manager,
+                                        description=f'edit {i}')
+        ids = [change.id for change in iter_changes(batch_size=2)]
+        self.assertEqual(ids, sorted(ShiftHistory.objects.values_list('id', flat=True)))
+
+    @override_settings(SHIFT_FEED_LAG_SECONDS=5)
+    def test_recent_events_are_held_back(self):
+        """Test the feed trails the newest writes by the lag window so late commits are not skipped"""
+        self.assertEqual(changes_since(), [])
+        ShiftHistory.objects.filter(shift=self.shift).update(timestamp=timezone.now() - timedelta(seconds=10))
+        recent = ShiftHistory.objects.create(shift=self.shift, action='updated', performed_by=self.manager,
+                                             description='edit')
+        page = self.client.get('/shifts/changes/').json()
+        self.assertEqual([c['action'] for c in page['changes']], ['created'])
+        self.assertEqual(changes_since(page['next_since']), [])
+        ShiftHistory.objects.filter(id=recent.id).update(timestamp=timezone.now() - timedelta(seconds=10))
+        self.assertEqual(changes_since(page['next_since']), [recent])
+
+
+class ShiftImportTestCase(TestCase):
+    """Test bulk shift import from CSV"""
+
+    HEADER = 'store,title,description,role_required,shift_date,start_time,end_time,slots_available\n'
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.staff = User.objects.create_user(username='staff1', password='pass123', role='staff')
+        self.store = Store.objects.create(name='Central Mart', address='1 Main St', city='Mysuru',
+                                          state='KA', zip_code='570001', phone='1234567890')
+        self.day = (date.today() + timedelta(days=30)).isoformat()
+
+    def _upload(self, body, name='roster.csv'):
+        upload = SimpleUploadedFile(name, (self.HEADER + body).encode(), content_type='text/csv')
+        return self.client.post('/shifts/manager/import/', {'file': upload})
+
+    def test_import_valid_and_invalid_rows(self):
+        """Test valid rows are created with history and search entries, bad rows are reported"""
+        self.client.login(username='manager1', password='pass123')
+        response = self._upload(
+            f'Central Mart,Diwali rush,Extra tills,Cashier,{self.day},09:00,13:00,3\n'
+            f'{self.store.id},Stock count,Backroom,stocker,{self.day},14:00,18:00,2\n'
+            f'Central Mart,Backwards,Bad times,cashier,{self.day},18:00,09:00,1\n'
+            f'Nowhere,Lost,No store,cashier,{self.day},09:00,10:00,1\n'
+        )
+        self.assertEqual(response.status_code, 200)
+        result = response.context['result']
+        self.assertEqual((result.created, result.failed), (2, 2))
+        self.assertEqual([number for number, _ in result.errors], [4, 5])
+        self.assertIn('__all__', result.errors[0][1])
+        self.assertIn('store', result.errors[1][1])
+
+        shift = Shift.objects.get(title='Diwali rush')
+        self.assertEqual((shift.manager, shift.role_required, shift.slots_available), (self.manager, 'cashier', 3))
+        self.assertEqual(ShiftHistory.objects.filter(action='created').count(), 2)
+        self.assertEqual(list(search_shifts(Shift.objects.all(), 'diwali')), [shift])
+
+    def test_import_alerts_subscribers(self):
+        """Test imported shifts alert subscribers once the batch commits, as created shifts do"""
+        set_availability(self.staff, date.fromisoformat(self.day), [parse_ranges('06:00-24:00')] * 7)
+        ShiftAlertPreference.objects.create(user=self.staff, home_store=self.store)
+        self.client.login(username='manager1', password='pass123')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self._upload(f'Central Mart,Diwali rush,Extra tills,cashier,{self.day},09:00,13:00,3\n')
+            self.assertFalse(Notification.objects.exists())
+        self.assertTrue(callbacks)
+        self.assertEqual(list(Notification.objects.filter(notification_type='shift_created').values_list(
+            'recipient__username', flat=True)), ['staff1'])
+
+    def test_import_rejects_missing_columns_and_staff(self):
+        """Test a file without the required header is refused, as are non-managers"""
+        self.client.login(username='manager1', password='pass123')
+        upload = SimpleUploadedFile('roster.csv', b'title,shift_date\nX,2030-01-01\n')
+        response = self.client.post('/shifts/manager/import/', {'file': upload})
+        self.assertContains(response, 'Missing column(s)')
+        self.assertFalse(Shift.objects.exists())
+
+        self.client.login(username='staff1', password='pass123')
+        response = self._upload(f'Central Mart,X,Y,cashier,{self.day},09:00,10:00,1\n')
+        self.assertRedirects(response, '/dashboard/')
+        self.assertFalse(Shift.objects.exists())
+
+
+class VolunteerStatsTestCase(TestCase):
+    """Test the incrementally maintained volunteer stats and leaderboard"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+        self.shifts = [
+            Shift.objects.create(
+                store=self.store, manager=self.manager, title=f'Shift {i}', description='Help out',
+                role_required='cashier', shift_date=date.today() + timedelta(days=3 + i),
+                start_time=time(9, 0), end_time=time(13, 30), slots_available=3
+            )
+            for i in range(3)
+        ]
+        self.staff = [User.objects.create_user(username=f'staff{i}', password='pass123', role='staff')
+                      for i in range(3)]
+
+    def _apply(self, user, shift):
+        self.client.login(username=user.username, password='pass123')
+        self.client.post(f'/shifts/{shift.id}/volunteer/')
+        return ShiftVolunteer.objects.get(shift=shift, volunteer=user)
+
+    def _stored(self):
+        fields = ['approved_count', 'rejected_count', 'withdrawn_count', 'minutes_worked', 'role_mask', 'last_active']
+        return {row.pop('user_id'): row for row in VolunteerStats.objects.values('user_id', *fields)}
+
+    def test_status_changes_update_stats_incrementally(self):
+        """Test apply, approve, reject, withdraw, bulk review and reschedules keep stats equal to a rebuild"""
+        first = self._apply(self.staff[0], self.shifts[0])
+        second = self._apply(self.staff[0], self.shifts[1])
+        withdrawn = self._apply(self.staff[0], self.shifts[2])
+        self.client.post(f'/shifts/application/{withdrawn.id}/withdraw/')
+        bulk = [self._apply(user, self.shifts[0]) for user in self.staff[1:]]
+
+        self.client.login(username='manager1', password='pass123')
+        self.client.get(f'/shifts/manager/application/{first.id}/approve/')
+        self.client.get(f'/shifts/manager/application/{second.id}/reject/')
+        self.client.post(f'/shifts/manager/application/{second.id}/review/', {'status': 'approved', 'notes': ''})
+        self.client.post('/shifts/manager/applications/bulk-review/', {
+            'decision': 'approve', 'application_ids': [app.id for app in bulk],
+        })
+        shift = self.shifts[0]
+        self.client.post(f'/shifts/manager/{shift.id}/update/', {
+            'store': self.store.id, 'title': shift.title, 'description': shift.description,
+            'role_required': 'cashier', 'shift_date': shift.shift_date, 'start_time': '09:00',
+            'end_time': '17:00', 'slots_available': 3,
+        })
+
+        stats = VolunteerStats.objects.get(user=self.staff[0])
+        self.assertEqual((stats.approved_count, stats.rejected_count, stats.withdrawn_count), (2, 0, 1))
+        self.assertEqual(stats.minutes_worked, 8 * 60 + 270)
+        self.assertEqual(stats.hours_worked, 12.5)
+        self.assertEqual(VolunteerStats.objects.get(user=self.staff[1]).minutes_worked, 8 * 60)
+
+        expected = compute_volunteer_stats()
+        stored = self._stored()
+        for values in list(expected.values()) + list(stored.values()):
+            values.pop('last_active')
+        self.assertEqual(stored, expected)
+
+    def test_rebuild_command_repairs_drift(self):
+        """Test the reconciliation command reports and fixes rows that no longer match history"""
+        application = self._apply(self.staff[0], self.shifts[0])
+        ShiftVolunteer.objects.filter(id=application.id).update(status='approved')
+        VolunteerStats.objects.create(user=self.staff[1], approved_count=7)
+
+        call_command('rebuild_volunteer_stats', '--check', stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(VolunteerStats.objects.get(user=self.staff[0]).approved_count, 0)
+
+        out = StringIO()
+        call_command('rebuild_volunteer_stats', stdout=out, stderr=StringIO())
+        self.assertIn('2 had drifted', out.getvalue())
+        self.assertEqual(self._stored(), compute_volunteer_stats())
+        self.assertFalse(VolunteerStats.objects.filter(user=self.staff[1]).exists())
+
+    def test_check_ignores_last_active_timestamps(self):
+        """Test stats kept by the incremental path pass the drift check"""
+        self._apply(self.staff[0], self.shifts[0])
+        out = StringIO()
+        call_command('rebuild_volunteer_stats', '--check', stdout=out, stderr=StringIO())
+        self.assertIn('0 of 1 volunteer stats rows differ', out.getvalue())
+
+    def test_leaderboard_reads_stats(self):
+        """Test the reports page and profile read the maintained counters"""
+        VolunteerStats.objects.create(user=self.staff[0], approved_count=2, minutes_worked=600)
+        VolunteerStats.objects.create(user=self.staff[1], approved_count=5, minutes_worked=120)
+        VolunteerStats.objects.create(user=self.manager, approved_count=9)
+
+        self.assertEqual([row.user for row in top_volunteers()], [self.staff[1], self.staff[0]])
+        self.assertEqual([row.user for row in top_volunteers(order='hours')], [self.staff[0], self.staff[1]])
+
+        admin = User.objects.create_user(username='admin1', password='pass123', role='admin')
+        self.client.force_login(admin)
+        with self.assertNumQueries(1):
+            list(top_volunteers())
+        response = self.client.get('/dashboard/reports/')
+        self.assertEqual([row.user for row in response.context['top_volunteers']], [self.staff[1], self.staff[0]])
+
+        self.client.force_login(self.staff[0])
+        response = self.client.get('/auth/profile/')
+        self.assertContains(response, 'Hours:</strong> 10.0')
+
+
+class ShiftLifecycleTestCase(TestCase):
+    """Test shift status transitions and the periodic sweep"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.staff = [User.objects.create_user(username=f'staff{i}', password='pass123', role='staff')
+                      for i in range(2)]
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+
+    def _shift(self, days, slots=2, status='open', approved=0):
+        shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title=f'Shift {days} {status}', description='Help out',
+            role_required='cashier', shift_date=date.today() + timedelta(days=days),
+            start_time=time(9, 0), end_time=time(17, 0), slots_available=slots, status=status
+        )
+        for user in self.staff[:approved]:
+            ShiftVolunteer.objects.create(shift=shift, volunteer=user, status='approved')
+        return shift
+
+    def test_transition_rules(self):
+        """Test completed and cancelled are final"""
+        check_transition('open', 'filled')
+        check_transition('filled', 'open')
+        with self.assertRaises(InvalidTransition):
+            check_transition('completed', 'cancelled')
+        with self.assertRaises(InvalidTransition):
+            check_transition('cancelled', 'open')
+
+    def test_sweep_moves_expired_and_full_shifts(self):
+        """Test the sweep completes, cancels, fills and reopens shifts in bulk with history"""
+        worked = self._shift(-2, approved=1)
+        worked_full = self._shift(-1, slots=1, status='filled', approved=1)
+        unstaffed = self._shift(-1)
+        full = self._shift(3, slots=2, approved=2)
+        freed = self._shift(3, slots=2, status='filled', approved=1)
+        untouched = self._shift(3, approved=1)
+        already_done = self._shift(-5, status='completed')
+
+        out = StringIO()
+        call_command('advance_shift_status', '--batch-size', '1', stdout=out)
+        self.assertIn('completed 2, cancelled 1, filled 1, reopened 1', out.getvalue())
+
+        statuses = dict(Shift.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[worked.id], 'completed')
+        self.assertEqual(statuses[worked_full.id], 'completed')
+        self.assertEqual(statuses[unstaffed.id], 'cancelled')
+        self.assertEqual(statuses[full.id], 'filled')
+        self.assertEqual(statuses[freed.id], 'open')
+        self.assertEqual(statuses[untouched.id], 'open')
+        self.assertEqual(statuses[already_done.id], 'completed')
+
+        history = ShiftHistory.objects.get(shift=worked_full, action='completed')
+        self.assertEqual(history.changes, {'status': ['filled', 'completed']})
+        self.assertIsNone(history.performed_by)
+        self.assertEqual(ShiftHistory.objects.filter(shift=freed, action='reopened').count(), 1)
+        self.assertEqual(sweep(), {'completed': 0, 'cancelled': 0, 'filled': 0, 'reopened': 0})
+
+    def test_approving_last_slot_fills_shift(self):
+        """Test approving up to capacity marks the shift filled, and completed shifts can't be cancelled"""
+        shift = self._shift(3, slots=1)
+        application = ShiftVolunteer.objects.create(shift=shift, volunteer=self.staff[0])
+        self.client.login(username='manager1', password='pass123')
+        self.client.get(f'/shifts/manager/application/{application.id}/approve/')
+        shift.refresh_from_db()
+        self.assertEqual(shift.status, 'filled')
+        self.assertEqual(ShiftHistory.objects.get(shift=shift, action='filled').performed_by, self.manager)
+
+        self.client.get(f'/shifts/manager/application/{application.id}/reject/')
+        shift.refresh_from_db()
+        self.assertEqual(shift.status, 'open')
+
+        done = self._shift(-3, status='completed')
+        self.client.get(f'/shifts/manager/{done.id}/cancel/')
+        done.refresh_from_db()
+        self.assertEqual(done.status, 'completed')
+
+
+class WaitlistTestCase(TestCase):
+    """Test waitlisting for full shifts and promotion when slots open"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.staff = [User.objects.create_user(username=f'staff{i}', password='pass123', role='staff')
+                      for i in range(4)]
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+        self.shift = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Weekend Rush', description='Help out',
+            role_required='cashier', shift_date=date.today() + timedelta(days=3),
+            start_time=time(9, 0), end_time=time(17, 0), slots_available=1
+        )
+        self.approved = ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.staff[0], status='approved')
+
+    def _join(self, user):
+        self.client.force_login(user)
+        self.client.post(f'/shifts/{self.shift.id}/volunteer/')
+        return ShiftVolunteer.objects.get(shift=self.shift, volunteer=user)
+
+    def test_managers_cannot_waitlist_by_review(self):
+        """Test the review form does not offer waitlisting, which would leave no queue position"""
+        application = ShiftVolunteer.objects.create(shift=self.shift, volunteer=self.staff[1])
+        self.client.force_login(self.manager)
+        response = self.client.post(f'/shifts/manager/application/{application.id}/review/',
+                                    {'status': 'waitlisted', 'notes': ''})
+        self.assertTrue(response.context['form'].errors['status'])
+        application.refresh_from_db()
+        self.assertEqual(application.status, 'pending')
+
+    def test_full_shift_queues_in_order(self):
+        """Test applicants to a full shift are waitlisted with increasing positions"""
+        self.client.force_login(self.staff[1])
+        response = self.client.get(f'/shifts/{self.shift.id}/')
+        self.assertFalse(response.context['can_volunteer'])
+        self.assertTrue(response.context['can_join_waitlist'])
+
+        entries = [self._join(user) for user in self.staff[1:]]
+        self.assertEqual([(e.status, e.waitlist_position) for e in entries],
+                         [('waitlisted', 1), ('waitlisted', 2), ('waitlisted', 3)])
+
+    def test_withdrawal_promotes_first_eligible(self):
+        """Test a withdrawal promotes the head of the queue, skipping volunteers booked elsewhere"""
+        first, second, third = [self._join(user) for user in self.staff[1:]]
+        clash = Shift.objects.create(
+            store=self.store, manager=self.manager, title='Clash', description='Help out',
+            role_required='cashier', shift_date=self.shift.shift_date,
+            start_time=time(12, 0), end_time=time(14, 0), slots_available=1
+        )
+        ShiftVolunteer.objects.create(shift=clash, volunteer=self.staff[1], status='approved')
+
+        self.client.force_login(self.staff[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/shifts/application/{self.approved.id}/withdraw/')
+
+        for entry in (first, second, third):
+            entry.refresh_from_db()
+        self.assertEqual((first.status, first.waitlist_position), ('waitlisted', 1))
+        self.assertEqual((second.status, second.waitlist_position), ('approved', None))
+        self.assertEqual(third.status, 'waitlisted')
+        self.assertTrue(Notification.objects.filter(recipient=self.staff[2], title='Off the Waitlist').exists())
+        self.assertEqual(ShiftHistory.objects.get(action='approved', volunteer=self.staff[2]).changes['status'],
+                         ['waitlisted', 'approved'])
+        self.assertEqual(VolunteerStats.objects.get(user=self.staff[2]).approved_count, 1)
+        self.shift.refresh_from_db()
+        self.assertEqual(self.shift.status, 'filled')
+
+        # No free slot left: repeated promotion attempts change nothing
+        self.assertEqual(promote(self.shift.id), [])
+        self.assertEqual(self.shift.volunteers.filter(status='approved').count(), 1)
+
+    def test_added_slots_and_rejection_promote(self):
+        """Test raising slots or rejecting an approved volunteer pulls from the waitlist"""
+        first, second = [self._join(user) for user in self.staff[1:3]]
+        self.client.force_login(self.manager)
+        self.client.post(f'/shifts/manager/{self.shift.id}/update/', {
+            'store': self.store.id, 'title': self.shift.title, 'description': self.shift.description,
+            'role_required': 'cashier', 'shift_date': self.shift.shift_date, 'start_time': '09:00',
+            'end_time': '17:00', 'slots_available': 2,
+        })
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'approved')
+
+        self.client.get(f'/shifts/manager/application/{self.approved.id}/reject/')
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'approved')
+
+
+class ShiftSwapTestCase(TestCase):
+    """Test the swap marketplace, its matcher and the handover"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+        self.other_store = Store.objects.create(name='Store 2', address='2 Main St', city='Bengaluru',
+                                                state='KA', zip_code='560001', phone='1234567890')
+        self.day = date.today() + timedelta(days=3)
+        self.shift = self._shift(self.store, time(9, 0), time(13, 0))
+        names = ['requester', 'free', 'clash', 'stocker', 'later', 'regular']
+        self.users = {name: User.objects.create_user(username=name, password='pass123', role='staff',
+                                                     first_name=name.title()) for name in names}
+        self.application = self._approve('requester', self.shift)
+
+        past = self._shift(self.other_store, time(9, 0), time(17, 0), day=date.today() - timedelta(days=7))
+        for name in ('free', 'clash', 'later'):
+            self._approve(name, past)
+        self._approve('stocker', self._shift(self.other_store, time(9, 0), time(17, 0), role='stocker',
+                                             day=date.today() - timedelta(days=7)))
+        self._approve('regular', self._shift(self.store, time(9, 0), time(17, 0),
+                                             day=date.today() - timedelta(days=14)))
+        self._approve('clash', self._shift(self.other_store, time(12, 0), time(14, 0)))
+        self._approve('later', self._shift(self.other_store, time(13, 0), time(18, 0)))
+
+    def _shift(self, store, start, end, role='cashier', day=None):
+        return Shift.objects.create(
+            store=store, manager=self.manager, title=f'{role} {start}', description='Help out',
+            role_required=role, shift_date=day or self.day, start_time=start, end_time=end, slots_available=1
+        )
+
+    def _approve(self, name, shift):
+        application = ShiftVolunteer.objects.create(shift=shift, volunteer=self.users[name], status='approved')
+        ShiftHistory.objects.create(shift=shift, action='approved', volunteer=self.users[name], description='')
+        record_status_changes([(application, None)])
+        return application
+
+    def test_busy_days_and_matcher(self):
+        """Test busy masks follow approvals and the matcher filters by role and overlap"""
+        busy = BusyDay.objects.get(user=self.users['later'], day=self.day)
+        self.assertEqual(unpack(busy.mask), window_mask(time(13, 0), time(18, 0)))
+        self.assertFalse(BusyDay.objects.filter(day__lt=date.today()).exists())
+
+        takers = find_takers(self.shift, exclude=[self.users['requester'].id])
+        self.assertEqual([user.username for user in takers], ['regular', 'later', 'free'])
+
+    def test_offer_and_accept_swap(self):
+        """Test an open offer reaches compatible colleagues and accepting it hands the place over"""
+        self.client.force_login(self.users['requester'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/shifts/application/{self.application.id}/swap/', {'colleague': '', 'note': 'Exam'})
+        swap = SwapRequest.objects.get()
+        self.assertEqual(set(Notification.objects.filter(notification_type='shift_swap').values_list(
+            'recipient__username', flat=True)), {'regular', 'free', 'later'})
+
+        self.client.force_login(self.users['clash'])
+        self.assertEqual(self.client.get('/shifts/swaps/').context['available'], [])
+        self.client.force_login(self.users['free'])
+        self.assertEqual(self.client.get('/shifts/swaps/').context['available'], [swap])
+
+        response = self.client.post(f'/shifts/swaps/{swap.id}/accept/')
+        self.assertRedirects(response, '/shifts/my-shifts/')
+        self.application.refresh_from_db()
+        swap.refresh_from_db()
+        self.assertEqual(self.application.status, 'withdrawn')
+        self.assertEqual((swap.status, swap.taken_by), ('accepted', self.users['free']))
+        self.assertEqual(ShiftVolunteer.objects.get(shift=self.shift, volunteer=self.users['free']).status, 'approved')
+        self.assertEqual(self.shift.volunteers.filter(status='approved').count(), 1)
+        self.assertFalse(BusyDay.objects.filter(user=self.users['requester'], day=self.day).exists())
+        self.assertTrue(BusyDay.objects.filter(user=self.users['free'], day=self.day).exists())
+        self.assertEqual(VolunteerStats.objects.get(user=self.users['requester']).approved_count, 0)
+
+        self.client.force_login(self.users['later'])
+        self.client.post(f'/shifts/swaps/{swap.id}/accept/')
+        self.assertFalse(ShiftVolunteer.objects.filter(shift=self.shift, volunteer=self.users['later']).exists())
+
+    def test_offer_to_incompatible_colleague_is_refused(self):
+        """Test a targeted offer must go to someone who could take the shift"""
+        self.client.force_login(self.users['requester'])
+        self.client.post(f'/shifts/application/{self.application.id}/swap/', {'colleague': 'stocker'})
+        self.client.post(f'/shifts/application/{self.application.id}/swap/', {'colleague': 'clash'})
+        self.assertFalse(SwapRequest.objects.exists())
+        self.client.post(f'/shifts/application/{self.application.id}/swap/', {'colleague': 'later'})
+        self.assertEqual(SwapRequest.objects.get().offered_to, self.users['later'])
+
+
+class AvailabilityTestCase(TestCase):
+    """Test weekly availability storage, the eligibility query and targeted shift notifications"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.store = Store.objects.create(name='Store 1', address='1 Main St', city='Bengaluru',
+                                          state='KA', zip_code='560001', phone='1234567890')
+        self.day = date.today() + timedelta(days=10)
+        self.users = {name: User.objects.create_user(username=name, password='pass123', role='staff')
+                      for name in ('mornings', 'evenings', 'booked', 'unrecorded', 'inactive')}
+        self.users['inactive'].is_active = False
+        self.users['inactive'].save()
+        for name, ranges in (('mornings', '08:00-14:00'), ('evenings', '16:00-22:00'),
+                             ('booked', '08:00-22:00'), ('inactive', '08:00-22:00')):
+            masks = [0] * 7
+            masks[self.day.weekday()] = parse_ranges(ranges)
+            set_availability(self.users[name], self.day, masks)
+        booked = Shift.objects.create(store=self.store, manager=self.manager, title='Early', description='d',
+                                      shift_date=self.day, start_time=time(7, 0), end_time=time(10, 0))
+        application = ShiftVolunteer.objects.create(shift=booked, volunteer=self.users['booked'], status='approved')
+        record_status_changes([(application, None)])
+
+    def test_ranges_round_trip(self):
+        """Test time ranges parse to quarter-hour masks and format back"""
+        mask = parse_ranges('09:00-13:00, 17:10-24:00')
+        self.assertEqual(mask, window_mask(time(9, 0), time(13, 0)) | window_mask(time(17, 0), time(23, 59, 59)))
+        self.assertEqual(format_ranges(mask), '09:00-13:00, 17:00-24:00')
+        self.assertEqual(format_ranges(0), '')
+        for bad in ('9-', '13:00-09:00', 'noon-3'):
+            with self.assertRaises(ValueError):
+                parse_ranges(bad)
+
+    def test_available_staff(self):
+        """Test only active staff whose availability covers the shift and who are free match"""
+        shift = Shift(store=self.store, manager=self.manager, shift_date=self.day,
+                      start_time=time(9, 0), end_time=time(12, 0))
+        self.assertEqual(available_staff(shift), [self.users['mornings'].id])
+        shift.start_time, shift.end_time = time(13, 0), time(17, 0)
+        self.assertEqual(available_staff(shift), [self.users['booked'].id])
+        shift.start_time = time(7, 45)
+        self.assertEqual(available_staff(shift), [])
+        shift.shift_date = self.day + timedelta(days=7)
+        self.assertEqual(available_staff(shift), [])
+
+    def test_available_staff_among(self):
+        """Test the search can be limited to a set or subquery of candidate users"""
+        shift = Shift(store=self.store, manager=self.manager, shift_date=self.day,
+                      start_time=time(9, 0), end_time=time(12, 0))
+        self.assertEqual(available_staff(shift, among=[self.users['evenings'].id]), [])
+        among = User.objects.filter(username__in=['mornings', 'evenings']).values('id')
+        self.assertEqual(available_staff(shift, among=among), [self.users['mornings'].id])
+
+    def test_availability_view(self):
+        """Test staff save a week of availability for several weeks and see it prefilled"""
+        user = self.users['unrecorded']
+        self.client.force_login(user)
+        data = {day: '' for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')}
+        data.update(week=self.day.isoformat(), weeks=3, tuesday='09:00-12:30', saturday='10:00-11:00, 14:00-18:00')
+        response = self.client.post('/shifts/availability/', data)
+        self.assertEqual(response.status_code, 302)
+        rows = Availability.objects.filter(user=user).order_by('week_start')
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0].week_start.weekday(), 0)
+        self.assertEqual(unpack_week(rows[2].mask)[1], parse_ranges('09:00-12:30'))
+
+        response = self.client.get(f'/shifts/availability/?week={rows[1].week_start}')
+        self.assertEqual(response.context['form'].initial['saturday'], '10:00-11:00, 14:00-18:00')
+
+        data['monday'] = '18:00-09:00'
+        response = self.client.post('/shifts/availability/', data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['monday'])
+
+
+class ShiftAlertTestCase(TestCase):
+    """Test new-shift audience resolution and the notifications sent when a shift is posted"""
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.store = self._store('Store 1', 'KA')
+        self.nearby = self._store('Store 2', 'KA')
+        self.far = self._store('Store 3', 'MH')
+        self.day = date.today() + timedelta(days=10)
+        self.users = {}
+        self._subscribe('home', self.store)
+        self._subscribe('region', self.nearby, whole_region=True)
+        self._subscribe('nearby_only', self.nearby)
+        self._subscribe('far', self.far, whole_region=True)
+        self._subscribe('cashier', self.store, roles=['cashier'])
+        self._subscribe('stocker', self.store, roles=['stocker'])
+        self._subscribe('muted', self.store, enabled=False)
+        self._subscribe('booked', self.store)
+        self._subscribe('away', self.store, available=False)
+        self._subscribe('unrecorded', self.store, available=None)
+        User.objects.create_user(username='unsubscribed', password='pass123', role='staff')
+
+        booked = Shift.objects.create(store=self.nearby, manager=self.manager, title='Early', description='d',
+                                      role_required='cashier', shift_date=self.day,
+                                      start_time=time(16, 0), end_time=time(18, 0))
+        ShiftVolunteer.objects.create(shift=booked, volunteer=self.users['booked'], status='approved')
+
+    def _store(self, name, state):
+        return Store.objects.create(name=name, address='1 Main St', city='City', state=state,
+                                    zip_code='560001', phone='1234567890')
+
+    def _subscribe(self, name, store, whole_region=False, roles=(), enabled=True, available=True):
+        self.users[name] = User.objects.create_user(username=name, password='pass123', role='staff')
+        if available is not None:
+            set_availability(self.users[name], self.day, [parse_ranges('06:00-24:00') if available else 0] * 7)
+        ShiftAlertPreference.objects.create(user=self.users[name], home_store=store, whole_region=whole_region,
+                                            role_mask=sum(ROLE_BITS[role] for role in roles), enabled=enabled)
+
+    def test_shift_audience(self):
+        """Test the audience follows store/region, role, opt-in, bookings and availability; no record is unavailable"""
+        shift = Shift(store=self.store, manager=self.manager, role_required='cashier', shift_date=self.day,
+                      start_time=time(17, 0), end_time=time(21, 0))
+        audience = {User.objects.get(id=user_id).username for user_id in shift_audience(shift)}
+        self.assertEqual(audience, {'home', 'region', 'cashier'})
+
+    def test_create_shift_notifies_audience(self):
+        """Test posting a shift alerts its audience once the transaction commits"""
+        self.client.force_login(self.manager)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post('/shifts/manager/create/', {
+                'store': self.store.id, 'title': 'Morning stock', 'description': 'Shelves',
+                'role_required': 'stocker', 'shift_date': self.day.isoformat(),
+                'start_time': '08:00', 'end_time': '12:00', 'slots_available': 2,
+            })
+            self.assertFalse(Notification.objects.exists())
+        self.assertTrue(callbacks)
+        self.assertEqual(set(Notification.objects.filter(notification_type='shift_created').values_list(
+            'recipient__username', flat=True)), {'home', 'region', 'stocker', 'booked'})
+
+    def test_alert_preferences_view(self):
+        """Test staff save their alert settings with a role selection"""
+        user = User.objects.create_user(username='newbie', password='pass123', role='staff')
+        self.client.force_login(user)
+        response = self.client.post('/shifts/alerts/', {
+            'enabled': 'on', 'home_store': self.store.id, 'roles': ['cashier', 'supervisor'],
+        })
+        self.assertEqual(response.status_code, 302)
+        preference = ShiftAlertPreference.objects.get(user=user)
+        self.assertEqual(preference.role_mask, ROLE_BITS['cashier'] | ROLE_BITS['supervisor'])
+        self.assertEqual(set(self.client.get('/shifts/alerts/').context['form']['roles'].initial),
+                         {'cashier', 'supervisor'})
+
+
+class RegionIsolationTestCase(TestCase):
+    """Test region partitioning: the denormalized column, request scoping and the routing hook"""
+
+    def setUp(self):
+        self.north = Region.objects.create(name='North', code='north')
+        self.south = Region.objects.create(name='South', code='south')
+        self.manager = User.objects.create_user(username='manager1', password='pass123', role='manager')
+        self.stores, self.shifts = {}, {}
+        for region in (self.north, self.south):
+            store = Store.objects.create(name=f'{region.name} Store', address='1 Main St', city='City', state='KA',
+                                         zip_code='560001', phone='1234567890', region=region)
+            shift = Shift.objects.create(store=store, manager=self.manager, title=f'{region.name} shift',
+                                         description='d', role_required='cashier',
+                                         shift_date=date.today() + timedelta(days=2),
+                                         start_time=time(9, 0), end_time=time(13, 0))
+            self.stores[region.code], self.shifts[region.code] = store, shift
+        self.staff = User.objects.create_user(username='staff1', password='pass123', role='staff', region=self.north)
+        southerner = User.objects.create_user(username='staff2', password='pass123', role='staff', region=self.south)
+        ShiftVolunteer.objects.create(shift=self.shifts['north'], volunteer=self.staff)
+        ShiftVolunteer.objects.create(shift=self.shifts['south'], volunteer=southerner)
+
+    def test_shift_region_follows_store(self):
+        """Test shifts copy their store's region, also when the store moves"""
+        self.assertEqual(self.shifts['north'].region, self.north)
+        store = self.stores['north']
+        store.region = self.south
+        store.save()
+        self.assertEqual(Shift.objects.get(id=self.shifts['north'].id).region, self.south)
+
+    def test_in_region_managers(self):
+        """Test the tenant managers filter only inside a region scope"""
+        self.assertEqual(Shift.in_region.count(), 2)
+        with region_scope(self.north.id):
+            self.assertEqual(list(Shift.in_region.all()), [self.shifts['north']])
+            self.assertEqual(ShiftVolunteer.in_region.get().volunteer, self.staff)
+            self.assertEqual(Shift.objects.count(), 2)
+
+    def test_requests_are_scoped_to_the_users_region(self):
+        """Test staff only see and reach their own region's shifts"""
+        self.client.force_login(self.staff)
+        response = self.client.get('/shifts/')
+        self.assertEqual(list(response.context['shifts']), [self.shifts['north']])
+        self.assertEqual(self.client.get(f'/shifts/{self.shifts["south"].id}/').status_code, 404)
+        self.assertEqual(self.client.get(f'/shifts/{self.shifts["north"].id}/').status_code, 200)
+
+    def test_leaderboard_filters_region_in_sql(self):
+        """Test a region's leaderboard reads only its own staff, in one query"""
+        southerner = User.objects.get(username='staff2')
+        VolunteerStats.objects.create(user=self.staff, approved_count=1)
+        VolunteerStats.objects.bulk_create([VolunteerStats(user=southerner, approved_count=5)] + [
+            VolunteerStats(user=User.objects.create_user(username=f'south{i}', password='pass123', role='staff',
+                                                         region=self.south), approved_count=10)
+            for i in range(3)
+        ])
+        with region_scope(self.north.id), self.assertNumQueries(1):
+            self.assertEqual([row.user for row in top_volunteers(limit=1)], [self.staff])
+        self.assertEqual(len(top_volunteers(limit=10)), 5)
+
+    def test_admin_dashboard_counts_per_region(self):
+        """Test a region admin counts their region while a company-wide admin counts everything"""
+        regional = User.objects.create_user(username='admin1', password='pass123', role='admin', region=self.north)
+        company = User.objects.create_user(username='admin2', password='pass123', role='admin')
+        self.client.force_login(regional)
+        self.assertEqual(self.client.get('/dashboard/').context['pending_applications'], 1)
+        self.client.force_login(company)
+        self.assertEqual(self.client.get('/dashboard/').context['pending_applications'], 2)
+        self.client.force_login(regional)
+        self.assertEqual(self.client.get('/dashboard/').context['total_staff'], 1)
+
+    @override_settings(SHIFT_FEED_LAG_SECONDS=0)
+    def test_change_feed_is_scoped_to_the_users_region(self):
+        """Test staff only receive change events for their region's shifts"""
+        for shift in self.shifts.values():
+            ShiftHistory.objects.create(shift=shift, action='updated', performed_by=self.manager, description='edit')
+        self.client.force_login(self.staff)
+        changes = self.client.get('/shifts/changes/').json()['changes']
+        self.assertEqual({change['shift_id'] for change in changes}, {self.shifts['north'].id})
+
+    def test_swap_market_is_scoped_to_the_users_region(self):
+        """Test staff only see and take swap offers from their own region"""
+        VolunteerStats.objects.create(user=self.staff, role_mask=ROLE_BITS['cashier'])
+        colleagues = {'north': User.objects.create_user(username='staff3', password='pass123', role='staff',
+                                                        region=self.north),
+                      'south': User.objects.get(username='staff2')}
+        offers = {}
+        for code, colleague in colleagues.items():
+            shift = Shift.objects.create(store=self.stores[code], manager=self.manager, title=f'{code} late',
+                                         description='d', role_required='cashier',
+                                         shift_date=date.today() + timedelta(days=3),
+                                         start_time=time(14, 0), end_time=time(18, 0))
+            application = ShiftVolunteer.objects.create(shift=shift, volunteer=colleague, status='approved')
+            offers[code] = SwapRequest.objects.create(application=application, requested_by=colleague)
+
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/shifts/swaps/').context['available'], [offers['north']])
+        self.assertEqual(self.client.post(f'/shifts/swaps/{offers["south"].id}/accept/').status_code, 404)
+
+    @override_settings(DATABASE_ROUTERS=[], REGION_DATABASES={1: 'north_db'})
+    def test_region_router(self):
+        """Test the routing hook sends partitioned models of a mapped region to its database"""
+        router = RegionRouter()
+        with region_scope(1):
+            self.assertEqual(router.db_for_read(Shift), 'north_db')
+            self.assertEqual(router.db_for_write(ShiftVolunteer), 'north_db')
+            self.assertIsNone(router.db_for_read(User))
+        with region_scope(2):
+            self.assertIsNone(router.db_for_read(Shift))
+        self.assertIsNone(router.db_for_read(Shift))
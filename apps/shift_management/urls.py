@@ -1,19 +1,33 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+shift_list_view = views.shift_list_view_async if settings.ASYNC_VIEWS else views.shift_list_view
+
 urlpatterns = [
-    path('', views.shift_list_view, name='shift_list'),
+    path('', shift_list_view, name='shift_list'),
     path('my-shifts/', views.my_shifts_view, name='my_shifts'),
     path('<int:shift_id>/', views.shift_detail_view, name='shift_detail'),
     path('<int:shift_id>/volunteer/', views.volunteer_for_shift, name='volunteer_for_shift'),
     path('application/<int:application_id>/withdraw/', views.withdraw_volunteer, name='withdraw_volunteer'),
+    path('application/<int:application_id>/swap/', views.offer_swap, name='offer_swap'),
+    path('availability/', views.availability_view, name='availability'),
+    path('alerts/', views.shift_alerts_view, name='shift_alerts'),
+    path('swaps/', views.swap_market, name='swap_market'),
+    path('swaps/<int:swap_id>/accept/', views.accept_swap, name='accept_swap'),
+    path('swaps/<int:swap_id>/cancel/', views.cancel_swap, name='cancel_swap'),
+    path('changes/', views.shift_changes_feed, name='shift_changes_feed'),
+    path('calendar/<str:token>/my-shifts.ics', views.user_calendar_feed, name='user_calendar_feed'),
+    path('calendar/<str:token>/store/<int:store_id>.ics', views.store_calendar_feed, name='store_calendar_feed'),
     
     # Manager URLs
     path('manager/', views.manager_dashboard, name='manager_dashboard'),
     path('manager/create/', views.create_shift, name='create_shift'),
+    path('manager/import/', views.import_shifts_view, name='import_shifts'),
     path('manager/<int:shift_id>/update/', views.update_shift, name='update_shift'),
     path('manager/<int:shift_id>/cancel/', views.cancel_shift, name='cancel_shift'),
     path('manager/application/<int:application_id>/review/', views.review_volunteer, name='review_volunteer'),
     path('manager/application/<int:application_id>/approve/', views.approve_volunteer, name='approve_volunteer'),
     path('manager/application/<int:application_id>/reject/', views.reject_volunteer, name='reject_volunteer'),
+    path('manager/applications/bulk-review/', views.bulk_review_volunteers, name='bulk_review_volunteers'),
 ]
@@ -1,19 +1,55 @@
+import asyncio
+import hashlib
+from datetime import date, timedelta
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Count, Max, Prefetch
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_POST, condition
 from apps.user_authentication.models import AuditLog
-from apps.user_authentication.views import log_audit
+from apps.user_authentication.views import log_audit, get_client_ip
 from apps.notifications.views import create_notification
-from .models import Shift, ShiftVolunteer, Store, ShiftHistory
-from .forms import ShiftForm, VolunteerReviewForm, StoreForm
+from apps.notifications.tasks import deliver_notifications
+from apps.user_authentication.tasks import write_audit_logs
+from helping_hand_core.asyncviews import async_login_required, alist, arender
+from helping_hand_core.tasks import enqueue
+from apps.dashboard_reports.forecast import forecast_for
+from apps.dashboard_reports.summary import invalidate_global, invalidate_users
+from .models import (Shift, ShiftVolunteer, Store, ShiftHistory, Availability, BusyDay, ShiftAlertPreference,
+                     SwapRequest, VolunteerStats)
+from .forms import (AvailabilityForm, ShiftAlertForm, ShiftForm, ShiftImportForm, SwapOfferForm, VolunteerReviewForm,
+                    StoreForm)
+from .importer import COLUMNS as IMPORT_COLUMNS, ImportFileError, import_shifts, read_rows
+from .search import search_shifts
+from .lifecycle import InvalidTransition, check_transition, refresh_fill_status
+from .schedule import ROLE_BITS, format_ranges, refresh_shift_busy_days, shift_mask, unpack, unpack_week, week_start
+from .stats import record_status_change, record_status_changes, reschedule_shift_minutes
+from .swaps import SwapError, find_takers, accept as swap_accept, cancel as swap_cancel, offer as swap_offer
+from .waitlist import join_waitlist, promote
+from .availability import set_availability
+from .alerts import notify_shift_cancelled, notify_shift_posted
+from .geo import geocode_zip, nearest_stores
+from .ical import calendar_token, user_id_from_token, stream_calendar
+from .changes import (form_diff, record_change, application_change, record_application_change,
+                      changes_since, serialize_change)
 
 
-@login_required
-def shift_list_view(request):
-    """View all open shifts for staff"""
-    shifts = Shift.objects.filter(
+def _shift_list_query(request):
+    """
+    Build the open-shift queryset for the list page from request.GET.
+
+    Returns (shifts, radius_search, context) where radius_search is a
+    (lat, lon, radius_km) tuple when a valid radius filter was given.
+    """
+    shifts = Shift.in_region.filter(
         status='open',
         shift_date__gte=timezone.now().date()
     ).select_related('store', 'manager')
@@ -26,14 +62,85 @@ def shift_list_view(request):
     if store_filter:
         shifts = shifts.filter(store_id=store_filter)
     
-    stores = Store.objects.filter(is_active=True)
-    role_choices = Shift.ROLE_CHOICES
-    
-    return render(request, 'shift_management/shift_list.html', {
-        'shifts': shifts,
-        'stores': stores,
-        'role_choices': role_choices,
-    })
+    city_filter = request.GET.get('city', '').strip()
+    if city_filter:
+        shifts = shifts.filter(store__city__iexact=city_filter)
+
+    query = request.GET.get('q', '').strip()
+    if query:
+        shifts = search_shifts(shifts, query)
+
+    near = request.GET.get('near', '').strip()
+    radius = request.GET.get('radius', '')
+    radius_search = None
+    origin = _resolve_origin(request, near)
+    if origin and radius:
+        try:
+            radius_km = float(radius)
+        except ValueError:
+            radius_km = None
+        if radius_km and radius_km > 0:
+            radius_search = (origin[0], origin[1], min(radius_km, settings.MAX_RADIUS_KM))
+    
+    context = {
+        'role_choices': Shift.ROLE_CHOICES,
+        'query': query,
+        'city': city_filter,
+        'near': near,
+        'radius': radius,
+    }
+    return shifts, radius_search, context
+
+
+def _apply_distances(shifts, distances):
+    for shift in shifts:
+        shift.distance_km = round(distances[shift.store_id], 1)
+    return shifts
+
+
+@login_required
+def shift_list_view(request):
+    """View all open shifts for staff"""
+    shifts, radius_search, context = _shift_list_query(request)
+
+    # Radius filter: prune to nearby stores first, then fetch only their shifts
+    if radius_search:
+        distances = dict(nearest_stores(*radius_search))
+        shifts = _apply_distances(list(shifts.filter(store_id__in=list(distances))), distances)
+
+    context.update({'shifts': shifts, 'stores': Store.in_region.filter(is_active=True)})
+    return render(request, 'shift_management/shift_list.html', context)
+
+
+@async_login_required
+async def shift_list_view_async(request):
+    """ASGI version of shift_list_view: shifts and stores are fetched concurrently"""
+    shifts, radius_search, context = _shift_list_query(request)
+
+    distances = None
+    if radius_search:
+        distances = dict(await sync_to_async(nearest_stores)(*radius_search))
+        shifts = shifts.filter(store_id__in=list(distances))
+
+    shifts, stores = await asyncio.gather(
+        alist(shifts), alist(Store.in_region.filter(is_active=True))
+    )
+    if distances is not None:
+        _apply_distances(shifts, distances)
+
+    context.update({'shifts': shifts, 'stores': stores})
+    return await arender(request, 'shift_management/shift_list.html', context)
+
+
+def _resolve_origin(request, near):
+    """Origin for radius searches: explicit lat/lon, else a geocoded ZIP code"""
+    try:
+        return float(request.GET['lat']), float(request.GET['lon'])
+    except (KeyError, ValueError):
+        pass
+    if near:
+        return geocode_zip(near)
+    return None
 
 
 @login_required
@@ -44,28 +151,62 @@ def my_shifts_view(request):
     ).select_related('shift', 'shift__store').order_by('-applied_at')
     
     return render(request, 'shift_management/my_shifts.html', {
-        'applications': applications
+        'applications': applications,
+        'calendar_url': request.build_absolute_uri(
+            reverse('user_calendar_feed', args=[calendar_token(request.user)])
+        ),
     })
 
 
+def _shift_detail(shift_id, user):
+    """
+    The shift for the detail page, with store and manager joined, the approved
+    count annotated and ``user``'s application prefetched, so the page needs no
+    further queries.
+
+    With SHIFT_DETAIL_CACHE_TTL set, the joined and annotated shift is cached
+    under its updated_at, so an edit is visible at once. Only a pk lookup and
+    the viewer's application then hit the database. Slot counts can be up to
+    the TTL old; volunteering re-checks them against the database.
+    """
+    applications = Prefetch('volunteers', queryset=ShiftVolunteer.objects.filter(volunteer=user),
+                            to_attr='viewer_applications')
+    detail = Shift.in_region.select_related('store', 'manager').annotate(
+        approved_total=Count('volunteers', filter=Q(volunteers__status='approved'))
+    )
+    ttl = settings.SHIFT_DETAIL_CACHE_TTL
+    if not ttl:
+        shift = get_object_or_404(detail.prefetch_related(applications), id=shift_id)
+    else:
+        stamp = get_object_or_404(Shift.in_region.only('updated_at').prefetch_related(applications), id=shift_id)
+        key = f'shift_detail:{shift_id}:{stamp.updated_at.timestamp()}'
+        shift = cache.get(key)
+        if shift is None:
+            shift = detail.get(id=shift_id)
+            cache.set(key, shift, ttl)
+        shift.viewer_applications = stamp.viewer_applications
+    shift.viewer_id = user.id
+    return shift
+
+
 @login_required
 def shift_detail_view(request, shift_id):
     """View shift details"""
-    shift = get_object_or_404(Shift, id=shift_id)
+    shift = _shift_detail(shift_id, request.user)
     user_application = None
     can_volunteer = False
+    can_join_waitlist = False
     
     if request.user.is_staff_member():
-        try:
-            user_application = ShiftVolunteer.objects.get(shift=shift, volunteer=request.user)
-        except ShiftVolunteer.DoesNotExist:
-            pass
+        user_application = next(iter(shift.viewer_applications), None)
         can_volunteer = shift.can_volunteer(request.user)
+        can_join_waitlist = not can_volunteer and shift.can_join_waitlist(request.user)
     
     return render(request, 'shift_management/shift_detail.html', {
         'shift': shift,
         'user_application': user_application,
         'can_volunteer': can_volunteer,
+        'can_join_waitlist': can_join_waitlist,
     })
 
 
@@ -76,13 +217,24 @@ def volunteer_for_shift(request, shift_id):
         messages.error(request, 'Only staff members can volunteer for shifts.')
         return redirect('shift_list')
     
-    shift = get_object_or_404(Shift, id=shift_id)
+    shift = get_object_or_404(Shift.in_region, id=shift_id)
     
     if not shift.can_volunteer(request.user):
+        if shift.can_join_waitlist(request.user):
+            application = join_waitlist(shift, request.user)
+            record_application_change(application, 'applied', request.user, None)
+            record_status_change(application, None)
+            log_audit(request.user, 'volunteer', f'Joined waitlist for shift: {shift.title}', request,
+                      details={'shift_id': shift.id})
+            messages.success(request, f'The shift is full; you are #{application.waitlist_position} '
+                                      f'on the waitlist.')
+            return redirect('my_shifts')
         messages.error(request, 'You cannot volunteer for this shift.')
         return redirect('shift_detail', shift_id=shift_id)
     
-    ShiftVolunteer.objects.create(shift=shift, volunteer=request.user)
+    application = ShiftVolunteer.objects.create(shift=shift, volunteer=request.user)
+    record_application_change(application, 'applied', request.user, None)
+    record_status_change(application, None)
     
     # Create notification for manager
     create_notification(
@@ -105,12 +257,17 @@ def withdraw_volunteer(request, application_id):
     """Withdraw volunteer application"""
     application = get_object_or_404(ShiftVolunteer, id=application_id, volunteer=request.user)
     
-    if application.status != 'pending':
+    if application.status not in ('pending', 'approved', 'waitlisted') or application.shift.is_past():
         messages.error(request, 'Cannot withdraw this application.')
         return redirect('my_shifts')
     
+    old_status = application.status
     application.status = 'withdrawn'
     application.save()
+    record_application_change(application, 'withdrawn', request.user, old_status)
+    record_status_change(application, old_status)
+    if old_status == 'approved':
+        promote(application.shift_id)
     log_audit(request.user, 'volunteer', f'Withdrew application for shift: {application.shift.title}', 
               request, details={'application_id': application.id})
     
@@ -126,8 +283,9 @@ def manager_dashboard(request):
         return redirect('dashboard')
     
     shifts = Shift.objects.filter(manager=request.user).select_related('store').prefetch_related('volunteers')
+    # Filtered and sorted on the application's own manager copy (shiftvol_manager_queue_idx)
     pending_applications = ShiftVolunteer.objects.filter(
-        shift__manager=request.user,
+        manager=request.user,
         status='pending'
     ).select_related('shift', 'volunteer').order_by('-applied_at')
     
@@ -141,6 +299,24 @@ def manager_dashboard(request):
     })
 
 
+def _slot_suggestion(data):
+    """Staffing forecast for the store/role/date in submitted or query data, if any"""
+    try:
+        store_id = int(data.get('store'))
+        shift_date = date.fromisoformat(data.get('shift_date'))
+    except (TypeError, ValueError):
+        return None
+    return forecast_for(store_id, data.get('role_required'), shift_date)
+
+
+def _describe_suggestion(forecast):
+    text = (f'Forecast: about {forecast.expected_volunteers:.1f} volunteers per shift like this '
+            f'({forecast.fill_rate:.0%} of slots filled); suggested {forecast.suggested_slots} slots.')
+    if forecast.avg_hours_to_fill is not None:
+        text += f' Slots usually fill {forecast.avg_hours_to_fill / 24:.1f} days after posting.'
+    return text
+
+
 @login_required
 def create_shift(request):
     """Managers create new shifts"""
@@ -155,25 +331,65 @@ def create_shift(request):
             shift.manager = request.user
             shift.save()
             
-            ShiftHistory.objects.create(
-                shift=shift, action='created', performed_by=request.user,
-                description=f'Shift created: {shift.title}'
-            )
+            record_change(shift, 'created', request.user, f'Shift created: {shift.title}',
+                          changes={'status': [None, shift.status]})
             log_audit(request.user, 'create_shift', f'Created shift: {shift.title}', request,
                      details={'shift_id': shift.id})
+            enqueue(notify_shift_posted, shift.id)
             
             messages.success(request, 'Shift created successfully!')
             return redirect('manager_dashboard')
+        suggestion = _slot_suggestion(request.POST)
     else:
-        form = ShiftForm()
-    
+        # Links from the staffing forecast prefill store/role/date (and slots)
+        initial = {name: request.GET[name] for name in ShiftForm.Meta.fields if name in request.GET}
+        suggestion = _slot_suggestion(request.GET)
+        if suggestion and 'slots_available' not in initial:
+            initial['slots_available'] = suggestion.suggested_slots
+        form = ShiftForm(initial=initial)
+    
+    if suggestion:
+        form.fields['slots_available'].help_text = _describe_suggestion(suggestion)
     return render(request, 'shift_management/shift_form.html', {'form': form, 'title': 'Create Shift'})
 
 
+@login_required
+def import_shifts_view(request):
+    """Managers upload a CSV/XLSX roster; valid rows become shifts, the rest are reported"""
+    if not (request.user.is_manager() or request.user.is_admin()):
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+
+    result = None
+    if request.method == 'POST':
+        form = ShiftImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                result = import_shifts(read_rows(upload, upload.name), request.user)
+            except ImportFileError as e:
+                form.add_error('file', str(e))
+            else:
+                log_audit(request.user, 'import_shifts', f'Imported {result.created} shifts from {upload.name}',
+                          request, details={'created': result.created, 'failed': result.failed})
+                if result.created:
+                    messages.success(request, f'Imported {result.created} shifts.')
+                if result.failed:
+                    messages.warning(request, f'{result.failed} rows were skipped; see the report below.')
+    else:
+        form = ShiftImportForm()
+
+    return render(request, 'shift_management/shift_import.html', {
+        'form': form,
+        'result': result,
+        'columns': IMPORT_COLUMNS,
+    })
+
+
 @login_required
 def update_shift(request, shift_id):
     """Managers update existing shifts"""
-    shift = get_object_or_404(Shift, id=shift_id)
+    shift = get_object_or_404(Shift.in_region, id=shift_id)
     
     if not (request.user == shift.manager or request.user.is_admin()):
         messages.error(request, 'Access denied.')
@@ -183,10 +399,17 @@ def update_shift(request, shift_id):
         form = ShiftForm(request.POST, instance=shift)
         if form.is_valid():
             shift = form.save()
-            ShiftHistory.objects.create(
-                shift=shift, action='updated', performed_by=request.user,
-                description=f'Shift updated: {shift.title}'
-            )
+            diff = form_diff(form)
+            rescheduled = bool({'shift_date', 'start_time', 'end_time'} & set(diff))
+            if {'start_time', 'end_time'} & set(diff):
+                reschedule_shift_minutes(shift, form.initial['start_time'], form.initial['end_time'])
+            if rescheduled:
+                refresh_shift_busy_days(shift, old_date=form.initial['shift_date'])
+            if 'slots_available' in diff:
+                promote(shift.id)
+                refresh_fill_status([shift.id], performed_by=request.user)
+            record_change(shift, 'rescheduled' if rescheduled else 'updated', request.user,
+                          f'Shift updated: {shift.title}', changes=diff)
             log_audit(request.user, 'update_shift', f'Updated shift: {shift.title}', request,
                      details={'shift_id': shift.id})
             
@@ -203,19 +426,26 @@ def update_shift(request, shift_id):
 @login_required
 def cancel_shift(request, shift_id):
     """Managers cancel shifts"""
-    shift = get_object_or_404(Shift, id=shift_id)
+    shift = get_object_or_404(Shift.in_region, id=shift_id)
     
     if not (request.user == shift.manager or request.user.is_admin()):
         messages.error(request, 'Access denied.')
         return redirect('manager_dashboard')
     
+    try:
+        check_transition(shift.status, 'cancelled')
+    except InvalidTransition as e:
+        messages.error(request, str(e))
+        return redirect('manager_dashboard')
+
+    old_status = shift.status
     shift.status = 'cancelled'
     shift.save()
+    refresh_shift_busy_days(shift)
+    enqueue(notify_shift_cancelled, shift.id)
     
-    ShiftHistory.objects.create(
-        shift=shift, action='cancelled', performed_by=request.user,
-        description=f'Shift cancelled: {shift.title}'
-    )
+    record_change(shift, 'cancelled', request.user, f'Shift cancelled: {shift.title}',
+                  changes={'status': [old_status, shift.status]})
     log_audit(request.user, 'delete_shift', f'Cancelled shift: {shift.title}', request,
              details={'shift_id': shift.id})
     
@@ -226,19 +456,26 @@ def cancel_shift(request, shift_id):
 @login_required
 def review_volunteer(request, application_id):
     """Manager reviews volunteer applications"""
-    application = get_object_or_404(ShiftVolunteer, id=application_id)
+    application = get_object_or_404(ShiftVolunteer.in_region, id=application_id)
     
     if not (request.user == application.shift.manager or request.user.is_admin()):
         messages.error(request, 'Access denied.')
         return redirect('manager_dashboard')
     
     if request.method == 'POST':
+        old_status = application.status
         form = VolunteerReviewForm(request.POST, instance=application)
         if form.is_valid():
             application = form.save(commit=False)
             application.reviewed_by = request.user
             application.reviewed_at = timezone.now()
             application.save()
+            if application.status != old_status:
+                record_application_change(application, application.status, request.user, old_status)
+                record_status_change(application, old_status)
+                if old_status == 'approved':
+                    promote(application.shift_id)
+                refresh_fill_status([application.shift_id], performed_by=request.user)
             
             action = 'approve' if application.status == 'approved' else 'reject'
             log_audit(request.user, action, 
@@ -258,16 +495,20 @@ def review_volunteer(request, application_id):
 @login_required
 def approve_volunteer(request, application_id):
     """Quick approve volunteer application"""
-    application = get_object_or_404(ShiftVolunteer, id=application_id)
+    application = get_object_or_404(ShiftVolunteer.in_region, id=application_id)
     
     if not (request.user == application.shift.manager or request.user.is_admin()):
         messages.error(request, 'Access denied.')
         return redirect('manager_dashboard')
     
+    old_status = application.status
     application.status = 'approved'
     application.reviewed_by = request.user
     application.reviewed_at = timezone.now()
     application.save()
+    record_application_change(application, 'approved', request.user, old_status)
+    record_status_change(application, old_status)
+    refresh_fill_status([application.shift_id], performed_by=request.user)
     
     # Create notification for volunteer
     create_notification(
@@ -289,16 +530,22 @@ def approve_volunteer(request, application_id):
 @login_required
 def reject_volunteer(request, application_id):
     """Quick reject volunteer application"""
-    application = get_object_or_404(ShiftVolunteer, id=application_id)
+    application = get_object_or_404(ShiftVolunteer.in_region, id=application_id)
     
     if not (request.user == application.shift.manager or request.user.is_admin()):
         messages.error(request, 'Access denied.')
         return redirect('manager_dashboard')
     
+    old_status = application.status
     application.status = 'rejected'
     application.reviewed_by = request.user
     application.reviewed_at = timezone.now()
     application.save()
+    record_application_change(application, 'rejected', request.user, old_status)
+    record_status_change(application, old_status)
+    if old_status == 'approved':
+        promote(application.shift_id)
+    refresh_fill_status([application.shift_id], performed_by=request.user)
     
     # Create notification for volunteer
     create_notification(
@@ -315,3 +562,390 @@ def reject_volunteer(request, application_id):
     
     messages.success(request, f'Rejected {application.volunteer.get_full_name()}\'s application.')
     return redirect('manager_dashboard')
+
+
+@login_required
+@require_POST
+def bulk_review_volunteers(request):
+    """Approve or reject many pending applications in one request"""
+    if not (request.user.is_manager() or request.user.is_admin()):
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+
+    decision = request.POST.get('decision')
+    if decision not in ('approve', 'reject'):
+        messages.error(request, 'Invalid decision.')
+        return redirect('manager_dashboard')
+
+    application_ids = [int(i) for i in request.POST.getlist('application_ids') if i.isdigit()]
+    if not application_ids:
+        messages.error(request, 'No applications selected.')
+        return redirect('manager_dashboard')
+
+    with transaction.atomic():
+        # Ownership and state are checked in the same query that locks the rows
+        applications = ShiftVolunteer.in_region.select_for_update().filter(
+            id__in=application_ids, status='pending'
+        ).select_related('shift', 'volunteer').order_by('applied_at')
+        if not request.user.is_admin():
+            applications = applications.filter(manager=request.user)
+
+        if decision == 'approve':
+            # Lock the shifts first, in id order, so concurrent approvals count
+            # approved places one at a time and never overfill a shift
+            shift_ids = set(applications.values_list('shift_id', flat=True))
+            list(Shift.objects.select_for_update().filter(id__in=shift_ids).order_by('id').values_list('id'))
+        applications = list(applications)
+
+        if decision == 'approve':
+            shift_ids = {app.shift_id for app in applications}
+            approved_counts = dict(
+                ShiftVolunteer.objects.filter(shift_id__in=shift_ids, status='approved')
+                .order_by().values_list('shift_id').annotate(total=Count('id'))
+            )
+            remaining = {
+                app.shift_id: app.shift.slots_available - approved_counts.get(app.shift_id, 0)
+                for app in applications
+            }
+            selected = []
+            for app in applications:
+                if remaining[app.shift_id] > 0:
+                    remaining[app.shift_id] -= 1
+                    selected.append(app)
+        else:
+            selected = applications
+
+        new_status = 'approved' if decision == 'approve' else 'rejected'
+        now = timezone.now()
+        ShiftVolunteer.objects.filter(id__in=[app.id for app in selected]).update(
+            status=new_status, reviewed_by=request.user, reviewed_at=now
+        )
+        for app in selected:
+            app.status = new_status
+        ShiftHistory.objects.bulk_create([
+            application_change(app, new_status, request.user, 'pending') for app in selected
+        ])
+        record_status_changes([(app, 'pending') for app in selected], when=now)
+        if decision == 'approve':
+            refresh_fill_status(shift_ids, performed_by=request.user)
+
+        if decision == 'approve':
+            notifications = [dict(
+                recipient_id=app.volunteer_id,
+                notification_type='application_approved',
+                title='Application Approved',
+                message=f'Your application for "{app.shift.title}" on {app.shift.shift_date} has been approved!',
+                link=f'/shifts/{app.shift.id}/'
+            ) for app in selected]
+        else:
+            notifications = [dict(
+                recipient_id=app.volunteer_id,
+                notification_type='application_rejected',
+                title='Application Not Approved',
+                message=f'Your application for "{app.shift.title}" on {app.shift.shift_date} was not approved.',
+                link='/shifts/'
+            ) for app in selected]
+        enqueue(deliver_notifications, notifications)
+
+        invalidate_global()
+        invalidate_users([app.volunteer_id for app in selected] + [app.shift.manager_id for app in selected])
+
+        ip_address = get_client_ip(request)
+        enqueue(write_audit_logs, [dict(
+            user_id=request.user.id,
+            action=decision,
+            description=f'{new_status.capitalize()} volunteer: {app.volunteer.username} for {app.shift.title}',
+            ip_address=ip_address,
+            details={'application_id': app.id}
+        ) for app in selected])
+
+    skipped = len(application_ids) - len(selected)
+    messages.success(request, f'{new_status.capitalize()} {len(selected)} application(s).')
+    if skipped:
+        messages.warning(request, f'Skipped {skipped} application(s) that were not pending, '
+                                  f'not yours, or would exceed the shift\'s slots.')
+    return redirect('manager_dashboard')
+
+
+@login_required
+def availability_view(request):
+    """Staff set the times they can work, a week at a time"""
+    if not request.user.is_staff_member():
+        messages.error(request, 'Only staff members record availability.')
+        return redirect('dashboard')
+
+    if request.method == 'POST':
+        form = AvailabilityForm(request.POST)
+        if form.is_valid():
+            week = week_start(form.cleaned_data['week'])
+            weeks = form.cleaned_data['weeks']
+            set_availability(request.user, week, form.cleaned_data['day_masks'], weeks)
+            messages.success(request, f'Availability saved for {weeks} week(s) from {week}.')
+            return redirect(f"{reverse('availability')}?week={week}")
+    else:
+        try:
+            week = week_start(date.fromisoformat(request.GET['week']))
+        except (KeyError, ValueError):
+            week = week_start(timezone.now().date())
+        saved = Availability.objects.filter(user=request.user, week_start=week).values_list('mask', flat=True).first()
+        initial = {'week': week, 'weeks': 1}
+        initial.update(zip(AvailabilityForm.DAYS, map(format_ranges, unpack_week(saved))))
+        form = AvailabilityForm(initial=initial)
+
+    weeks = Availability.objects.filter(user=request.user, week_start__gte=week_start(timezone.now().date())
+                                        ).values_list('week_start', flat=True).order_by('week_start')
+    return render(request, 'shift_management/availability.html', {
+        'form': form, 'day_fields': [form[day] for day in AvailabilityForm.DAYS], 'saved_weeks': weeks
+    })
+
+
+@login_required
+def shift_alerts_view(request):
+    """Staff choose which newly posted shifts they are told about"""
+    if not request.user.is_staff_member():
+        messages.error(request, 'Only staff members receive shift alerts.')
+        return redirect('dashboard')
+
+    preference = ShiftAlertPreference.objects.filter(user=request.user).first()
+    if request.method == 'POST':
+        form = ShiftAlertForm(request.POST, instance=preference)
+        if form.is_valid():
+            preference = form.save(commit=False)
+            preference.user = request.user
+            form.save()
+            messages.success(request, 'Shift alert settings saved.')
+            return redirect('shift_alerts')
+    else:
+        form = ShiftAlertForm(instance=preference)
+
+    return render(request, 'shift_management/shift_alerts.html', {'form': form})
+
+
+@login_required
+def swap_market(request):
+    """Open swap offers the user can take, plus the user's own offers"""
+    if not request.user.is_staff_member():
+        messages.error(request, 'Only staff members can swap shifts.')
+        return redirect('dashboard')
+
+    offers = list(SwapRequest.in_region.filter(
+        status='open', application__shift__shift_date__gte=timezone.now().date()
+    ).filter(Q(offered_to__isnull=True) | Q(offered_to=request.user)).exclude(
+        requested_by=request.user
+    ).select_related('application__shift__store', 'requested_by').order_by(
+        'application__shift__shift_date', 'application__shift__start_time'
+    )[:200])
+
+    # Eligibility for every offer from three reads: role mask, busy days, own applications
+    stats = VolunteerStats.objects.filter(user=request.user).first()
+    role_mask = stats.role_mask if stats else 0
+    shifts = [swap.application.shift for swap in offers]
+    busy = {day: unpack(mask) for day, mask in BusyDay.objects.filter(
+        user=request.user, day__in={shift.shift_date for shift in shifts}
+    ).values_list('day', 'mask')}
+    applied = set(ShiftVolunteer.objects.filter(
+        volunteer=request.user, shift__in=shifts
+    ).values_list('shift_id', flat=True))
+    available = [
+        swap for swap in offers
+        if role_mask & ROLE_BITS[swap.application.shift.role_required]
+        and not busy.get(swap.application.shift.shift_date, 0) & shift_mask(swap.application.shift)
+        and swap.application.shift_id not in applied
+    ]
+
+    my_offers = SwapRequest.objects.filter(requested_by=request.user, status='open').select_related(
+        'application__shift', 'offered_to'
+    )
+    return render(request, 'shift_management/swap_market.html', {
+        'available': available, 'my_offers': my_offers
+    })
+
+
+@login_required
+def offer_swap(request, application_id):
+    """Offer an approved place to a colleague or to the marketplace"""
+    application = get_object_or_404(ShiftVolunteer.objects.select_related('shift', 'volunteer'),
+                                    id=application_id, volunteer=request.user)
+
+    if request.method == 'POST':
+        form = SwapOfferForm(request.POST)
+        if form.is_valid():
+            try:
+                swap_offer(application, form.cleaned_data['colleague'], form.cleaned_data['note'])
+            except SwapError as e:
+                messages.error(request, str(e))
+            else:
+                log_audit(request.user, 'volunteer', f'Offered swap for shift: {application.shift.title}',
+                          request, details={'application_id': application.id})
+                messages.success(request, 'Your place is on offer.')
+                return redirect('swap_market')
+    else:
+        form = SwapOfferForm()
+
+    return render(request, 'shift_management/swap_offer.html', {
+        'form': form, 'application': application,
+        'suggested': find_takers(application.shift, limit=10, exclude=[request.user.id]),
+    })
+
+
+@login_required
+@require_POST
+def accept_swap(request, swap_id):
+    """Take over a place offered for swap"""
+    swap = get_object_or_404(SwapRequest.in_region, id=swap_id)
+    try:
+        taken = swap_accept(swap.id, request.user)
+    except SwapError as e:
+        messages.error(request, str(e))
+        return redirect('swap_market')
+
+    log_audit(request.user, 'volunteer', f'Took swapped shift: {taken.shift.title}', request,
+              details={'shift_id': taken.shift_id, 'application_id': taken.id})
+    messages.success(request, f'You are now booked for {taken.shift.title} on {taken.shift.shift_date}.')
+    return redirect('my_shifts')
+
+
+@login_required
+@require_POST
+def cancel_swap(request, swap_id):
+    """Withdraw one of your own swap offers"""
+    swap = get_object_or_404(SwapRequest, id=swap_id, requested_by=request.user)
+    try:
+        swap_cancel(swap, request.user)
+    except SwapError as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, 'Swap offer withdrawn.')
+    return redirect('swap_market')
+
+
+# Calendar feeds are polled by calendar clients without a session, so they are
+# authenticated by a signed token and answered with 304s when nothing changed.
+
+CALENDAR_PAST_DAYS = 30
+
+
+def _feed_state(request, aggregate):
+    """Turn feed aggregates into a cached (etag, last_modified) pair"""
+    if not hasattr(request, '_calendar_feed_state'):
+        timestamps = [value for value in aggregate.values() if hasattr(value, 'isoformat')]
+        last_modified = max(timestamps) if timestamps else None
+        etag = hashlib.md5(repr(sorted(aggregate.items())).encode(), usedforsecurity=False).hexdigest()
+        request._calendar_feed_state = (etag, last_modified)
+    return request._calendar_feed_state
+
+
+def _user_feed_state(request, token):
+    user_id = user_id_from_token(token)
+    if user_id is None:
+        return None
+    approved = Q(status='approved')
+    return _feed_state(request, ShiftVolunteer.objects.filter(volunteer_id=user_id).aggregate(
+        user_id=Max('volunteer_id'),
+        approved=Count('id', filter=approved, distinct=True),
+        reviewed=Max('reviewed_at'),
+        shift_updated=Max('shift__updated_at', filter=approved),
+        history=Max('shift__history__timestamp', filter=approved),
+    ))
+
+
+def _store_feed_state(request, token, store_id):
+    if user_id_from_token(token) is None:
+        return None
+    return _feed_state(request, Shift.objects.filter(
+        store_id=store_id, shift_date__gte=timezone.now().date()
+    ).aggregate(
+        store_id=Max('store_id'),
+        open=Count('id', filter=Q(status='open'), distinct=True),
+        shift_updated=Max('updated_at'),
+        history=Max('history__timestamp'),
+    ))
+
+
+def _calendar_response(request, name, shifts, filename):
+    base_url = request.build_absolute_uri('/').rstrip('/')
+    response = StreamingHttpResponse(stream_calendar(name, shifts.iterator(), base_url),
+                                     content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    patch_cache_control(response, private=True, max_age=300)
+    return response
+
+
+def _user_feed_etag(request, token):
+    state = _user_feed_state(request, token)
+    return state[0] if state else None
+
+
+def _user_feed_last_modified(request, token):
+    state = _user_feed_state(request, token)
+    return state[1] if state else None
+
+
+def _store_feed_etag(request, token, store_id):
+    state = _store_feed_state(request, token, store_id)
+    return state[0] if state else None
+
+
+def _store_feed_last_modified(request, token, store_id):
+    state = _store_feed_state(request, token, store_id)
+    return state[1] if state else None
+
+
+@condition(etag_func=_user_feed_etag, last_modified_func=_user_feed_last_modified)
+def user_calendar_feed(request, token):
+    """iCalendar feed of a user's approved shifts"""
+    user_id = user_id_from_token(token)
+    if user_id is None:
+        raise Http404
+
+    since = timezone.now().date() - timedelta(days=CALENDAR_PAST_DAYS)
+    shifts = Shift.objects.filter(
+        volunteers__volunteer_id=user_id, volunteers__status='approved', shift_date__gte=since
+    ).select_related('store').annotate(history_count=Count(
+        'history', filter=Q(history__action__in=ShiftHistory.SHIFT_ACTIONS), distinct=True
+    )).order_by('shift_date')
+    return _calendar_response(request, 'My Shifts', shifts, 'my-shifts.ics')
+
+
+@condition(etag_func=_store_feed_etag, last_modified_func=_store_feed_last_modified)
+def store_calendar_feed(request, token, store_id):
+    """iCalendar feed of a store's upcoming open shifts"""
+    if user_id_from_token(token) is None:
+        raise Http404
+    store = get_object_or_404(Store, id=store_id, is_active=True)
+
+    shifts = Shift.objects.filter(
+        store=store, status='open', shift_date__gte=timezone.now().date()
+    ).select_related('store').annotate(history_count=Count(
+        'history', filter=Q(history__action__in=ShiftHistory.SHIFT_ACTIONS), distinct=True
+    )).order_by('shift_date')
+    return _calendar_response(request, f'Open shifts at {store.name}', shifts, f'store-{store.id}.ics')
+
+
+@login_required
+def shift_changes_feed(request):
+    """
+    JSON change feed: events with sequence greater than ?since=N.
+
+    Admins see every event, managers the events on their shifts, and staff
+    shift-level events plus events on their own applications.
+    """
+    try:
+        since = max(int(request.GET.get('since', 0)), 0)
+        limit = min(max(int(request.GET.get('limit', 500)), 1), 1000)
+    except ValueError:
+        return JsonResponse({'error': 'since and limit must be integers'}, status=400)
+
+    user = request.user
+    queryset = ShiftHistory.in_region.all()
+    if user.is_manager():
+        queryset = queryset.filter(shift__manager=user)
+    elif not user.is_admin():
+        queryset = queryset.filter(Q(action__in=ShiftHistory.SHIFT_ACTIONS) | Q(volunteer=user))
+
+    changes = changes_since(since, limit, queryset)
+    return JsonResponse({
+        'changes': [serialize_change(change) for change in changes],
+        'next_since': changes[-1].id if changes else since,
+        'has_more': len(changes) == limit,
+    })
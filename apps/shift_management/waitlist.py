@@ -0,0 +1,97 @@
+"""
+Shift waitlists.
+
+Once a shift's slots are taken, staff can queue for it. Positions are
+assigned as MAX + 1 while the shift row is locked and are unique per shift,
+so the queue is first come, first served.
+
+When a slot opens (an approved volunteer withdraws or is rejected, or slots
+are added), promote() approves the lowest-position eligible entry. Each
+promotion is one seek on the (shift, status, waitlist_position) index, not a
+scan of the applicants. The shift row stays locked for the whole promotion,
+and each promotion is an UPDATE guarded by status='waitlisted', so
+concurrent withdrawals can't promote more volunteers than there are free
+slots.
+"""
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from apps.dashboard_reports.summary import invalidate_users
+from apps.notifications.tasks import deliver_notifications
+from helping_hand_core.tasks import enqueue
+from .changes import application_change
+from .lifecycle import refresh_fill_status
+from .models import Shift, ShiftHistory, ShiftVolunteer
+from .stats import record_status_changes
+
+
+def _lock_shift(shift_id):
+    return Shift.objects.select_for_update().get(id=shift_id)
+
+
+def join_waitlist(shift, user):
+    """Queue ``user`` at the end of the shift's waitlist and return the application"""
+    with transaction.atomic():
+        shift = _lock_shift(shift.id)
+        last = shift.volunteers.filter(status='waitlisted').aggregate(
+            last=Max('waitlist_position')
+        )['last'] or 0
+        return ShiftVolunteer.objects.create(shift=shift, volunteer=user, status='waitlisted',
+                                             waitlist_position=last + 1)
+
+
+def is_eligible(application, shift):
+    """A waitlisted volunteer can be promoted if still active and not booked for an overlapping shift"""
+    if not application.volunteer.is_active:
+        return False
+    return not ShiftVolunteer.objects.filter(
+        volunteer_id=application.volunteer_id, status='approved',
+        shift__shift_date=shift.shift_date,
+        shift__start_time__lt=shift.end_time, shift__end_time__gt=shift.start_time,
+    ).exclude(shift_id=shift.id).exists()
+
+
+def promote(shift_id):
+    """Fill free slots on a shift from its waitlist; returns the promoted applications"""
+    with transaction.atomic():
+        shift = _lock_shift(shift_id)
+        if shift.status not in ('open', 'filled') or shift.is_past():
+            return []
+        free = shift.slots_available - shift.volunteers.filter(status='approved').count()
+        waitlist = shift.volunteers.filter(status='waitlisted').select_related('volunteer').order_by(
+            'waitlist_position'
+        )
+        promoted = []
+        after = 0
+        while free > 0:
+            candidate = waitlist.filter(waitlist_position__gt=after).first()
+            if candidate is None:
+                break
+            after = candidate.waitlist_position
+            if not is_eligible(candidate, shift):
+                continue
+            now = timezone.now()
+            if not ShiftVolunteer.objects.filter(id=candidate.id, status='waitlisted').update(
+                status='approved', waitlist_position=None, reviewed_at=now
+            ):
+                continue
+            candidate.status, candidate.waitlist_position, candidate.reviewed_at = 'approved', None, now
+            candidate.shift = shift
+            promoted.append(candidate)
+            free -= 1
+
+        if promoted:
+            ShiftHistory.objects.bulk_create([
+                application_change(app, 'approved', None, 'waitlisted') for app in promoted
+            ])
+            record_status_changes([(app, 'waitlisted') for app in promoted])
+            enqueue(deliver_notifications, [dict(
+                recipient_id=app.volunteer_id,
+                notification_type='application_approved',
+                title='Off the Waitlist',
+                message=f'A slot opened on "{shift.title}" on {shift.shift_date} and you are now confirmed!',
+                link=f'/shifts/{shift.id}/'
+            ) for app in promoted])
+            invalidate_users([app.volunteer_id for app in promoted] + [shift.manager_id])
+        refresh_fill_status([shift.id])
+    return promoted
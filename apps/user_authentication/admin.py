@@ -5,10 +5,10 @@ from .models import CustomUser, AuditLog
 @admin.register(CustomUser)
 class CustomUserAdmin(BaseUserAdmin):
     fieldsets = BaseUserAdmin.fieldsets + (
-        ('Custom Fields', {'fields': ('role', 'phone', 'address', 'security_question', 'security_answer')}),
+        ('Custom Fields', {'fields': ('role', 'region', 'phone', 'address', 'security_question')}),
     )
-    list_display = ('username', 'email', 'role', 'is_active', 'created_at')
-    list_filter = ('role', 'is_active', 'created_at')
+    list_display = ('username', 'email', 'role', 'region', 'is_active', 'created_at')
+    list_filter = ('role', 'region', 'is_active', 'created_at')
     search_fields = ('username', 'email', 'phone')
 
 
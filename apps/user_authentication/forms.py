@@ -47,8 +47,7 @@ class SignUpForm(UserCreationForm):
         user.phone = self.cleaned_data['phone']
         user.address = self.cleaned_data['address']
         user.security_question = self.cleaned_data['security_question']
-        # Store hashed security answer
-        user.security_answer = self.cleaned_data['security_answer'].lower().strip()
+        user.set_security_answer(self.cleaned_data['security_answer'])
         if commit:
             user.save()
         return user
@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from apps.user_authentication.models import CustomUser
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure sustained logins/sec for one worker through the real login view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10.0, help='How long to keep logging in')
+        parser.add_argument('--users', type=int, default=50, help='Distinct accounts to rotate through')
+
+    def handle(self, *args, **options):
+        password = 'benchmark-pass-123'
+        hasher = get_hasher()
+        latencies = []
+
+        # Everything runs in one transaction that is rolled back, leaving no users behind
+        try:
+            with transaction.atomic():
+                encoded = make_password(password)
+                users = CustomUser.objects.bulk_create([
+                    CustomUser(username=f'bench_login_{i}', password=encoded, role='staff')
+                    for i in range(options['users'])
+                ])
+                client = Client(SERVER_NAME='localhost')
+                url = reverse('login')
+                deadline = time.perf_counter() + options['seconds']
+                i = 0
+                while time.perf_counter() < deadline:
+                    user = users[i % len(users)]
+                    started = time.perf_counter()
+                    response = client.post(url, {'username': user.username, 'password': password})
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 302:
+                        raise RuntimeError(f'Login failed with status {response.status_code}')
+                    client.cookies.clear()
+                    i += 1
+                raise Rollback
+        except Rollback:
+            pass
+
+        total = sum(latencies)
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+        self.stdout.write(f'Hasher:        {hasher.algorithm} ({settings.PASSWORD_HASHERS[0]})')
+        if hasattr(hasher, 'iterations'):
+            self.stdout.write(f'Iterations:    {hasher.iterations}')
+        self.stdout.write(f'Logins:        {len(latencies)} in {total:.2f}s')
+        self.stdout.write(self.style.SUCCESS(f'Logins/sec:    {len(latencies) / total:.1f} per worker'))
+        self.stdout.write(f'Latency p50:   {statistics.median(latencies) * 1000:.1f} ms')
+        self.stdout.write(f'Latency p95:   {p95 * 1000:.1f} ms')
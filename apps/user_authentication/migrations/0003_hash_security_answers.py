@@ -0,0 +1,44 @@
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def _is_hashed(value):
+    try:
+        identify_hasher(value)
+    except ValueError:
+        return False
+    return True
+
+
+def hash_security_answers(apps, schema_editor):
+    """Hash plaintext answers in primary-key batches to keep memory bounded"""
+    CustomUser = apps.get_model("user_authentication", "CustomUser")
+    last_pk = 0
+    while True:
+        batch = list(
+            CustomUser.objects.filter(pk__gt=last_pk, security_answer__isnull=False)
+            .exclude(security_answer="")
+            .order_by("pk")
+            .only("pk", "security_answer")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        changed = []
+        for user in batch:
+            if not _is_hashed(user.security_answer):
+                user.security_answer = make_password(user.security_answer.lower().strip())
+                changed.append(user)
+        CustomUser.objects.bulk_update(changed, ["security_answer"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_authentication", "0002_customuser_security_answer_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(hash_security_answers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 4.2.7 on 2026-10-19 05:19
+
+import apps.user_authentication.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("user_authentication", "0003_hash_security_answers"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="auditlog",
+            options={"ordering": ["-timestamp", "-id"]},
+        ),
+        migrations.AlterField(
+            model_name="auditlog",
+            name="action",
+            field=models.CharField(
+                choices=[
+                    ("login", "Login"),
+                    ("logout", "Logout"),
+                    ("create_shift", "Create Shift"),
+                    ("update_shift", "Update Shift"),
+                    ("delete_shift", "Delete Shift"),
+                    ("volunteer", "Volunteer for Shift"),
+                    ("approve", "Approve Volunteer"),
+                    ("reject", "Reject Volunteer"),
+                    ("create_user", "Create User"),
+                    ("update_user", "Update User"),
+                    ("delete_user", "Delete User"),
+                    ("import_shifts", "Import Shifts"),
+                ],
+                max_length=50,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["-timestamp", "-id"], name="auditlog_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["user", "-timestamp", "-id"], name="auditlog_user_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["action", "-timestamp", "-id"], name="auditlog_action_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["ip_address", "-timestamp", "-id"], name="auditlog_ip_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                apps.user_authentication.models.DetailValue("shift_id"),
+                models.OrderBy(models.F("timestamp"), descending=True),
+                models.OrderBy(models.F("id"), descending=True),
+                name="auditlog_shift_id_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                apps.user_authentication.models.DetailValue("application_id"),
+                models.OrderBy(models.F("timestamp"), descending=True),
+                models.OrderBy(models.F("id"), descending=True),
+                name="auditlog_application_id_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-19 06:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shift_management", "0010_regions"),
+        ("user_authentication", "0004_auditlog_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="region",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="users",
+                to="shift_management.region",
+            ),
+        ),
+    ]
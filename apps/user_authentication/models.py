@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.hashers import make_password, check_password
 from django.utils import timezone
 
 class CustomUser(AbstractUser):
@@ -13,8 +14,11 @@ class CustomUser(AbstractUser):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='staff')
     phone = models.CharField(max_length=15, blank=True, null=True)
     address = models.TextField(blank=True, null=True)
+    # Region the user works in; None means company-wide (see helping_hand_core.tenancy)
+    region = models.ForeignKey('shift_management.Region', on_delete=models.PROTECT, null=True, blank=True,
+                               related_name='users')
     
-    # Security questions for password reset
+    # Security questions for password reset; the answer is stored hashed like a password
     security_question = models.CharField(max_length=255, blank=True, null=True)
     security_answer = models.CharField(max_length=255, blank=True, null=True)
    
@@ -37,6 +41,50 @@ class CustomUser(AbstractUser):
     def is_staff_member(self):
         return self.role == 'staff'
 
+    @staticmethod
+    def normalize_security_answer(raw_answer):
+        return (raw_answer or '').lower().strip()
+
+    def set_security_answer(self, raw_answer):
+        self.security_answer = make_password(self.normalize_security_answer(raw_answer))
+
+    def check_security_answer(self, raw_answer):
+        """Constant-time check of an answer; rehashes if the hasher policy changed"""
+        if not self.security_answer:
+            return False
+
+        def setter(raw):
+            self.security_answer = make_password(raw)
+            self.save(update_fields=['security_answer'])
+
+        return check_password(self.normalize_security_answer(raw_answer), self.security_answer, setter)
+
+
+class DetailValue(models.Func):
+    """
+    Text value of one top-level key of AuditLog.details.
+
+    The key is compiled into the SQL as a literal (Django's own key lookups
+    pass the JSON path as a parameter), so filters using this expression match
+    the expression indexes on AuditLog and can use them.
+    """
+    output_field = models.TextField()
+    template = "CAST(JSON_EXTRACT(%(expressions)s, '$.%(key)s') AS TEXT)"
+
+    def __init__(self, key):
+        if not key.isidentifier():
+            raise ValueError(f'Invalid details key: {key!r}')
+        super().__init__(models.F('details'), key=key)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template="(%(expressions)s ->> '%(key)s')", **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        # MySQL can't CAST to TEXT, and an index needs a bounded type
+        return self.as_sql(compiler, connection,
+                           template="CAST(JSON_UNQUOTE(JSON_EXTRACT(%(expressions)s, '$.%(key)s')) AS CHAR(255))",
+                           **extra_context)
+
 
 class AuditLog(models.Model):
     """Audit logging for security and compliance"""
@@ -52,8 +100,12 @@ class AuditLog(models.Model):
         ('create_user', 'Create User'),
         ('update_user', 'Update User'),
         ('delete_user', 'Delete User'),
+        ('import_shifts', 'Import Shifts'),
     ]
     
+    # details keys with an expression index
+    INDEXED_DETAIL_KEYS = ['shift_id', 'application_id']
+
     user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, related_name='audit_logs')
     action = models.CharField(max_length=50, choices=ACTION_CHOICES)
     description = models.TextField()
@@ -63,7 +115,18 @@ class AuditLog(models.Model):
     
     class Meta:
         app_label = 'user_authentication'
-        ordering = ['-timestamp']
+        # id breaks timestamp ties so keyset paging is stable
+        ordering = ['-timestamp', '-id']
+        indexes = [
+            models.Index(fields=['-timestamp', '-id'], name='auditlog_time_idx'),
+            models.Index(fields=['user', '-timestamp', '-id'], name='auditlog_user_time_idx'),
+            models.Index(fields=['action', '-timestamp', '-id'], name='auditlog_action_time_idx'),
+            models.Index(fields=['ip_address', '-timestamp', '-id'], name='auditlog_ip_time_idx'),
+            models.Index(DetailValue('shift_id'), models.F('timestamp').desc(), models.F('id').desc(),
+                         name='auditlog_shift_id_idx'),
+            models.Index(DetailValue('application_id'), models.F('timestamp').desc(), models.F('id').desc(),
+                         name='auditlog_application_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user} - {self.action} at {self.timestamp}"
@@ -0,0 +1,16 @@
+from .models import AuditLog
+
+
+def write_audit_log(user_id, action, description, ip_address, details=None):
+    AuditLog.objects.create(
+        user_id=user_id,
+        action=action,
+        description=description,
+        ip_address=ip_address,
+        details=details
+    )
+
+
+def write_audit_logs(rows):
+    """Insert many audit rows at once; rows are dicts of AuditLog fields"""
+    AuditLog.objects.bulk_create([AuditLog(**row) for row in rows])
@@ -1,5 +1,6 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
 User = get_user_model()
 
@@ -137,3 +138,72 @@ class AuthViewTestCase(TestCase):
         })
         # Should redirect after successful signup
         self.assertIn(response.status_code, [200, 302])
+
+
+class SecurityAnswerTestCase(TestCase):
+    """Test hashed security answers"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123',
+                                             role='staff', security_question='color')
+        self.user.set_security_answer('  Blue ')
+        self.user.save()
+
+    def test_answer_is_not_stored_in_plaintext(self):
+        """Test the stored answer is a hash, not the answer itself"""
+        self.assertNotIn('blue', self.user.security_answer.lower())
+        self.assertTrue(self.user.security_answer.startswith('pbkdf2_sha256$'))
+
+    def test_answer_check_normalizes_case_and_whitespace(self):
+        """Test answers are normalized the same way on save and on check"""
+        self.assertTrue(self.user.check_security_answer('BLUE'))
+        self.assertTrue(self.user.check_security_answer(' blue'))
+        self.assertFalse(self.user.check_security_answer('green'))
+
+    def test_reset_flow_accepts_correct_answer(self):
+        """Test the password reset question step verifies the hashed answer"""
+        self.client.post('/auth/password-reset/', {'username': 'testuser'})
+        response = self.client.post('/auth/password-reset/question/', {'security_answer': 'Blue'})
+        self.assertRedirects(response, '/auth/password-reset/confirm/', fetch_redirect_response=False)
+
+
+@override_settings(AUTH_THROTTLE_RATES={
+    'login': {'username': (3, 300), 'ip': (10, 60)},
+    'password_reset': {'username': (2, 900), 'ip': (10, 300)},
+})
+class AuthThrottleTestCase(TestCase):
+    """Test rate limiting of login and password reset"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser', password='testpass123', role='staff', security_question='color'
+        )
+        self.user.set_security_answer('blue')
+        self.user.save()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_login_throttled_after_repeated_failures(self):
+        """Test a username is locked out after too many failed logins"""
+        for _ in range(3):
+            response = self.client.post('/auth/login/', {'username': 'testuser', 'password': 'wrong'})
+            self.assertEqual(response.status_code, 200)
+        response = self.client.post('/auth/login/', {'username': 'testuser', 'password': 'testpass123'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_successful_logins_are_not_throttled(self):
+        """Test a login storm of valid credentials is never limited"""
+        for _ in range(12):
+            response = self.client.post('/auth/login/', {'username': 'testuser', 'password': 'testpass123'})
+            self.assertEqual(response.status_code, 302)
+            self.client.logout()
+
+    def test_security_answer_retries_are_throttled(self):
+        """Test wrong security answers are limited per user"""
+        self.client.post('/auth/password-reset/', {'username': 'testuser'})
+        for _ in range(2):
+            self.client.post('/auth/password-reset/question/', {'security_answer': 'red'})
+        response = self.client.post('/auth/password-reset/question/', {'security_answer': 'blue'})
+        self.assertEqual(response.status_code, 429)
@@ -0,0 +1,73 @@
+"""
+Cache-backed sliding-window rate limiting for authentication endpoints.
+
+Each (scope, key) pair keeps a counter per fixed window; the sliding count is
+the current window plus the previous window weighted by how much of it still
+overlaps. Only cache.add/incr/get_many are used, so counts stay consistent
+across workers when CACHES points at a shared backend.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# scope -> {key kind: (max attempts, window seconds)}
+DEFAULT_RATES = {
+    'login': {'username': (5, 300), 'ip': (100, 60)},
+    'password_reset': {'username': (5, 900), 'ip': (20, 300)},
+}
+
+
+def get_rates(scope):
+    return getattr(settings, 'AUTH_THROTTLE_RATES', DEFAULT_RATES).get(scope, {})
+
+
+def _cache_key(scope, kind, value, window, bucket):
+    digest = hashlib.sha256(str(value).lower().encode()).hexdigest()[:32]
+    return f'throttle:{scope}:{kind}:{digest}:{window}:{bucket}'
+
+
+def _sliding_count(scope, kind, value, window, now):
+    bucket = int(now // window)
+    current_key = _cache_key(scope, kind, value, window, bucket)
+    previous_key = _cache_key(scope, kind, value, window, bucket - 1)
+    counts = cache.get_many([current_key, previous_key])
+    overlap = 1 - (now % window) / window
+    return counts.get(current_key, 0) + counts.get(previous_key, 0) * overlap
+
+
+def is_throttled(scope, **keys):
+    """True if any of the given keys (e.g. username=..., ip=...) is over its limit"""
+    now = time.time()
+    for kind, (limit, window) in get_rates(scope).items():
+        value = keys.get(kind)
+        if value and _sliding_count(scope, kind, value, window, now) >= limit:
+            return True
+    return False
+
+
+def register_attempt(scope, **keys):
+    """Count one attempt against every given key"""
+    now = time.time()
+    for kind, (limit, window) in get_rates(scope).items():
+        value = keys.get(kind)
+        if not value:
+            continue
+        key = _cache_key(scope, kind, value, window, int(now // window))
+        # Keep the bucket around for the following window, which still reads it
+        cache.add(key, 0, timeout=window * 2)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=window * 2)
+
+
+def reset(scope, **keys):
+    """Forget attempts for the given keys (e.g. after a successful login)"""
+    now = time.time()
+    for kind, (limit, window) in get_rates(scope).items():
+        value = keys.get(kind)
+        if value:
+            bucket = int(now // window)
+            cache.delete_many([_cache_key(scope, kind, value, window, b) for b in (bucket, bucket - 1)])
@@ -1,10 +1,15 @@
 from django.shortcuts import render, redirect
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from .forms import SignUpForm, LoginForm, PasswordResetRequestForm, SecurityQuestionForm, SetNewPasswordForm, SECURITY_QUESTIONS
-from .models import CustomUser, AuditLog
+from helping_hand_core.tasks import enqueue
+from .models import CustomUser
+from . import throttling
+from .tasks import write_audit_log
+
+THROTTLED_MESSAGE = 'Too many attempts. Please wait a few minutes and try again.'
 
 def get_client_ip(request):
     """Get client IP address from request"""
@@ -16,14 +21,9 @@ def get_client_ip(request):
     return ip
 
 def log_audit(user, action, description, request, details=None):
-    """Helper function to log audit events"""
-    AuditLog.objects.create(
-        user=user,
-        action=action,
-        description=description,
-        ip_address=get_client_ip(request),
-        details=details
-    )
+    """Helper function to log audit events (written by a background task)"""
+    enqueue(write_audit_log, user.id if user else None, action, description,
+            get_client_ip(request), details)
 
 def signup_view(request):
     """User registration view"""
@@ -48,16 +48,22 @@ def login_view(request):
         return redirect('dashboard')
     
     if request.method == 'POST':
+        username = request.POST.get('username', '')
+        ip = get_client_ip(request)
+        if throttling.is_throttled('login', username=username, ip=ip):
+            messages.error(request, THROTTLED_MESSAGE)
+            return render(request, 'user_authentication/login.html', {'form': LoginForm(request)}, status=429)
+
         form = LoginForm(request, data=request.POST)
+        # AuthenticationForm.clean() already authenticated; don't hash the password twice
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                log_audit(user, 'login', f'User logged in: {user.username}', request)
-                messages.success(request, f'Welcome back, {user.first_name}!')
-                return redirect('dashboard')
+            user = form.get_user()
+            login(request, user)
+            throttling.reset('login', username=username)
+            log_audit(user, 'login', f'User logged in: {user.username}', request)
+            messages.success(request, f'Welcome back, {user.first_name}!')
+            return redirect('dashboard')
+        throttling.register_attempt('login', username=username, ip=ip)
     else:
         form = LoginForm()
     
@@ -75,6 +81,13 @@ def logout_view(request):
 def password_reset_request(request):
     """Step 1: Request password reset by username"""
     if request.method == 'POST':
+        ip = get_client_ip(request)
+        if throttling.is_throttled('password_reset', ip=ip):
+            messages.error(request, THROTTLED_MESSAGE)
+            return render(request, 'user_authentication/password_reset_request.html',
+                          {'form': PasswordResetRequestForm()}, status=429)
+        throttling.register_attempt('password_reset', ip=ip)
+
         form = PasswordResetRequestForm(request.POST)
         if form.is_valid():
             username = form.cleaned_data['username']
@@ -104,19 +117,27 @@ def password_reset_question(request):
         messages.error(request, 'Invalid session.')
         return redirect('password_reset_request')
     
+    question_dict = dict(SECURITY_QUESTIONS)
     if request.method == 'POST':
+        ip = get_client_ip(request)
+        if throttling.is_throttled('password_reset', username=user.username, ip=ip):
+            messages.error(request, THROTTLED_MESSAGE)
+            return render(request, 'user_authentication/password_reset_question.html', {
+                'form': SecurityQuestionForm(),
+                'security_question': question_dict.get(user.security_question, '')
+            }, status=429)
+
         form = SecurityQuestionForm(request.POST)
         if form.is_valid():
-            answer = form.cleaned_data['security_answer'].lower().strip()
-            if answer == user.security_answer:
+            if user.check_security_answer(form.cleaned_data['security_answer']):
                 request.session['reset_verified'] = True
                 return redirect('password_reset_confirm')
             else:
+                throttling.register_attempt('password_reset', username=user.username, ip=ip)
                 messages.error(request, 'Incorrect answer. Please try again.')
     else:
         form = SecurityQuestionForm()
     
-    question_dict = dict(SECURITY_QUESTIONS)
     return render(request, 'user_authentication/password_reset_question.html', {
         'form': form,
         'security_question': question_dict.get(user.security_question, '')
@@ -155,4 +176,6 @@ def password_reset_confirm(request):
 @login_required
 def profile_view(request):
     """User profile view"""
-    return render(request, 'user_authentication/profile.html', {'user': request.user})
+    # One primary-key read of the maintained counters
+    stats = getattr(request.user, 'volunteer_stats', None) if request.user.is_staff_member() else None
+    return render(request, 'user_authentication/profile.html', {'user': request.user, 'volunteer_stats': stats})
@@ -3,3 +3,5 @@ from django.conf import settings
 
 def pytest_configure():
     settings.DEBUG = False
+    # Tests run side effects in-process; they don't start a worker
+    settings.TASKS_MODE = 'inline'
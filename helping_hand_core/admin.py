@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['func', 'status', 'attempts', 'run_at', 'created_at', 'finished_at']
+    list_filter = ['status', 'func']
+    search_fields = ['func', 'last_error']
+    readonly_fields = ['func', 'args', 'kwargs', 'attempts', 'created_at', 'finished_at', 'last_error']
+    ordering = ['-created_at']
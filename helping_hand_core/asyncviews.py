@@ -0,0 +1,40 @@
+"""
+Helpers for the async (ASGI) view variants.
+
+Django 4.2's login_required and render() are synchronous, and request.user is
+loaded lazily with blocking queries, so async views go through these wrappers
+instead of calling them on the event loop.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+
+def _load_user(request):
+    """Resolve the lazy request.user (session + user queries)"""
+    user = request.user
+    user.is_authenticated  # forces SimpleLazyObject to load
+    return getattr(user, '_wrapped', user)
+
+
+def async_login_required(view):
+    """login_required for async views (Django 4.2's decorator only wraps sync views)"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await sync_to_async(_load_user)(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def alist(queryset):
+    """Evaluate a queryset with the async ORM"""
+    return [obj async for obj in queryset]
+
+
+# Templates call model methods that may query, so rendering runs in a thread
+arender = sync_to_async(render)
@@ -0,0 +1,13 @@
+"""
+Load-testing harness for a running server (runserver or gunicorn).
+
+    python manage.py seed_load_data --scale 2
+    python manage.py runserver --noreload        # or gunicorn, in another shell
+    python manage.py load_test --scenario weekend_peak --users 50 --duration 120 --output peak.json
+
+seed.py generates the data, scenarios.py holds the user flows and runner,
+client.py is the asyncio HTTP client, and report.py builds the JSON
+summary (throughput, error rate and latency percentiles per endpoint).
+load_test reads the seeded users and shifts from the database, so point it
+at the same DATABASES as the server.
+"""
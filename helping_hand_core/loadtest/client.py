@@ -0,0 +1,151 @@
+"""
+A small asyncio HTTP/1.1 client for the load tester.
+
+One client is one browser: a keep-alive connection, a cookie jar, and the
+CSRF token from the csrftoken cookie. Redirects are not followed, so
+scenarios can check the redirect a form post answers with. It only speaks
+plain HTTP, which is all runserver and a local gunicorn need; keeping it on
+the standard library means the harness has no dependencies.
+"""
+import asyncio
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+class HTTPError(Exception):
+    """A request that failed below HTTP: connect error, timeout, malformed response"""
+
+
+class Response:
+    def __init__(self, status, headers, body, elapsed):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', 'replace')
+
+
+class Client:
+    def __init__(self, base_url, timeout=30.0, headers=None):
+        parts = urlsplit(base_url)
+        if parts.scheme != 'http':
+            raise ValueError('Only http:// base URLs are supported')
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.cookies = {}
+        self._reader = self._writer = None
+
+    def reset(self):
+        """Forget cookies, as a new browser would"""
+        self.cookies.clear()
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def get(self, path):
+        return await self.request('GET', path)
+
+    async def post(self, path, data):
+        """POST form ``data`` (a dict or list of pairs) with the CSRF token added"""
+        pairs = list(data.items()) if isinstance(data, dict) else list(data)
+        token = self.cookies.get('csrftoken', '')
+        body = urlencode([('csrfmiddlewaretoken', token), *pairs]).encode()
+        return await self.request('POST', path, body, {
+            'Content-Type': 'application/x-www-form-urlencoded', 'X-CSRFToken': token,
+        })
+
+    async def request(self, method, path, body=b'', headers=None):
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self._exchange(method, path, body, headers or {}), self.timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise HTTPError(f'timed out after {self.timeout:.0f}s')
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            await self.close()
+            raise HTTPError(str(e) or type(e).__name__)
+        response.elapsed = time.perf_counter() - started
+        return response
+
+    async def _exchange(self, method, path, body, headers):
+        # A keep-alive connection the server has since closed fails on first use; retry once on a fresh one
+        for attempt in (1, 2):
+            reused = self._writer is not None
+            if not reused:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self._writer.write(self._head(method, path, body, headers) + body)
+                await self._writer.drain()
+                return await self._read_response(method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if not reused or attempt == 2:
+                    raise
+
+    def _head(self, method, path, body, headers):
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host_header}', 'Connection: keep-alive']
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{name}={value}' for name, value in self.cookies.items()))
+        if body or method == 'POST':
+            lines.append(f'Content-Length: {len(body)}')
+        lines.extend(f'{name}: {value}' for name, value in {**self.headers, **headers}.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def _read_response(self, method):
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split(b' ', 2)[1])
+        headers = {}
+        while True:
+            line = await self._reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                self._store_cookie(value)
+            headers[name] = value
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+        elif 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self._reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close' or status_line.startswith(b'HTTP/1.0'):
+            await self.close()
+        return Response(status, headers, body, 0.0)
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if size == 0:
+                while await self._reader.readuntil(b'\r\n') != b'\r\n':
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self._reader.readexactly(size))
+            await self._reader.readexactly(2)
+
+    def _store_cookie(self, header):
+        name, _, rest = header.partition('=')
+        value, _, attributes = rest.partition(';')
+        attributes = attributes.lower()
+        if not value or 'max-age=0' in attributes or 'expires=thu, 01 jan 1970' in attributes:
+            self.cookies.pop(name.strip(), None)
+        else:
+            self.cookies[name.strip()] = value.strip()
@@ -0,0 +1,96 @@
+"""
+Per-endpoint results of a load test run, and the JSON summary compared across builds.
+"""
+import json
+import math
+import platform
+import subprocess
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    """Latencies and outcomes per endpoint label"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def record(self, endpoint, seconds, error=None):
+        self.latencies[endpoint].append(seconds)
+        if error:
+            self.errors[endpoint][error] += 1
+
+    def _stats(self, latencies, errors, duration):
+        latencies = sorted(latencies)
+        failed = sum(errors.values())
+        stats = {
+            'requests': len(latencies),
+            'errors': failed,
+            'error_rate': round(failed / len(latencies), 4) if latencies else 0.0,
+            'throughput_rps': round(len(latencies) / duration, 2) if duration else 0.0,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                **{f'p{pct}': round(percentile(latencies, pct) * 1000, 1) if latencies else None
+                   for pct in PERCENTILES},
+                'max': round(latencies[-1] * 1000, 1) if latencies else None,
+            },
+        }
+        if errors:
+            stats['error_kinds'] = dict(errors.most_common(5))
+        return stats
+
+    def summary(self, duration, **run):
+        """Machine-readable results: run settings, per-endpoint stats and a total"""
+        total_errors = Counter()
+        for errors in self.errors.values():
+            total_errors.update(errors)
+        return {
+            'started_at': run.pop('started_at', datetime.now(timezone.utc).isoformat()),
+            'build': _build_id(),
+            'host': platform.node(),
+            'duration_s': round(duration, 2),
+            'run': run,
+            'endpoints': {endpoint: self._stats(latencies, self.errors[endpoint], duration)
+                          for endpoint, latencies in sorted(self.latencies.items())},
+            'total': self._stats([s for latencies in self.latencies.values() for s in latencies],
+                                 total_errors, duration),
+        }
+
+
+def _build_id():
+    """Current git commit, so summaries from different builds can be told apart"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              timeout=5, check=True).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def format_table(summary):
+    """Human-readable version of a summary, one line per endpoint"""
+    lines = [f'{"endpoint":<20} {"reqs":>7} {"rps":>8} {"err%":>6} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8}']
+    rows = list(summary['endpoints'].items()) + [('TOTAL', summary['total'])]
+    for endpoint, stats in rows:
+        latency = stats['latency_ms']
+        timings = ' '.join(f'{latency[key] if latency[key] is not None else "-":>8}'
+                           for key in ('p50', 'p95', 'p99', 'max'))
+        lines.append(f'{endpoint:<20} {stats["requests"]:>7} {stats["throughput_rps"]:>8.1f} '
+                     f'{stats["error_rate"] * 100:>5.1f}% {timings}')
+    return '\n'.join(lines)
+
+
+def write_summary(summary, path):
+    with open(path, 'w') as fileobj:
+        json.dump(summary, fileobj, indent=2)
+        fileobj.write('\n')
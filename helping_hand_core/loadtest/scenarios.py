@@ -0,0 +1,161 @@
+"""
+Load-test scenarios and the runner that plays them.
+
+A virtual user is one simulated person with their own Client. It repeats
+one scenario until the run ends, pausing for ``think`` seconds (randomised
+by +/-50%) between iterations. Users start evenly spread over the ramp-up
+period. Every request is recorded under an endpoint label. A request
+counts as failed when the server answers with a status the flow does not
+expect: an error page, a throttle, or a bounce to the login page.
+
+Scenarios follow what the app sees on a busy weekend morning:
+
+* login_storm     - a fresh browser opens the login page, signs in and
+                    lands on dashboard_view, over and over.
+* staff_browse    - a signed-in staff member lists shifts with the usual
+                    filters, opens a few and sometimes volunteers.
+* manager_approve - a signed-in manager opens the pending queue and
+                    bulk-approves up to ten applications from it.
+* weekend_peak    - all three at once, in WEEKEND_PEAK proportions.
+
+Each virtual user sends its own X-Forwarded-For address, like staff
+signing in from many stores. The per-IP login throttle then measures
+logins instead of rejecting them.
+"""
+import asyncio
+import random
+import re
+import time
+
+from .client import Client, HTTPError
+from .report import Recorder
+
+WEEKEND_PEAK = [('staff_browse', 0.75), ('login_storm', 0.15), ('manager_approve', 0.10)]
+
+LIST_FILTERS = ['', '', '?role=cashier', '?role=stocker', '?city=Bengaluru', '?q=cover']
+VOLUNTEER_CHANCE = 0.25
+BULK_APPROVE_MAX = 10
+
+APPLICATION_ID_RE = re.compile(r'name="application_ids"\s+value="(\d+)"')
+
+
+class VirtualUser:
+    def __init__(self, number, base_url, recorder, context, password, timeout, rng):
+        self.number = number
+        self.client = Client(base_url, timeout=timeout, headers={
+            'X-Forwarded-For': f'10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}',
+            'User-Agent': 'helping-hand-loadtest',
+        })
+        self.recorder = recorder
+        self.context = context
+        self.password = password
+        self.rng = rng
+        self.signed_in = False
+
+    async def call(self, endpoint, method, path, data=None, expect=(200,)):
+        """Make one request and record it; returns the response, or None if the request itself failed"""
+        started = time.perf_counter()
+        try:
+            response = await (self.client.get(path) if method == 'GET' else self.client.post(path, data or {}))
+        except HTTPError as e:
+            self.recorder.record(endpoint, time.perf_counter() - started, error=str(e)[:80])
+            return None
+        error = None
+        if response.status not in expect:
+            error = f'HTTP {response.status}'
+        elif response.status == 302 and response.headers.get('location', '').startswith('/auth/login/'):
+            error = 'redirected to login'
+            self.signed_in = False
+        self.recorder.record(endpoint, response.elapsed, error=error)
+        return None if error else response
+
+    async def login(self, username):
+        self.client.reset()
+        if await self.call('login_page', 'GET', '/auth/login/') is None:
+            return False
+        response = await self.call('login_submit', 'POST', '/auth/login/',
+                                   {'username': username, 'password': self.password}, expect=(302,))
+        return response is not None
+
+
+async def login_storm(user):
+    staff = user.context['staff']
+    username, _ = staff[user.rng.randrange(len(staff))]
+    if await user.login(username):
+        await user.call('dashboard', 'GET', '/dashboard/')
+
+
+async def staff_browse(user):
+    username, region_id = user.context['staff'][user.number % len(user.context['staff'])]
+    if not user.signed_in:
+        user.signed_in = await user.login(username)
+        if not user.signed_in:
+            return
+    await user.call('shift_list', 'GET', '/shifts/' + user.rng.choice(LIST_FILTERS))
+    shift_ids = user.context['shifts'].get(region_id)
+    if not shift_ids:
+        return
+    shift_id = user.rng.choice(shift_ids)
+    await user.call('shift_detail', 'GET', f'/shifts/{shift_id}/')
+    if user.rng.random() < VOLUNTEER_CHANCE:
+        await user.call('volunteer', 'GET', f'/shifts/{shift_id}/volunteer/', expect=(302,))
+
+
+async def manager_approve(user):
+    managers = user.context['managers']
+    if not user.signed_in:
+        user.signed_in = await user.login(managers[user.number % len(managers)])
+        if not user.signed_in:
+            return
+    response = await user.call('manager_dashboard', 'GET', '/shifts/manager/')
+    if response is None:
+        return
+    ids = APPLICATION_ID_RE.findall(response.text)[:BULK_APPROVE_MAX]
+    if ids:
+        await user.call('bulk_approve', 'POST', '/shifts/manager/applications/bulk-review/',
+                        [('decision', 'approve'), *[('application_ids', i) for i in ids]], expect=(302,))
+
+
+SCENARIOS = {
+    'login_storm': login_storm,
+    'staff_browse': staff_browse,
+    'manager_approve': manager_approve,
+}
+
+
+def assign_scenarios(scenario, users, rng):
+    """Scenario name for each virtual user; weekend_peak splits them by WEEKEND_PEAK, shuffled"""
+    if scenario != 'weekend_peak':
+        return [scenario] * users
+    names = []
+    for name, share in WEEKEND_PEAK:
+        names += [name] * round(share * users)
+    names = (names + [WEEKEND_PEAK[0][0]] * users)[:users]
+    rng.shuffle(names)
+    return names
+
+
+async def run(base_url, scenario, context, users=20, duration=60.0, ramp_up=5.0, think=1.0, timeout=30.0,
+              password='', random_seed=None):
+    """Play ``scenario`` against ``base_url``; returns (recorder, elapsed seconds, scenario counts)"""
+    rng = random.Random(random_seed)
+    recorder = Recorder()
+    names = assign_scenarios(scenario, users, rng)
+    seeds = [rng.random() for _ in names]
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def play(number, name):
+        await asyncio.sleep(ramp_up * number / users)
+        user = VirtualUser(number, base_url, recorder, context, password, timeout, random.Random(seeds[number]))
+        try:
+            while time.perf_counter() < deadline:
+                await SCENARIOS[name](user)
+                if think:
+                    await asyncio.sleep(min(user.rng.uniform(think / 2, think * 1.5),
+                                            max(deadline - time.perf_counter(), 0)))
+        finally:
+            await user.client.close()
+
+    await asyncio.gather(*(play(number, name) for number, name in enumerate(names)))
+    return recorder, time.perf_counter() - started, {name: names.count(name) for name in sorted(set(names))}
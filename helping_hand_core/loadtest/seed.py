@@ -0,0 +1,133 @@
+"""
+Scalable fixture data for load tests.
+
+seed(scale) builds a weekend-peak data set that grows linearly with
+``scale``. Per unit it creates one region with 10 stores, 10 managers and
+500 staff. It also posts 400 upcoming shifts, weighted three to one towards
+weekends, and gives each four pending applications for managers to
+approve. Every row is written with bulk_create, so scale 20 (10k staff,
+8k shifts) takes seconds. The search index and the copied application
+columns are filled in the same way the importer fills them.
+
+Users are named load_staff_<n> and load_manager_<n> and share one
+password; stores and regions are prefixed "Load". flush() removes it all
+again.
+"""
+import random
+from datetime import date, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from apps.shift_management.models import Region, Shift, ShiftVolunteer, Store
+from apps.shift_management.search import index_shifts
+from apps.user_authentication.models import CustomUser
+
+USERNAME_PREFIX = 'load_'
+DEFAULT_PASSWORD = 'loadtest-pass'
+
+PER_SCALE = {'regions': 1, 'stores': 10, 'managers': 10, 'staff': 500, 'shifts': 400}
+PENDING_PER_SHIFT = 4
+WEEKEND_WEIGHT = 3
+BATCH_SIZE = 2000
+
+CITIES = [('Bengaluru', 'KA', '560001'), ('Mysuru', 'KA', '570001'), ('Chennai', 'TN', '600001'),
+          ('Hyderabad', 'TS', '500001'), ('Pune', 'MH', '411001'), ('Mumbai', 'MH', '400001')]
+SHIFT_TIMES = [(time(7, 0), time(11, 0)), (time(9, 0), time(13, 0)), (time(12, 0), time(16, 0)),
+               (time(16, 0), time(20, 0)), (time(18, 0), time(22, 0))]
+
+
+def _round_robin(items, count):
+    return [items[i % len(items)] for i in range(count)]
+
+
+def seed(scale=1, password=DEFAULT_PASSWORD, days=14, random_seed=None):
+    """Create the load-test data set; returns {kind: rows created}"""
+    rng = random.Random(random_seed)
+    counts = {kind: per_unit * scale for kind, per_unit in PER_SCALE.items()}
+    hashed = make_password(password)
+    today = date.today()
+    dates = [today + timedelta(days=n) for n in range(1, days + 1)]
+    date_weights = [WEEKEND_WEIGHT if day.weekday() >= 5 else 1 for day in dates]
+
+    with transaction.atomic():
+        first = Region.objects.filter(code__startswith='load-').count()
+        regions = Region.objects.bulk_create([Region(name=f'Load Region {n}', code=f'load-{n}')
+                                              for n in range(first, first + counts['regions'])])
+
+        first = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX + 'manager_').count()
+        managers = CustomUser.objects.bulk_create([
+            CustomUser(username=f'{USERNAME_PREFIX}manager_{n}', email=f'{USERNAME_PREFIX}manager_{n}@example.com',
+                       first_name='Manager', last_name=str(n), password=hashed, role='manager', region=region)
+            for n, region in enumerate(_round_robin(regions, counts['managers']), start=first)
+        ], batch_size=BATCH_SIZE)
+
+        first = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX + 'staff_').count()
+        staff = CustomUser.objects.bulk_create([
+            CustomUser(username=f'{USERNAME_PREFIX}staff_{n}', email=f'{USERNAME_PREFIX}staff_{n}@example.com',
+                       first_name='Staff', last_name=str(n), password=hashed, role='staff', region=region)
+            for n, region in enumerate(_round_robin(regions, counts['staff']), start=first)
+        ], batch_size=BATCH_SIZE)
+        staff_by_region = {region.id: [] for region in regions}
+        for user in staff:
+            staff_by_region[user.region_id].append(user.id)
+
+        managers_by_region = {region.id: [m for m in managers if m.region_id == region.id] for region in regions}
+        stores = []
+        for n, region in enumerate(_round_robin(regions, counts['stores'])):
+            city, state, zip_code = CITIES[n % len(CITIES)]
+            region_managers = managers_by_region[region.id]
+            stores.append(Store(name=f'Load Store {region.code} {n}', address=f'{n} Market Road', city=city,
+                                state=state, zip_code=zip_code, phone='0000000000', region=region,
+                                manager=region_managers[n // len(regions) % len(region_managers)]))
+        stores = Store.objects.bulk_create(stores, batch_size=BATCH_SIZE)
+
+        roles = [role for role, _ in Shift.ROLE_CHOICES]
+        shifts = []
+        for store in (rng.choice(stores) for _ in range(counts['shifts'])):
+            role = rng.choice(roles)
+            start_time, end_time = rng.choice(SHIFT_TIMES)
+            shifts.append(Shift(
+                store=store, manager_id=store.manager_id, region_id=store.region_id,
+                title=f'{role.title()} cover', description='Weekend peak cover',
+                role_required=role, shift_date=rng.choices(dates, date_weights)[0],
+                start_time=start_time, end_time=end_time, slots_available=rng.randint(2, 8),
+            ))
+        shifts = Shift.objects.bulk_create(shifts, batch_size=BATCH_SIZE)
+        index_shifts([shift.id for shift in shifts])
+
+        applications = []
+        for shift in shifts:
+            pool = staff_by_region[shift.region_id]
+            for user_id in rng.sample(pool, min(PENDING_PER_SHIFT, len(pool))):
+                applications.append(ShiftVolunteer(shift=shift, volunteer_id=user_id, status='pending', **{
+                    copy: getattr(shift, source) for copy, source in ShiftVolunteer.SHIFT_COPIES.items()
+                }))
+        ShiftVolunteer.objects.bulk_create(applications, batch_size=BATCH_SIZE)
+
+    counts['applications'] = len(applications)
+    return counts
+
+
+def flush():
+    """Delete everything seed() created; returns the number of rows deleted"""
+    with transaction.atomic():
+        deleted, _ = Store.objects.filter(name__startswith='Load Store ').delete()
+        deleted += CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).delete()[0]
+        deleted += Region.objects.filter(code__startswith='load-').delete()[0]
+    return deleted
+
+
+def fixture_context():
+    """What the load test needs to know about the seeded data: users and upcoming shifts per region"""
+    users = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX, is_active=True)
+    upcoming = Shift.objects.filter(store__name__startswith='Load Store ', shift_date__gt=date.today())
+    shifts = {}
+    for shift_id, region_id in upcoming.filter(status='open').values_list('id', 'region_id'):
+        shifts.setdefault(region_id, []).append(shift_id)
+    return {
+        'staff': list(users.filter(role='staff').order_by('id').values_list('username', 'region_id')),
+        # Managers with upcoming shifts, i.e. a queue to approve
+        'managers': list(users.filter(role='manager', id__in=upcoming.values('manager_id')).order_by('id')
+                         .values_list('username', flat=True)),
+        'shifts': shifts,
+    }
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncRequestFactory, RequestFactory
+from apps.dashboard_reports import views as dashboard_views
+from apps.notifications import views as notification_views
+from apps.shift_management import views as shift_views
+from apps.user_authentication.models import CustomUser
+
+# (label, path, sync view, async view)
+VIEWS = [
+    ('shift list', '/shifts/', shift_views.shift_list_view, shift_views.shift_list_view_async),
+    ('dashboard', '/dashboard/', dashboard_views.dashboard_view, dashboard_views.dashboard_view_async),
+    ('reports', '/dashboard/reports/', dashboard_views.reports_view, dashboard_views.reports_view_async),
+    ('notifications', '/notifications/', notification_views.notification_list,
+     notification_views.notification_list_async),
+]
+
+
+class Command(BaseCommand):
+    help = ('Compare requests/sec of the sync (WSGI) and async (ASGI) read views on the current data. '
+            'Views are called directly, so server and middleware overhead is excluded.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5.0, help='How long to run each view per mode')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Worker threads (sync) or concurrent tasks (async)')
+        parser.add_argument('--username', help='User to render the pages as (default: first manager)')
+
+    def handle(self, *args, **options):
+        if options['username']:
+            user = CustomUser.objects.filter(username=options['username']).first()
+        else:
+            user = CustomUser.objects.filter(role__in=['manager', 'admin']).order_by('pk').first()
+        if user is None:
+            raise CommandError('No user to benchmark as; pass --username')
+
+        seconds, concurrency = options['seconds'], options['concurrency']
+        self.stdout.write(f'User: {user.username} ({user.role}), {concurrency} concurrent, {seconds:.0f}s per run')
+        for label, path, sync_view, async_view in VIEWS:
+            sync_count = self._run_sync(sync_view, path, user, seconds, concurrency)
+            async_count = self._run_async(async_view, path, user, seconds, concurrency)
+            self.stdout.write(
+                f'{label:<14} WSGI {sync_count / seconds:8.1f} req/s   '
+                f'ASGI {async_count / seconds:8.1f} req/s   '
+                f'({async_count / max(sync_count, 1):.2f}x)'
+            )
+
+    def _run_sync(self, view, path, user, seconds, concurrency):
+        factory = RequestFactory()
+        deadline = time.perf_counter() + seconds
+
+        def worker():
+            count = 0
+            try:
+                while time.perf_counter() < deadline:
+                    request = factory.get(path)
+                    request.user = user
+                    self._check(view(request))
+                    count += 1
+            finally:
+                connection.close()
+            return count
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return sum(executor.map(lambda _: worker(), range(concurrency)))
+
+    def _run_async(self, view, path, user, seconds, concurrency):
+        factory = AsyncRequestFactory()
+
+        async def worker(deadline):
+            count = 0
+            while time.perf_counter() < deadline:
+                request = factory.get(path)
+                request.user = user
+                self._check(await view(request))
+                count += 1
+            return count
+
+        async def run():
+            deadline = time.perf_counter() + seconds
+            return sum(await asyncio.gather(*(worker(deadline) for _ in range(concurrency))))
+
+        return asyncio.run(run())
+
+    def _check(self, response):
+        if response.status_code != 200:
+            raise CommandError(f'View returned {response.status_code}')
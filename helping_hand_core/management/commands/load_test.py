@@ -0,0 +1,68 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from helping_hand_core.loadtest.client import Client, HTTPError
+from helping_hand_core.loadtest.report import format_table, write_summary
+from helping_hand_core.loadtest.scenarios import SCENARIOS, run
+from helping_hand_core.loadtest.seed import DEFAULT_PASSWORD, fixture_context
+
+
+class Command(BaseCommand):
+    help = ('Drive a running server with simulated weekend-peak traffic and report throughput, error rate '
+            'and tail latency per endpoint. Seed the data first with seed_load_data.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to test (http only)')
+        parser.add_argument('--scenario', default='weekend_peak', choices=[*SCENARIOS, 'weekend_peak'])
+        parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+        parser.add_argument('--duration', type=float, default=60.0, help='Seconds to run, ramp-up included')
+        parser.add_argument('--ramp-up', type=float, default=5.0, help='Seconds over which users start')
+        parser.add_argument('--think', type=float, default=1.0,
+                            help='Mean pause between a user\'s iterations in seconds; 0 for closed-loop load')
+        parser.add_argument('--timeout', type=float, default=30.0, help='Per-request timeout in seconds')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password the data was seeded with')
+        parser.add_argument('--seed', type=int, help='Random seed, for repeatable runs')
+        parser.add_argument('--output', help='Write the JSON summary to this file')
+        parser.add_argument('--json', action='store_true', help='Print the JSON summary instead of a table')
+        parser.add_argument('--max-error-rate', type=float,
+                            help='Exit with an error if the overall error rate is above this fraction')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['duration'] <= 0:
+            raise CommandError('--users and --duration must be positive')
+        context = fixture_context()
+        if not context['staff'] or not context['managers']:
+            raise CommandError('No load-test users found; run `manage.py seed_load_data` first')
+        try:
+            asyncio.run(self._ping(options['base_url'], options['timeout']))
+        except (HTTPError, ValueError) as e:
+            raise CommandError(f'Can\'t reach {options["base_url"]}: {e}')
+
+        started_at = datetime.now(timezone.utc).isoformat()
+        recorder, elapsed, mix = asyncio.run(run(
+            options['base_url'], options['scenario'], context, users=options['users'],
+            duration=options['duration'], ramp_up=min(options['ramp_up'], options['duration']),
+            think=options['think'], timeout=options['timeout'], password=options['password'],
+            random_seed=options['seed'],
+        ))
+        summary = recorder.summary(
+            elapsed, started_at=started_at, base_url=options['base_url'], scenario=options['scenario'],
+            users=options['users'], mix=mix, ramp_up_s=options['ramp_up'], think_s=options['think'],
+            seed=options['seed'],
+        )
+        if options['output']:
+            write_summary(summary, options['output'])
+        self.stdout.write(json.dumps(summary, indent=2) if options['json'] else format_table(summary))
+
+        limit = options['max_error_rate']
+        if limit is not None and summary['total']['error_rate'] > limit:
+            raise CommandError(f'Error rate {summary["total"]["error_rate"]:.2%} is above {limit:.2%}')
+
+    async def _ping(self, base_url, timeout):
+        client = Client(base_url, timeout=timeout)
+        try:
+            await client.get('/auth/login/')
+        finally:
+            await client.close()
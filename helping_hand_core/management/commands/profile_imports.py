@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What each boot target imports, run in a fresh interpreter under -X importtime
+TARGETS = {
+    'setup': 'import django; django.setup()',
+    'urls': 'import django; django.setup(); from django.urls import get_resolver; get_resolver().url_patterns',
+    'wsgi': 'import helping_hand_core.wsgi',
+    'worker': ('import django; django.setup(); '
+               'from helping_hand_core.management.commands import run_worker'),
+}
+
+
+def parse_importtime(output):
+    """Parse ``-X importtime`` stderr into [(module, self_us, cumulative_us, depth)]"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Profile cold-start imports (python -X importtime) and print a per-module table'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(TARGETS), default='urls',
+                            help='Boot path to profile (default: urls, i.e. a web worker)')
+        parser.add_argument('--sort', choices=['self', 'cumulative'], default='cumulative')
+        parser.add_argument('--limit', type=int, default=30)
+        parser.add_argument('--prefix', default='', help='Only show modules starting with this, e.g. "apps."')
+        parser.add_argument('--group', action='store_true',
+                            help='Sum self time per top-level package instead of listing modules')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            'DJANGO_SETTINGS_MODULE', 'helping_hand_core.settings'))
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', TARGETS[options['target']]],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        rows = parse_importtime(result.stderr)
+        total = sum(row[1] for row in rows)
+
+        if options['group']:
+            groups = defaultdict(int)
+            for name, self_us, _, _ in rows:
+                groups[name.split('.')[0]] += self_us
+            table = [(name, self_us, self_us) for name, self_us in groups.items()]
+        else:
+            table = [(name, self_us, cumulative_us) for name, self_us, cumulative_us, _ in rows]
+        table = [row for row in table if row[0].startswith(options['prefix'])]
+        table.sort(key=lambda row: row[1] if options['sort'] == 'self' else row[2], reverse=True)
+
+        self.stdout.write(f"{'module':<60} {'self ms':>9} {'cumul ms':>9}")
+        for name, self_us, cumulative_us in table[:options['limit']]:
+            self.stdout.write(f'{name:<60} {self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}')
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['target']}: {len(rows)} modules imported in {total / 1000:.1f} ms"
+        ))
@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from helping_hand_core.tasks import claim_tasks, run_task
+
+
+def _run_in_thread(task):
+    try:
+        return run_task(task)
+    finally:
+        # Each pool thread has its own connection; don't leak it between tasks
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (TASKS_MODE = "db") on a thread pool'
+    # Workers never serve URLs; skipping checks avoids importing the URLconf, views and admin
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when idle')
+        parser.add_argument('--once', action='store_true', help='Drain the due tasks and exit')
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            while True:
+                close_old_connections()
+                tasks = claim_tasks(options['batch_size'])
+                if tasks:
+                    for ok in pool.map(_run_in_thread, tasks):
+                        done += ok
+                        failed += not ok
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        self.stdout.write(self.style.SUCCESS(f'Ran {done} task(s); {failed} failed or scheduled for retry.'))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from helping_hand_core.loadtest.seed import DEFAULT_PASSWORD, PER_SCALE, flush, seed
+
+
+class Command(BaseCommand):
+    help = ('Generate load-test data: per unit of --scale one region with '
+            + ', '.join(f'{count} {kind}' for kind, count in PER_SCALE.items() if kind != 'regions')
+            + ', plus pending applications')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help='Multiplier for every row count')
+        parser.add_argument('--days', type=int, default=14, help='Spread shifts over this many upcoming days')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password for every generated user')
+        parser.add_argument('--seed', type=int, help='Random seed, for repeatable data sets')
+        parser.add_argument('--flush', action='store_true', help='Delete earlier load-test data first')
+
+    def handle(self, *args, **options):
+        if options['scale'] < 1 or options['days'] < 1:
+            raise CommandError('--scale and --days must be at least 1')
+        started = time.perf_counter()
+        if options['flush']:
+            self.stdout.write(f'Deleted {flush()} rows of earlier load-test data')
+        counts = seed(options['scale'], options['password'], options['days'], options['seed'])
+        self.stdout.write(self.style.SUCCESS(
+            'Created ' + ', '.join(f'{count} {kind}' for kind, count in counts.items())
+            + f' in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,65 @@
+"""
+Warm-start hook for web workers.
+
+Django fills several caches lazily on the first request: the URL resolver
+imports every view module and builds its reverse tables, each template is
+compiled on first use, and model _meta builds its field and relation caches.
+wsgi.py/asgi.py call warm_up() at boot (when PRELOAD_ON_STARTUP is set) so
+that cost is paid before the worker accepts traffic, and once in the master
+when the server preloads the app before forking.
+
+No database connection is opened here, so it is safe to run before fork.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def warm_url_resolver():
+    """Import the URLconf (and so every view) and build the reverse lookup tables"""
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+    return len(resolver.reverse_dict)
+
+
+def warm_models():
+    """Build _meta field/relation caches for every installed model"""
+    models = apps.get_models()
+    for model in models:
+        model._meta.get_fields()
+        model._meta.fields_map
+    return len(models)
+
+
+def warm_templates():
+    """Compile the project's templates into the cached template loader"""
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.engine.dirs:
+            root = Path(directory)
+            for path in sorted(root.rglob('*.html')):
+                engine.get_template(path.relative_to(root).as_posix())
+                count += 1
+    return count
+
+
+def warm_up():
+    """Run every warm-up step and return {step: (items, seconds)}"""
+    timings = {}
+    for name, step in (('urls', warm_url_resolver), ('models', warm_models), ('templates', warm_templates)):
+        started = time.perf_counter()
+        timings[name] = (step(), time.perf_counter() - started)
+    logger.info('Warm-up done: %s', ', '.join(
+        f'{name} {items} in {seconds * 1000:.0f} ms' for name, (items, seconds) in timings.items()
+    ))
+    return timings
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -31,12 +33,14 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Admin modules are autodiscovered from urls.py, so workers and commands skip them
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'helping_hand_core',
     'apps.user_authentication',
     'apps.shift_management',
     'apps.notifications',
@@ -53,6 +57,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'helping_hand_core.tenancy.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -108,11 +113,39 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing policy
+# PASSWORD_HASHER picks the preferred algorithm for new hashes: 'pbkdf2' (default),
+# 'argon2' (needs argon2-cffi) or 'bcrypt' (needs bcrypt). Every algorithm stays
+# listed so existing hashes keep verifying and are upgraded on login.
+
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=600000, cast=int)
+
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'apps.user_authentication.hashers.ConfigurablePBKDF2PasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'bcrypt': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    hasher for name, hasher in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
 LANGUAGE_CODE = 'en-us'
 
+# Languages notification emails can be rendered in (NotificationPreference.language)
+LANGUAGES = [
+    ('en-us', 'English'),
+    ('hi', 'Hindi'),
+    ('kn', 'Kannada'),
+]
+
 TIME_ZONE = 'UTC'
 
 USE_I18N = True
@@ -142,10 +175,68 @@ LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'login'
 
 # Email Configuration (for development)
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='Helping Hand <no-reply@helpinghand.local>')
+
+# Notification delivery (apps/notifications/channels.py). SITE_URL makes links in
+# emails absolute; the webhook channel posts to NOTIFICATION_WEBHOOK_URL (the
+# /notifications/webhook-stub/ endpoint in development) and stays off when empty.
+SITE_URL = config('SITE_URL', default='http://localhost:8000')
+NOTIFICATION_CHANNELS = {
+    'in_app': 'apps.notifications.channels.InAppChannel',
+    'email': 'apps.notifications.channels.EmailChannel',
+    'webhook': 'apps.notifications.channels.WebhookChannel',
+}
+NOTIFICATION_BATCH_SIZE = 1000
+NOTIFICATION_WEBHOOK_URL = config('NOTIFICATION_WEBHOOK_URL', default='')
+NOTIFICATION_WEBHOOK_TOKEN = config('NOTIFICATION_WEBHOOK_TOKEN', default='')
 
 # Security Settings
 SESSION_COOKIE_AGE = 3600  # 1 hour
 SESSION_SAVE_EVERY_REQUEST = True
 
+# Cache (swap for Redis/Memcached in production so limits are shared by all workers)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Largest radius, in km, the "shifts near me" filter accepts; larger requests are clamped
+MAX_RADIUS_KM = config('MAX_RADIUS_KM', default=100, cast=float)
+
+# Seconds to cache the joined shift on the detail page (keyed on updated_at); 0 turns it off
+SHIFT_DETAIL_CACHE_TTL = config('SHIFT_DETAIL_CACHE_TTL', default=0, cast=int)
+
+# The shift change feed only returns events at least this old, so writes that
+# commit out of id order are not skipped by consumers (see shift_management/changes.py)
+SHIFT_FEED_LAG_SECONDS = config('SHIFT_FEED_LAG_SECONDS', default=5, cast=int)
+
+# Background tasks: 'db' queues side effects for `manage.py run_worker`;
+# 'inline' runs them in-process after commit and re-raises their failures
+# (development and tests only). Deployments with DEBUG off default to 'db'.
+TASKS_MODE = config('TASKS_MODE', default='inline' if DEBUG else 'db')
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_BASE_SECONDS = 5
+
+# Region isolation (helping_hand_core.tenancy). To keep regions in separate
+# databases, add 'helping_hand_core.tenancy.RegionRouter' to DATABASE_ROUTERS and
+# map region ids to DATABASES aliases in REGION_DATABASES.
+REGION_PARTITIONED_APPS = ['shift_management']
+REGION_DATABASES = {}
+
+# Route read-heavy pages to their async views; asgi.py turns this on so the
+# WSGI deployment keeps the sync views (async views under WSGI add a thread hop)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Warm URL resolvers, templates and model caches in wsgi.py/asgi.py before serving
+PRELOAD_ON_STARTUP = config('PRELOAD_ON_STARTUP', default=True, cast=bool)
+
+# Sliding-window limits for auth endpoints: {scope: {key: (max attempts, window seconds)}}
+# Per-IP limits are generous because a whole store often shares one address.
+AUTH_THROTTLE_RATES = {
+    'login': {'username': (5, 300), 'ip': (100, 60)},
+    'password_reset': {'username': (5, 900), 'ip': (20, 300)},
+}
+
 
@@ -0,0 +1,111 @@
+"""
+Background tasks for side effects.
+
+``enqueue(fn, *args, **kwargs)`` hands work off the request path. Arguments
+must be JSON-serializable (pass ids, not model instances).
+
+TASKS_MODE selects how tasks run:
+
+* ``'db'``     - stored in the Task table inside the caller's transaction, so a
+                 rolled-back write never leaves a task behind; executed by
+                 ``manage.py run_worker`` with retries and exponential backoff.
+* ``'inline'`` - executed in-process from ``transaction.on_commit``; used in
+                 development and tests where no worker is running. A failing
+                 task raises, so it is not mistaken for one that succeeded.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _path(fn):
+    return f'{fn.__module__}.{fn.__qualname__}'
+
+
+def _run_inline(path, args, kwargs):
+    try:
+        import_string(path)(*args, **kwargs)
+    except Exception:
+        logger.exception('Inline task %s failed', path)
+        raise
+
+
+def enqueue(fn, *args, **kwargs):
+    """Schedule fn(*args, **kwargs) to run once the current transaction commits"""
+    path = _path(fn)
+    if _setting('TASKS_MODE', 'inline') == 'db':
+        from .models import Task
+        return Task.objects.create(
+            func=path, args=list(args), kwargs=kwargs, run_at=timezone.now(),
+            max_attempts=_setting('TASKS_MAX_ATTEMPTS', 5),
+        )
+    transaction.on_commit(partial(_run_inline, path, args, kwargs))
+    return None
+
+
+def backoff(attempts):
+    """Delay before the next retry: base * 2^(attempts-1), capped"""
+    base = _setting('TASKS_RETRY_BASE_SECONDS', 5)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), _setting('TASKS_RETRY_MAX_SECONDS', 3600)))
+
+
+def claim_tasks(limit):
+    """
+    Claim up to ``limit`` due tasks for this worker.
+
+    Each row is claimed with a conditional UPDATE, so concurrent workers never
+    run the same task, on every database backend.
+    """
+    from .models import Task
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting('TASKS_STALE_SECONDS', 600))
+    # Tasks left 'running' by a crashed worker go back to the queue. That run counts as an
+    # attempt, so a task that keeps killing its worker ends up failed instead of looping
+    abandoned = Task.objects.filter(status='running', locked_at__lt=stale)
+    abandoned.filter(attempts__gte=F('max_attempts') - 1).update(
+        status='failed', attempts=F('attempts') + 1, locked_at=None, finished_at=now,
+        last_error='Worker stopped while running the task',
+    )
+    abandoned.update(status='pending', attempts=F('attempts') + 1, locked_at=None)
+
+    claimed = []
+    candidates = Task.objects.filter(status='pending', run_at__lte=now).order_by('run_at').values_list(
+        'id', flat=True)[:limit]
+    for task_id in list(candidates):
+        if Task.objects.filter(id=task_id, status='pending').update(status='running', locked_at=now):
+            claimed.append(task_id)
+    return list(Task.objects.filter(id__in=claimed))
+
+
+def run_task(task):
+    """Execute one claimed task and record success, retry or failure"""
+    from .models import Task
+    try:
+        import_string(task.func)(*task.args, **task.kwargs)
+    except Exception:
+        attempts = task.attempts + 1
+        fields = {'attempts': attempts, 'locked_at': None, 'last_error': traceback.format_exc()}
+        if attempts < task.max_attempts:
+            fields.update(status='pending', run_at=timezone.now() + backoff(attempts))
+        else:
+            fields.update(status='failed', finished_at=timezone.now())
+            logger.error('Task %s (%s) failed permanently', task.id, task.func)
+        Task.objects.filter(id=task.id).update(**fields)
+        return False
+    Task.objects.filter(id=task.id).update(
+        status='done', attempts=task.attempts + 1, locked_at=None, finished_at=timezone.now()
+    )
+    return True
@@ -0,0 +1,88 @@
+"""
+Request-scoped region (tenant) isolation.
+
+Regions run independently: their stores, shifts and applications never
+mix. TenantMiddleware puts the signed-in user's region in a context
+variable for the length of the request, and the ``in_region`` managers on
+the shift models (TenantManager) filter by it. Queries that go through them
+only touch the current region's rows, using the indexes that lead with
+the region column. Users without a region (company-wide admins), and
+code running outside a request (commands, the task worker), see everything.
+
+RegionRouter is an optional database routing hook for deployments that keep
+each region in its own database; see its docstring.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import models
+
+_current_region = ContextVar('current_region', default=None)
+
+
+def current_region():
+    """Id of the region the current request is scoped to, or None for no scoping"""
+    return _current_region.get()
+
+
+@contextmanager
+def region_scope(region_id):
+    token = _current_region.set(region_id)
+    try:
+        yield
+    finally:
+        _current_region.reset(token)
+
+
+class TenantMiddleware:
+    """Scope each request to the signed-in user's region; must follow AuthenticationMiddleware"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with region_scope(getattr(request.user, 'region_id', None)):
+            return self.get_response(request)
+
+
+class TenantManager(models.Manager):
+    """Manager whose querysets are limited to the current region through ``region_field``"""
+
+    def __init__(self, region_field='region'):
+        super().__init__()
+        self.region_field = region_field
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        region_id = current_region()
+        if region_id is not None:
+            queryset = queryset.filter(**{self.region_field: region_id})
+        return queryset
+
+
+class RegionRouter:
+    """
+    Send queries for region-partitioned apps to the region's own database.
+
+    Enable it by adding 'helping_hand_core.tenancy.RegionRouter' to
+    DATABASE_ROUTERS. Then map region ids to DATABASES aliases in
+    REGION_DATABASES, e.g. {1: 'north', 2: 'south'}. Every database carries the
+    full schema and a copy of the shared tables (users, regions), because
+    Django does not follow relations across databases. Regions without an
+    entry, and unscoped code, use the default database.
+    """
+
+    def _alias(self, model):
+        if model._meta.app_label not in getattr(settings, 'REGION_PARTITIONED_APPS', ()):
+            return None
+        return getattr(settings, 'REGION_DATABASES', {}).get(current_region())
+
+    def db_for_read(self, model, **hints):
+        return self._alias(model)
+
+    def db_for_write(self, model, **hints):
+        return self._alias(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
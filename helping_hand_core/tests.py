@@ -0,0 +1,174 @@
+import asyncio
+from datetime import timedelta
+
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from helping_hand_core.models import Task
+from helping_hand_core.tasks import enqueue, claim_tasks, run_task
+from helping_hand_core.preload import warm_up
+from helping_hand_core.management.commands.profile_imports import parse_importtime
+from helping_hand_core.loadtest.report import Recorder, percentile
+from helping_hand_core.loadtest.scenarios import run as run_load_test
+from helping_hand_core.loadtest.seed import fixture_context, flush, seed
+from apps.notifications.models import Notification
+from apps.notifications.tasks import deliver_notification
+from apps.shift_management.copies import find_drift
+from apps.shift_management.models import Shift
+
+User = get_user_model()
+
+
+def failing_task():
+    raise RuntimeError('boom')
+
+
+class TaskQueueTestCase(TestCase):
+    """Test the background task queue in inline and db modes"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='pass123', role='staff')
+
+    @override_settings(TASKS_MODE='inline')
+    def test_inline_mode_runs_after_commit(self):
+        """Test inline tasks run once the transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(deliver_notification, self.user.id, 'system', 'Hello', 'Welcome')
+            self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    @override_settings(TASKS_MODE='db')
+    def test_db_mode_queues_and_worker_runs(self):
+        """Test queued tasks are claimed once and executed by the worker"""
+        enqueue(deliver_notification, self.user.id, 'system', 'Hello', 'Welcome')
+        self.assertEqual(Notification.objects.count(), 0)
+        tasks = claim_tasks(10)
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(claim_tasks(10), [])
+        self.assertTrue(run_task(tasks[0]))
+        self.assertEqual(Notification.objects.get().recipient, self.user)
+        self.assertEqual(Task.objects.get().status, 'done')
+
+    @override_settings(TASKS_MODE='db', TASKS_MAX_ATTEMPTS=2)
+    def test_failed_tasks_back_off_then_fail(self):
+        """Test failures are retried later and given up after max attempts"""
+        task = enqueue(failing_task)
+        self.assertFalse(run_task(claim_tasks(1)[0]))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('pending', 1))
+        self.assertGreater(task.run_at, task.created_at)
+        self.assertEqual(claim_tasks(1), [])  # not due yet
+
+        Task.objects.filter(id=task.id).update(run_at=task.created_at)
+        self.assertFalse(run_task(claim_tasks(1)[0]))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('failed', 2))
+
+    @override_settings(TASKS_MODE='inline')
+    def test_inline_failures_raise(self):
+        """Test a failing inline task surfaces instead of passing silently"""
+        with self.assertRaises(RuntimeError), self.assertLogs('helping_hand_core.tasks', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                enqueue(failing_task)
+
+    @override_settings(TASKS_MODE='db', TASKS_MAX_ATTEMPTS=2, TASKS_STALE_SECONDS=60)
+    def test_stale_tasks_count_an_attempt(self):
+        """Test a task that keeps crashing its worker is reclaimed once per attempt, then failed"""
+        task = enqueue(failing_task)
+        for expected in [('running', 1), ('failed', 2)]:
+            Task.objects.filter(id=task.id).update(
+                status='running', locked_at=task.created_at - timedelta(minutes=5), run_at=task.created_at
+            )
+            claimed = claim_tasks(1)
+            task.refresh_from_db()
+            self.assertEqual((task.status, task.attempts), expected)
+        self.assertEqual(claimed, [])
+
+    @override_settings(TASKS_MODE='db')
+    def test_rolled_back_writes_leave_no_task(self):
+        """Test tasks enqueued in a rolled-back transaction never run"""
+        try:
+            with transaction.atomic():
+                enqueue(deliver_notification, self.user.id, 'system', 'Hello', 'Welcome')
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(Task.objects.exists())
+
+
+class WarmStartTestCase(TestCase):
+    """Test the boot-time preload hook and import profiler"""
+
+    def test_warm_up_covers_urls_models_and_templates(self):
+        """Test warm_up touches every step without hitting the database"""
+        with self.assertNumQueries(0):
+            timings = warm_up()
+        self.assertGreater(timings['urls'][0], 0)
+        self.assertGreater(timings['models'][0], 0)
+        self.assertGreater(timings['templates'][0], 0)
+
+    def test_parse_importtime(self):
+        """Test -X importtime output is parsed into (module, self, cumulative, depth)"""
+        output = ('import time: self [us] | cumulative | imported package\n'
+                  'import time:       120 |        120 |   csv\n'
+                  'import time:       300 |        420 | apps.dashboard_reports.views\n')
+        self.assertEqual(parse_importtime(output), [
+            ('csv', 120, 120, 1), ('apps.dashboard_reports.views', 300, 420, 0)
+        ])
+
+
+class LoadTestHarnessTestCase(TestCase):
+    """Test the load-test data generator and summary"""
+
+    def test_percentiles_and_summary(self):
+        """Test latency percentiles, error rate and throughput per endpoint and in total"""
+        self.assertEqual(percentile([0.1, 0.2, 0.3, 0.4], 50), 0.2)
+        self.assertEqual(percentile([0.1, 0.2, 0.3, 0.4], 99), 0.4)
+        recorder = Recorder()
+        for ms in range(1, 101):
+            recorder.record('shift_list', ms / 1000, error='HTTP 500' if ms > 95 else None)
+        recorder.record('dashboard', 0.05)
+        summary = recorder.summary(10.0, scenario='staff_browse')
+        stats = summary['endpoints']['shift_list']
+        self.assertEqual((stats['requests'], stats['errors'], stats['error_rate']), (100, 5, 0.05))
+        self.assertEqual((stats['latency_ms']['p50'], stats['latency_ms']['p99']), (50.0, 99.0))
+        self.assertEqual(stats['error_kinds'], {'HTTP 500': 5})
+        self.assertEqual((summary['total']['requests'], summary['total']['throughput_rps']), (101, 10.1))
+        self.assertEqual(summary['run'], {'scenario': 'staff_browse'})
+
+    def test_seed_context_and_flush(self):
+        """Test seeded data scales, keeps application copies consistent and can be removed"""
+        counts = seed(scale=1, days=7, random_seed=1)
+        self.assertEqual((counts['staff'], counts['shifts'], counts['applications']), (500, 400, 1600))
+        self.assertEqual(find_drift(), set())
+        context = fixture_context()
+        self.assertEqual(len(context['staff']), 500)
+        self.assertTrue(context['managers'])
+        self.assertEqual(sum(len(ids) for ids in context['shifts'].values()), 400)
+        flush()
+        self.assertFalse(User.objects.filter(username__startswith='load_').exists())
+        self.assertFalse(Shift.objects.exists())
+
+
+class LoadTestRunTestCase(LiveServerTestCase):
+    """Test each scenario end to end against a live server"""
+
+    def test_scenarios_run_without_errors(self):
+        """Test every scenario completes its flow and records no failed requests"""
+        seed(scale=1, days=7, random_seed=1)
+        context = fixture_context()
+        expected = {
+            'login_storm': {'login_page', 'login_submit', 'dashboard'},
+            'staff_browse': {'login_page', 'login_submit', 'shift_list', 'shift_detail'},
+            'manager_approve': {'login_page', 'login_submit', 'manager_dashboard', 'bulk_approve'},
+        }
+        for scenario, endpoints in expected.items():
+            with self.subTest(scenario=scenario):
+                recorder, elapsed, mix = asyncio.run(run_load_test(
+                    self.live_server_url, scenario, context, users=1, duration=1.5, ramp_up=0, think=0,
+                    password='loadtest-pass', random_seed=1,
+                ))
+                summary = recorder.summary(elapsed)
+                self.assertEqual(mix, {scenario: 1})
+                self.assertLessEqual(endpoints, set(summary['endpoints']))
+                self.assertEqual(summary['total']['errors'], 0, summary['endpoints'])
@@ -18,6 +18,9 @@ from django.contrib import admin
 from django.urls import path, include
 from . import views
 
+# SimpleAdminConfig is installed: register ModelAdmins only in processes that serve URLs
+admin.autodiscover()
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.index_view, name='home'),